@@ -1,5 +1,5 @@
-from django.db.models import Q, Count
-from rest_framework import generics, permissions, filters
+from django.db.models import Q
+from rest_framework import generics, permissions, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -7,8 +7,14 @@ from django.contrib.auth import get_user_model
 
 from projects.models import Project
 from tasks.models import Task
-from projects.serializers import ProjectSerializer
-from tasks.serializers import TaskSerializer
+from tasks.rollup import leaf_q
+from projects.serializers import ProjectSerializer, ProjectValuesSerializer
+from tasks.serializers import TaskSerializer, TaskValuesSerializer
+from workly.search import FullTextSearchFilter
+from workly.values import ValuesListMixin
+
+from .summary import get_summary
+from .workload import workload_matrix
 
 from datetime import date, timedelta
 from django.utils.dateparse import parse_date
@@ -17,26 +23,33 @@ from rest_framework.permissions import IsAuthenticated
 User = get_user_model()
 
 
-class MyProjectsList(generics.ListAPIView):
+class MyProjectsList(ValuesListMixin, generics.ListAPIView):
     serializer_class = ProjectSerializer
+    values_serializer = ProjectValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         u = self.request.user
+        # podzapytanie zamiast joina + DISTINCT, żeby agregaty zadań nie
+        # były zawyżane przez złączenie po assignee
         return (
-            Project.objects.filter(Q(owner=u) | Q(tasks__assignee=u))
-            .distinct()
+            Project.objects.filter(
+                Q(owner=u)
+                | Q(pk__in=Task.objects.filter(assignee=u).values("project_id"))
+            )
+            .with_task_stats()
             .order_by("-updated_at", "-created_at")
         )
 
 
-class MyTasksList(generics.ListAPIView):
+class MyTasksList(ValuesListMixin, generics.ListAPIView):
     serializer_class = TaskSerializer
+    values_serializer = TaskValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ["status", "project"]
     search_fields = ["title", "description"]
@@ -61,30 +74,48 @@ class DashboardSummary(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        u = request.user
-        my_projects_qs = Project.objects.filter(
-            Q(owner=u) | Q(tasks__assignee=u)
-        ).distinct()
-        my_tasks_qs = Task.objects.filter(assignee=u)
-
-        by_status = list(
-            my_tasks_qs.values("status").annotate(count=Count("id")).order_by("status")
-        )
-        next_task = (
-            my_tasks_qs.exclude(start_date__isnull=True)
-            .order_by("start_date")
-            .values("id", "title", "project_id", "start_date", "end_date")
-            .first()
-        )
+        # cache per użytkownik, unieważniany sygnałami (dashboard.signals)
+        return Response(get_summary(request.user))
+
+
+BOOTSTRAP_LIMIT = 5
+
+
+def bootstrap_payload(request, limit=BOOTSTRAP_LIMIT):
+    """
+    Dane startowe strony dashboardu: podsumowanie oraz pierwsze `limit`
+    projektów i zadań użytkownika. Liczności pochodzą z podsumowania, więc
+    bez COUNT(*) paginacji - najwyżej trzy zapytania (podsumowanie z cache).
+    """
+    summary = get_summary(request.user)
+    projects = MyProjectsList(request=request).get_queryset()[:limit]
+    tasks = (
+        Task.objects.filter(assignee=request.user)
+        .order_by(*MyTasksList.ordering)[:limit]
+    )
+    context = {"request": request}
+    return {
+        "summary": summary,
+        "projects": {
+            "count": summary["my_projects_count"],
+            "results": ProjectSerializer(projects, many=True, context=context).data,
+        },
+        "tasks": {
+            "count": summary["my_tasks_count"],
+            "results": TaskSerializer(tasks, many=True, context=context).data,
+        },
+    }
+
+
+class MyBootstrapView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response(
-            {
-                "my_projects_count": my_projects_qs.count(),
-                "my_tasks_count": my_tasks_qs.count(),
-                "my_tasks_by_status": by_status,
-                "next_task": next_task,
-            }
-        )
+    def get(self, request):
+        try:
+            limit = min(int(request.GET.get("limit", BOOTSTRAP_LIMIT)), 100)
+        except ValueError:
+            limit = BOOTSTRAP_LIMIT
+        return Response(bootstrap_payload(request, limit=max(limit, 1)))
 
 
 class MyTimelineView(APIView):
@@ -131,6 +162,58 @@ class MyTimelineView(APIView):
         )
 
 
+class WorkloadView(APIView):
+    """
+    Obciążenie zespołu: GET /api/workload/?from=YYYY-MM-DD&days=N&users=1,2,3
+
+    Zadania nachodzące na okno pobierane są jednym zapytaniem po indeksie
+    (assignee, start_date, end_date), a macierz budowana w `dashboard.workload`.
+    """
+
+    permission_classes = [IsAuthenticated]
+    max_days = 366
+
+    def get(self, request):
+        try:
+            days = int(request.GET.get("days", 28))
+        except ValueError:
+            return Response({"days": ["Niepoprawna liczba dni."]}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= self.max_days:
+            return Response(
+                {"days": [f"Zakres dni to 1-{self.max_days}."]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start_str = request.GET.get("from")
+        start = parse_date(start_str) if start_str else date.today()
+        if start is None:
+            return Response({"from": ["Niepoprawna data."]}, status=status.HTTP_400_BAD_REQUEST)
+        end = start + timedelta(days=days - 1)
+
+        user_ids = None
+        users_str = request.GET.get("users")
+        if users_str:
+            try:
+                user_ids = list(dict.fromkeys(int(u) for u in users_str.split(",") if u))
+            except ValueError:
+                return Response({"users": ["Niepoprawna lista ID."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # rodzice mają w godzinach sumy dzieci - liczymy tylko liście
+        qs = Task.objects.filter(
+            leaf_q(),
+            assignee__isnull=False,
+            start_date__lte=end,
+        ).filter(
+            Q(end_date__gte=start) | Q(end_date__isnull=True, start_date__gte=start)
+        )
+        if user_ids is not None:
+            qs = qs.filter(assignee_id__in=user_ids)
+        rows = qs.order_by().values_list(
+            "assignee_id", "start_date", "end_date", "estimated_hours"
+        )
+
+        matrix = workload_matrix(rows, start, days, user_ids=user_ids)
+        return Response({"from": start.isoformat(), "days": days, **matrix})
+
+
 class UsersListView(APIView):
     permission_classes = [IsAuthenticated]
     
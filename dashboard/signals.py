@@ -0,0 +1,43 @@
+"""
+Unieważnianie podsumowań dashboardu.
+
+Podsumowanie zależy od zadań przypisanych użytkownikowi i projektów, których
+jest właścicielem, więc zmiana zadania dotyczy jego (poprzedniego i obecnego)
+wykonawcy, a zmiana projektu - (poprzedniego i obecnego) właściciela.
+Poprzednie wartości zapamiętywane są przy wczytaniu obiektu.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from tasks.models import Task
+from tasks.signals import tasks_changed
+
+from .summary import invalidate_summary
+
+
+@receiver(post_init, sender=Task)
+def remember_assignee(sender, instance, **kwargs):
+    instance._summary_assignee_id = instance.__dict__.get("assignee_id")
+
+
+@receiver(post_init, sender=Project)
+def remember_owner(sender, instance, **kwargs):
+    instance._summary_owner_id = instance.__dict__.get("owner_id")
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, **kwargs):
+    invalidate_summary([instance._summary_assignee_id, instance.assignee_id])
+    instance._summary_assignee_id = instance.assignee_id
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs):
+    invalidate_summary([instance._summary_owner_id, instance.owner_id])
+    instance._summary_owner_id = instance.owner_id
+
+
+@receiver(tasks_changed)
+def tasks_bulk_changed(sender, user_ids, **kwargs):
+    invalidate_summary(user_ids)
@@ -0,0 +1,105 @@
+"""
+Podsumowanie dashboardu użytkownika z cache.
+
+Przy braku wpisu całe podsumowanie liczone jest jednym zapytaniem:
+warunkowe zliczenia zadań przypisanych użytkownikowi (po jednym na status)
+oraz skalarne podzapytania o liczbę projektów i najbliższe zadanie.
+Wpisy unieważniane są przez sygnały (`dashboard.signals`) tylko dla
+użytkowników, których dotyczy zmiana.
+
+Wpisy trzymane są we wspólnym dla procesów aliasie `responses`
+(`projects.cache`): unieważnienie w jednym procesie roboczym musi
+dotrzeć do pozostałych, czego lokalny `LocMemCache` nie zapewnia.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, Func, JSONField, Q, Subquery
+from django.db.models.functions import JSONObject
+
+from projects.cache import CACHE_ALIAS
+from projects.models import Project
+from tasks.models import Task
+
+SUMMARY_TIMEOUT = 60 * 15
+
+
+def summary_key(user_id):
+    return f"dashboard:summary:{user_id}"
+
+
+def compute_summary(user):
+    my_tasks = Task.objects.filter(assignee=user)
+    projects_count = (
+        Project.objects.filter(Q(owner=user) | Q(pk__in=my_tasks.values("project_id")))
+        .order_by()
+        .values(n=Func(F("id"), function="COUNT"))
+    )
+    next_task = (
+        my_tasks.exclude(start_date__isnull=True)
+        .order_by("start_date", "id")
+        .values(
+            data=JSONObject(
+                id="id",
+                title="title",
+                project_id="project_id",
+                start_date="start_date",
+                end_date="end_date",
+            )
+        )[:1]
+    )
+    statuses = [value for value, _ in Task.Status.choices]
+    row = (
+        get_user_model()
+        .objects.filter(pk=user.pk)
+        .values("pk")
+        .annotate(
+            my_projects_count=Subquery(projects_count),
+            next_task=Subquery(next_task, output_field=JSONField()),
+            my_tasks_count=Count("tasks"),
+            **{
+                f"status_{value}": Count("tasks", filter=Q(tasks__status=value))
+                for value in statuses
+            },
+        )
+        .values(
+            "my_projects_count",
+            "next_task",
+            "my_tasks_count",
+            *(f"status_{value}" for value in statuses),
+        )
+        .get()
+    )
+    return {
+        "my_projects_count": row["my_projects_count"] or 0,
+        "my_tasks_count": row["my_tasks_count"],
+        "my_tasks_by_status": [
+            {"status": value, "count": row[f"status_{value}"]}
+            for value in sorted(statuses)
+            if row[f"status_{value}"]
+        ],
+        "next_task": row["next_task"],
+    }
+
+
+def get_summary(user):
+    cache = caches[CACHE_ALIAS]
+    key = summary_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_summary(user)
+        cache.set(key, summary, SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_summary(user_ids):
+    """
+    Usuwa wpisy od razu i ponownie po zatwierdzeniu transakcji, żeby
+    równoległe żądanie nie zapisało w cache stanu sprzed commita.
+    """
+    keys = [summary_key(uid) for uid in set(user_ids) if uid]
+    if not keys:
+        return
+    cache = caches[CACHE_ALIAS]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,15 +1,30 @@
 """
 Tests for Dashboard API endpoints.
 """
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from datetime import date, timedelta
 from projects.models import Project
 from tasks.models import Task
+from tasks.bulk import apply_task_batch
+from dashboard.summary import summary_key
+from projects.cache import CACHE_ALIAS
 
 User = get_user_model()
+cache = caches[CACHE_ALIAS]
+
+
+def app_queries(context):
+    """Queries of a captured block without the shared cache table."""
+    return [
+        q['sql'] for q in context.captured_queries
+        if 'workly_response_cache' not in q['sql'] and 'SAVEPOINT' not in q['sql']
+    ]
 
 
 class DashboardAPITestCase(TestCase):
@@ -17,6 +32,7 @@ class DashboardAPITestCase(TestCase):
 
     def setUp(self):
         """Set up test data."""
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username='testuser',
@@ -321,3 +337,150 @@ class DashboardAPITestCase(TestCase):
             # IsAuthenticated returns 403 for unauthenticated users
             self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
                          f"Endpoint {endpoint} should require authentication")
+
+    def test_my_projects_list_constant_queries(self):
+        """Test that my projects list annotates counts without N+1 queries."""
+        for i in range(5):
+            project = Project.objects.create(name=f'Assigned {i}', owner=self.other_user)
+            Task.objects.create(project=project, title='A', assignee=self.user)
+            Task.objects.create(project=project, title='B', assignee=self.user)
+            Task.objects.create(project=project, title='C', assignee=self.other_user)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/my/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = {p['name']: p['tasks_count'] for p in response.data['results']}
+        self.assertEqual(counts['Assigned 0'], 3)
+        self.assertEqual(counts['My Project'], 0)
+
+    def test_dashboard_summary_single_query_and_cached(self):
+        """Test that the summary is one query on a miss and a cache read on a hit."""
+        Task.objects.create(project=self.other_project, title='A', status='todo', assignee=self.user)
+        Task.objects.create(project=self.project, title='B', status='done', assignee=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/my/summary/')
+        self.assertEqual(len(app_queries(ctx)), 1)
+        self.assertEqual(response.data['my_projects_count'], 2)
+        self.assertEqual(
+            response.data['my_tasks_by_status'],
+            [{'status': 'done', 'count': 1}, {'status': 'todo', 'count': 1}],
+        )
+        # wspólny cache: jeden odczyt tabeli cache, bez liczenia
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get('/api/my/summary/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(app_queries(ctx), [])
+        self.assertEqual(cached.data, response.data)
+
+    def test_dashboard_summary_invalidated_for_affected_users(self):
+        """Test that writes invalidate only the owner's and assignees' entries."""
+        self.client.get('/api/my/summary/')
+        self.client.force_authenticate(user=self.other_user)
+        self.client.get('/api/my/summary/')
+
+        task = Task.objects.create(project=self.other_project, title='T', assignee=self.user)
+        self.assertIsNone(cache.get(summary_key(self.user.id)))
+        self.assertIsNotNone(cache.get(summary_key(self.other_user.id)))
+
+        self.client.get('/api/my/summary/')
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/api/my/summary/').data['my_tasks_count'], 1)
+
+        # zmiana wykonawcy unieważnia poprzedniego i nowego
+        task.assignee = self.other_user
+        task.save()
+        self.assertIsNone(cache.get(summary_key(self.user.id)))
+        self.assertIsNone(cache.get(summary_key(self.other_user.id)))
+        self.assertEqual(self.client.get('/api/my/summary/').data['my_tasks_count'], 0)
+
+        Project.objects.create(name='New', owner=self.user)
+        self.assertEqual(self.client.get('/api/my/summary/').data['my_projects_count'], 2)
+
+    def test_dashboard_summary_invalidated_by_bulk_writes(self):
+        """Test that batch updates without post_save still invalidate the cache."""
+        task = Task.objects.create(project=self.project, title='T', status='todo', assignee=self.user)
+        self.assertEqual(self.client.get('/api/my/summary/').data['my_tasks_by_status'][0]['status'], 'todo')
+        apply_task_batch(updates=[(task, {'status': 'done'})])
+        self.assertEqual(
+            self.client.get('/api/my/summary/').data['my_tasks_by_status'],
+            [{'status': 'done', 'count': 1}],
+        )
+
+    def test_my_bootstrap(self):
+        """Test that bootstrap returns summary, projects and tasks in a fixed query budget."""
+        for i in range(8):
+            project = Project.objects.create(name=f'Assigned {i}', owner=self.other_user)
+            Task.objects.create(project=project, title=f'T{i}', assignee=self.user)
+        # podsumowanie + projekty + zadania
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/my/bootstrap/')
+        self.assertEqual(len(app_queries(ctx)), 3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary']['my_tasks_count'], 8)
+        self.assertEqual(response.data['projects']['count'], 9)
+        self.assertEqual(len(response.data['projects']['results']), 5)
+        self.assertIn('tasks_count', response.data['projects']['results'][0])
+        self.assertEqual(response.data['tasks']['count'], 8)
+        self.assertEqual(len(response.data['tasks']['results']), 5)
+        # podsumowanie z cache
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/my/bootstrap/?limit=20')
+        self.assertEqual(len(app_queries(ctx)), 2)
+        self.assertEqual(len(response.data['tasks']['results']), 8)
+
+    def test_dashboard_page_embeds_bootstrap(self):
+        """Test that the dashboard page embeds the bootstrap payload."""
+        self.client.force_login(self.user)
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'id="dashboard-bootstrap"')
+        self.assertEqual(response.context['bootstrap']['projects']['count'], 1)
+
+    def test_workload_matrix(self):
+        """Test per-user daily task counts and hours spread over working days."""
+        monday = date(2025, 1, 6)
+        # pon.-pt.: 10h / 5 dni roboczych
+        Task.objects.create(project=self.project, title='Week', assignee=self.user,
+                            start_date=monday, end_date=monday + timedelta(days=4),
+                            estimated_hours=10)
+        # pt.-pon. przez weekend: 6h / 2 dni robocze
+        Task.objects.create(project=self.project, title='Weekend', assignee=self.other_user,
+                            start_date=monday + timedelta(days=4), end_date=monday + timedelta(days=7),
+                            estimated_hours=6)
+        Task.objects.create(project=self.project, title='Outside', assignee=self.user,
+                            start_date=monday + timedelta(days=30), end_date=monday + timedelta(days=31))
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/workload/', {'from': '2025-01-06', 'days': 8})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['users'], [self.user.id, self.other_user.id])
+        self.assertEqual(data['workdays'], [1, 1, 1, 1, 1, 0, 0, 1])
+        self.assertEqual(data['tasks'][0], [1, 1, 1, 1, 1, 0, 0, 0])
+        self.assertEqual(data['hours'][0], [2.0, 2.0, 2.0, 2.0, 2.0, 0.0, 0.0, 0.0])
+        self.assertEqual(data['tasks'][1], [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(data['hours'][1], [0.0, 0.0, 0.0, 0.0, 3.0, 0.0, 0.0, 3.0])
+
+    def test_workload_users_filter_and_validation(self):
+        """Test that the users axis follows the filter and bad input is rejected."""
+        response = self.client.get('/api/workload/', {'days': 3, 'users': f'{self.other_user.id},{self.user.id}'})
+        self.assertEqual(response.data['users'], [self.other_user.id, self.user.id])
+        self.assertEqual(response.data['tasks'], [[0, 0, 0], [0, 0, 0]])
+        self.assertEqual(self.client.get('/api/workload/', {'days': 1000}).status_code, 400)
+        self.assertEqual(self.client.get('/api/workload/', {'users': 'x'}).status_code, 400)
+
+    def test_my_tasks_cursor_with_null_dates(self):
+        """Test that cursor pages over nullable start dates neither skip nor repeat rows."""
+        for i in range(30):
+            Task.objects.create(
+                project=self.project, title=f'T{i}', assignee=self.user,
+                start_date=None if i % 3 == 0 else date(2025, 1, 1) + timedelta(days=i % 5),
+            )
+        expected = list(
+            Task.objects.filter(assignee=self.user).order_by('start_date', 'sort_index', 'id')
+            .values_list('id', flat=True)
+        )
+        first = self.client.get('/api/my/tasks/?cursor=')
+        second = self.client.get(first.data['next'])
+        ids = [t['id'] for t in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, expected)
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
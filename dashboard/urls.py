@@ -1,5 +1,5 @@
 from django.urls import path
-from .api import MyProjectsList, MyTasksList, DashboardSummary, MyTimelineView, UsersListView
+from .api import MyProjectsList, MyTasksList, DashboardSummary, MyTimelineView, UsersListView, MyBootstrapView, WorkloadView
 
 app_name = "dashboard"
 
@@ -7,6 +7,8 @@ urlpatterns = [
     path("my/projects/", MyProjectsList.as_view(), name="my-projects"),
     path("my/tasks/", MyTasksList.as_view(), name="my-tasks"),
     path("my/summary/", DashboardSummary.as_view(), name="summary"),
+    path("my/bootstrap/", MyBootstrapView.as_view(), name="my-bootstrap"),
     path("my/timeline/", MyTimelineView.as_view(), name="my-timeline"),
+    path("workload/", WorkloadView.as_view(), name="workload"),
     path("users/", UsersListView.as_view(), name="users-list"),
 ]
@@ -0,0 +1,85 @@
+"""
+Macierz obciążenia zespołu: użytkownicy x dni.
+
+Każde zadanie dodaje swój wkład do tablicy różnicowej wiersza wykonawcy
+(+ w pierwszym dniu okna, - za ostatnim), a wiersze powstają jako sumy
+prefiksowe (`itertools.accumulate`). Koszt to O(zadania + użytkownicy x dni)
+bez pętli po dniach każdego zadania. Szacowane godziny rozkładane są
+równo na dni robocze (pon.-pt.) całego zadania, więc w oknie liczą się
+tylko jego dni robocze.
+"""
+from datetime import timedelta
+from itertools import accumulate, repeat
+from operator import mul, truediv
+
+# godziny liczone w setnych częściach, żeby sumy prefiksowe były dokładne
+SCALE = 100
+
+
+def workdays_between(start, end):
+    """Liczba dni roboczych w [start, end] (włącznie)."""
+    days = (end - start).days + 1
+    if days <= 0:
+        return 0
+    weeks, rest = divmod(days, 7)
+    first = start.weekday()
+    extra = sum(1 for i in range(rest) if (first + i) % 7 < 5)
+    return weeks * 5 + extra
+
+
+def workload_matrix(rows, start, days, user_ids=None):
+    """
+    Buduje macierz z krotek (assignee_id, start_date, end_date, estimated_hours).
+
+    Zwraca słownik z osią użytkowników, maską dni roboczych oraz wierszami
+    `tasks` (liczba aktywnych zadań dziennie) i `hours` (godziny dziennie).
+    Gdy `user_ids` jest podane, oś zawiera dokładnie tych użytkowników.
+    """
+    end = start + timedelta(days=days - 1)
+    diff_tasks = {}
+    diff_hours = {}
+    if user_ids is not None:
+        for uid in user_ids:
+            diff_tasks[uid] = [0] * (days + 1)
+            diff_hours[uid] = [0] * (days + 1)
+
+    for uid, t_start, t_end, estimated in rows:
+        t_end = t_end or t_start
+        if uid not in diff_tasks:
+            if user_ids is not None:
+                continue
+            diff_tasks[uid] = [0] * (days + 1)
+            diff_hours[uid] = [0] * (days + 1)
+        lo = (max(t_start, start) - start).days
+        hi = (min(t_end, end) - start).days + 1
+        if lo >= hi:
+            continue
+        tasks = diff_tasks[uid]
+        tasks[lo] += 1
+        tasks[hi] -= 1
+        if estimated:
+            workdays = workdays_between(t_start, t_end)
+            if workdays:
+                rate = round(estimated * SCALE / workdays)
+                hours = diff_hours[uid]
+                hours[lo] += rate
+                hours[hi] -= rate
+
+    first = start.weekday()
+    workday = [1 if (first + i) % 7 < 5 else 0 for i in range(days)]
+    users = list(diff_tasks) if user_ids is not None else sorted(diff_tasks)
+    return {
+        "users": users,
+        "workdays": workday,
+        "tasks": [list(accumulate(diff_tasks[uid][:days])) for uid in users],
+        "hours": [
+            list(
+                map(
+                    truediv,
+                    map(mul, accumulate(diff_hours[uid][:days]), workday),
+                    repeat(SCALE),
+                )
+            )
+            for uid in users
+        ],
+    }
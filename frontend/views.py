@@ -4,6 +4,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 
+from dashboard.api import bootstrap_payload
+
 
 @require_http_methods(["GET", "POST"])
 def login_view(request):
@@ -44,7 +46,8 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-    return render(request, 'frontend/dashboard.html')
+    # dane startowe osadzone w HTML - pierwszy render bez zapytań do API
+    return render(request, 'frontend/dashboard.html', {'bootstrap': bootstrap_payload(request)})
 
 
 @login_required
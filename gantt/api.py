@@ -1,11 +1,22 @@
+import hashlib
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework import status
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags, quote_etag
+from datetime import date
 
+from projects.cache import cached_response
 from projects.models import Project
 from tasks.models import Task, Dependency
+from tasks.scheduling import compute_schedule
+
+
+def _flag(request, name):
+    return request.GET.get(name) in ("1", "true")
 
 
 class GanttProjectView(APIView):
@@ -13,7 +24,64 @@ class GanttProjectView(APIView):
 
     def get(self, request, pk: int):
         project = get_object_or_404(Project, pk=pk)
+        with_schedule = _flag(request, "schedule")
+        compact = _flag(request, "compact")
+
+        # warunkowy GET: niezmieniony wykres to 304 bez ładowania wierszy
+        etag = self.get_etag(project, compact, with_schedule)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = cached_response(
+                request,
+                "gantt",
+                project.pk,
+                lambda: self.build(project, compact, with_schedule),
+            )
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
+    def build(self, project, compact, with_schedule):
+        try:
+            if compact:
+                payload = self.compact_payload(project, with_schedule)
+            else:
+                payload = self.payload(project, with_schedule)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(payload)
+
+    def get_etag(self, project, compact, with_schedule):
+        """
+        Silny ETag z max(updated_at) i liczności zadań oraz zależności.
+
+        Liczności wyłapują usunięcia, których samo max(updated_at) nie widzi.
+        """
+        tasks = Task.objects.filter(project=project).aggregate(
+            changed=Max("updated_at"), count=Count("id")
+        )
+        deps = Dependency.objects.filter(successor__project=project).aggregate(
+            changed=Max("updated_at"), count=Count("id")
+        )
+        key = "|".join(
+            str(v)
+            for v in (
+                project.pk,
+                project.updated_at,
+                tasks["changed"],
+                tasks["count"],
+                deps["changed"],
+                deps["count"],
+                int(compact),
+                int(with_schedule),
+            )
+        )
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+    def payload(self, project, with_schedule):
         tasks = (
             Task.objects.filter(project=project)
             .select_related("parent", "assignee")
@@ -45,4 +113,90 @@ class GanttProjectView(APIView):
             for d in deps
         ]
 
-        return Response({"data": data, "links": links})
+        payload = {"data": data, "links": links}
+
+        # tryb opcjonalny: ścieżka krytyczna liczona na serwerze
+        if with_schedule:
+            schedule = compute_schedule(
+                ((t.id, t.start_date, t.end_date) for t in tasks),
+                ((d.predecessor_id, d.successor_id, d.type, d.lag_days) for d in deps),
+                project_start=project.start_date,
+            )
+            for row in data:
+                row.update(schedule.as_dict(row["id"]))
+            payload["critical_path"] = schedule.critical_path
+            payload["project_finish"] = (
+                date.fromordinal(schedule.finish).isoformat()
+                if schedule.finish is not None
+                else None
+            )
+
+        return payload
+
+    def compact_payload(self, project, with_schedule):
+        """
+        Format kolumnowy: równoległe tablice zamiast listy słowników.
+
+        Daty kodowane są jako przesunięcie w dniach od `base` (start projektu
+        albo najwcześniejszy start zadania), postęp jako liczba całkowita 0-100.
+        Zadania czytane są przez `values_list`, bez tworzenia obiektów modelu.
+        """
+        rows = list(
+            Task.objects.filter(project=project)
+            .order_by("sort_index", "id")
+            .values_list(
+                "id", "title", "start_date", "end_date", "progress", "parent_id", "status"
+            )
+        )
+        links = list(
+            Dependency.objects.filter(successor__project=project).values_list(
+                "id", "predecessor_id", "successor_id", "type", "lag_days"
+            )
+        )
+        ids, text, starts, ends, progress, parents, statuses = (
+            [list(col) for col in zip(*rows)] if rows else ([] for _ in range(7))
+        )
+
+        base = (
+            project.start_date or min(filter(None, starts), default=None) or date.today()
+        )
+        origin = base.toordinal()
+
+        def offsets(values):
+            return [v.toordinal() - origin if v else None for v in values]
+
+        payload = {
+            "base": base.isoformat(),
+            "ids": ids,
+            "text": text,
+            "start": offsets(starts),
+            "end": offsets(ends),
+            "progress": progress,
+            "parent": parents,
+            "status": statuses,
+            "links": {
+                key: [link[i] for link in links]
+                for i, key in enumerate(("id", "source", "target", "type", "lag"))
+            },
+        }
+
+        if with_schedule:
+            schedule = compute_schedule(
+                zip(ids, starts, ends),
+                (link[1:] for link in links),
+                project_start=base,
+            )
+            for key, attr in (
+                ("es", "early_start"),
+                ("ef", "early_finish"),
+                ("ls", "late_start"),
+                ("lf", "late_finish"),
+            ):
+                payload[key] = [getattr(schedule.tasks[i], attr) - origin for i in ids]
+            payload["slack"] = [schedule.tasks[i].total_float for i in ids]
+            payload["critical_path"] = schedule.critical_path
+            payload["project_finish"] = (
+                schedule.finish - origin if schedule.finish is not None else None
+            )
+
+        return payload
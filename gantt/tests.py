@@ -250,3 +250,103 @@ class GanttAPITestCase(TestCase):
         # Only dependency within project should be included
         self.assertEqual(len(response.data['links']), 1)
         self.assertEqual(response.data['links'][0]['id'], dep1.id)
+
+    def test_gantt_project_view_schedule(self):
+        """Test that ?schedule=1 adds CPM fields and the critical path."""
+        start = date(2025, 1, 1)
+        self.project.start_date = start
+        self.project.save()
+        task1 = Task.objects.create(
+            project=self.project,
+            title='Task 1',
+            start_date=start,
+            end_date=start + timedelta(days=5)
+        )
+        task2 = Task.objects.create(
+            project=self.project,
+            title='Task 2',
+            start_date=start,
+            end_date=start + timedelta(days=2)
+        )
+        task3 = Task.objects.create(
+            project=self.project,
+            title='Task 3',
+            start_date=start,
+            end_date=start + timedelta(days=3)
+        )
+        Dependency.objects.create(predecessor=task1, successor=task3, type='FS', lag_days=1)
+        Dependency.objects.create(predecessor=task2, successor=task3, type='FS')
+        response = self.client.get(f'/api/projects/{self.project.id}/gantt/?schedule=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {t['id']: t for t in response.data['data']}
+        self.assertEqual(rows[task3.id]['es'], (start + timedelta(days=6)).isoformat())
+        self.assertEqual(rows[task3.id]['ef'], (start + timedelta(days=9)).isoformat())
+        self.assertEqual(rows[task2.id]['slack'], 4)
+        self.assertFalse(rows[task2.id]['critical'])
+        self.assertTrue(rows[task1.id]['critical'])
+        self.assertEqual(response.data['critical_path'], [task1.id, task3.id])
+        self.assertEqual(response.data['project_finish'], (start + timedelta(days=9)).isoformat())
+
+    def test_gantt_project_view_without_schedule(self):
+        """Test that CPM fields are opt-in."""
+        Task.objects.create(project=self.project, title='Task 1')
+        response = self.client.get(f'/api/projects/{self.project.id}/gantt/')
+        self.assertNotIn('critical_path', response.data)
+        self.assertNotIn('es', response.data['data'][0])
+
+    def test_gantt_project_view_compact(self):
+        """Test the columnar payload with day offsets."""
+        start = date(2025, 1, 1)
+        self.project.start_date = start
+        self.project.save()
+        parent = Task.objects.create(
+            project=self.project,
+            title='Parent',
+            start_date=start + timedelta(days=2),
+            end_date=start + timedelta(days=4),
+            progress=40
+        )
+        child = Task.objects.create(project=self.project, title='Child', parent=parent)
+        dep = Dependency.objects.create(predecessor=parent, successor=child, type='SS', lag_days=1)
+        response = self.client.get(f'/api/projects/{self.project.id}/gantt/?compact=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['base'], '2025-01-01')
+        self.assertEqual(response.data['ids'], [parent.id, child.id])
+        self.assertEqual(response.data['start'], [2, None])
+        self.assertEqual(response.data['end'], [4, None])
+        self.assertEqual(response.data['progress'], [40, 0])
+        self.assertEqual(response.data['parent'], [None, parent.id])
+        self.assertEqual(response.data['links'], {
+            'id': [dep.id], 'source': [parent.id], 'target': [child.id],
+            'type': ['SS'], 'lag': [1],
+        })
+
+    def test_gantt_project_view_etag(self):
+        """Test that an unchanged chart is served as 304."""
+        task = Task.objects.create(project=self.project, title='Task 1')
+        url = f'/api/projects/{self.project.id}/gantt/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        # projekt + dwa agregaty, bez ładowania zadań i zależności
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        # inny tryb ma inny ETag
+        compact = self.client.get(url + '?compact=1')
+        self.assertNotEqual(compact['ETag'], etag)
+        # zmiana zadania unieważnia ETag
+        task.title = 'Changed'
+        task.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        # usunięcie też
+        etag = response['ETag']
+        Task.objects.create(project=self.project, title='Task 2').delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        task.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,20 +1,31 @@
 from rest_framework import viewsets, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models.deletion import ProtectedError
+from django.http import StreamingHttpResponse
+from .cache import cached_response
+from .export import TABLES, iter_csv, iter_ndjson
+from .importer import FORMATS as IMPORT_FORMATS, ImportFailed, detect_format, import_project
 from .models import Project
-from .serializers import ProjectSerializer
+from .serializers import ProjectSerializer, ProjectValuesSerializer
 from .permissions import IsProjectOwnerOrReadOnly
+from tasks.changes import changes_since
+from tasks.models import Dependency
+from tasks.serializers import DependencySerializer, TaskSerializer
+from workly.search import FullTextSearchFilter
+from workly.values import ValuesListMixin
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ValuesListMixin, viewsets.ModelViewSet):
     permission_classes = [IsProjectOwnerOrReadOnly]
-    queryset = Project.objects.all()
+    queryset = Project.objects.with_task_stats()
     serializer_class = ProjectSerializer
+    values_serializer = ProjectValuesSerializer
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ["status", "priority", "owner"]
     search_fields = ["name", "description"]
@@ -28,6 +39,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
     ]
     ordering = ["-created_at"]
 
+    def retrieve(self, request, *args, **kwargs):
+        build = lambda: super(ProjectViewSet, self).retrieve(request, *args, **kwargs)
+        pk = self.kwargs["pk"]
+        if not pk.isdigit():
+            return build()
+        return cached_response(request, "project", int(pk), build)
+
     def destroy(self, request, *args, **kwargs):
         try:
             return super().destroy(request, *args, **kwargs)
@@ -36,3 +54,115 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 {"detail": "Nie można usunąć projektu, który ma przypięte zadania."},
                 status=status.HTTP_409_CONFLICT,
             )
+
+    @action(detail=True, methods=["get"])
+    def dependencies(self, request, pk=None):
+        """Zależności jednego projektu (filtr po indeksie zamiast całej tabeli)."""
+        project = self.get_object()
+        qs = Dependency.objects.filter(successor__project=project).order_by("id")
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(
+                DependencySerializer(page, many=True).data
+            )
+        return Response(DependencySerializer(qs, many=True).data)
+
+    @action(detail=True, methods=["get"])
+    def changes(self, request, pk=None):
+        """
+        Zadania i zależności zmienione po kursorze `?since=` (0 - wszystko),
+        usunięte jako tombstone'y. Klient zapamiętuje zwrócony `cursor`
+        i ponawia, dopóki `has_more`.
+        """
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = min(int(request.query_params.get("limit", 500)), 1000)
+        except ValueError:
+            return Response(
+                {"since": ["Kursor musi być liczbą."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        project = self.get_object()
+        tasks, deps, deleted_tasks, deleted_deps, cursor, has_more = changes_since(
+            project.pk, since=since, limit=max(limit, 1)
+        )
+        return Response(
+            {
+                "cursor": cursor,
+                "has_more": has_more,
+                "tasks": TaskSerializer(tasks, many=True).data,
+                "dependencies": DependencySerializer(deps, many=True).data,
+                "deleted": {"tasks": deleted_tasks, "dependencies": deleted_deps},
+            }
+        )
+
+    @action(detail=True, methods=["get"], url_path=r"export\.(?P<fmt>csv|ndjson)")
+    def export(self, request, pk=None, fmt=None):
+        """
+        Strumieniowy eksport projektu: CSV jednej tabeli (`?table=tasks`
+        albo `dependencies`) lub NDJSON z projektem, zadaniami i zależnościami.
+        """
+        project = self.get_object()
+        if fmt == "csv":
+            table = request.query_params.get("table", "tasks")
+            if table not in TABLES:
+                return Response(
+                    {"table": [f"Dozwolone wartości: {', '.join(TABLES)}."]},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            response = StreamingHttpResponse(
+                iter_csv(project, table), content_type="text/csv; charset=utf-8"
+            )
+            filename = f"project-{project.pk}-{table}.csv"
+        else:
+            response = StreamingHttpResponse(
+                iter_ndjson(project), content_type="application/x-ndjson"
+            )
+            filename = f"project-{project.pk}.ndjson"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def _import_source(self, request):
+        """(format, strumień) z uploadu `file` albo surowego ciała żądania."""
+        fmt = request.query_params.get("input")
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return None, None
+            return fmt or detect_format(filename=upload.name), upload
+        return fmt or detect_format(content_type=request.content_type), request.stream
+
+    def _run_import(self, request, project=None):
+        fmt, stream = self._import_source(request)
+        if fmt not in IMPORT_FORMATS or stream is None:
+            return Response(
+                {
+                    "detail": "Podaj plik CSV, NDJSON albo JSON Gantta "
+                    "(?input=csv|ndjson|gantt)."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            project, tasks, links = import_project(
+                fmt,
+                stream,
+                project=project,
+                owner=request.user,
+                name=request.query_params.get("name"),
+            )
+        except ImportFailed as e:
+            return Response({"errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"project": project.pk, "tasks": tasks, "dependencies": links},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_new(self, request):
+        """Import do nowego projektu (nazwa z `?name=` albo z rekordu projektu)."""
+        return self._run_import(request)
+
+    @action(detail=True, methods=["post"], url_path="import")
+    def import_into(self, request, pk=None):
+        """Import zadań i zależności do istniejącego projektu."""
+        return self._run_import(request, project=self.get_object())
@@ -0,0 +1,153 @@
+"""
+Cache odpowiedzi GET wersjonowany licznikiem projektu.
+
+Triggery SQLite podbijają `ProjectVersion.version` przy każdym INSERT,
+UPDATE i DELETE projektu, jego zadań i zależności - w tej samej transakcji
+co zapis, więc także dla `bulk_create`, `QuerySet.update` i zapisów z innych
+procesów. Klucz wpisu zawiera wersję: po zapisie stare wpisy przestają być
+trafiane i wygasają same (`RESPONSE_CACHE_TIMEOUT`), bez jawnego usuwania.
+
+Wersję czytamy przed zbudowaniem odpowiedzi: zapis w trakcie budowania
+zostawi wpis pod starą wersją, której nikt już nie zapyta.
+
+Wpisy trzymane są w aliasie cache `responses` (domyślnie `DatabaseCache`
+w tej samej bazie), więc współdzielą je wszystkie procesy robocze.
+Tak jak przy feedzie zmian (`tasks.changes`): migracja przebudowująca
+tabele musi ponownie wywołać `create_version_triggers`. Na innych bazach
+niż SQLite cache jest wyłączony.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from rest_framework.response import Response
+
+from .models import ProjectVersion
+
+CACHE_ALIAS = "responses"
+STATS_FLUSH = 100
+
+TRIGGERS = {
+    "projects_project": "{row}.id",
+    "tasks_task": "{row}.project_id",
+    "tasks_dependency": "(SELECT project_id FROM tasks_task WHERE id = {row}.successor_id)",
+}
+
+
+def _bump(project):
+    return (
+        f"INSERT INTO projects_projectversion (project_id, version) VALUES ({project}, 1) "
+        f"ON CONFLICT (project_id) DO UPDATE SET version = version + 1;"
+    )
+
+
+def create_version_triggers(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, project in TRIGGERS.items():
+        new = project.format(row="new")
+        old = project.format(row="old")
+        for sql in [
+            f"CREATE TRIGGER {table}_version_ai AFTER INSERT ON {table} "
+            f"BEGIN {_bump(new)} END",
+            f"CREATE TRIGGER {table}_version_au AFTER UPDATE ON {table} "
+            f"BEGIN {_bump(new)} END",
+            # przeniesienie do innego projektu zmienia też stary
+            f"CREATE TRIGGER {table}_version_am AFTER UPDATE ON {table} "
+            f"WHEN {old} IS NOT {new} BEGIN {_bump(old)} END",
+            f"CREATE TRIGGER {table}_version_ad AFTER DELETE ON {table} "
+            f"BEGIN {_bump(old)} END",
+        ]:
+            schema_editor.execute(sql)
+
+
+def drop_version_triggers(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in TRIGGERS:
+        for suffix in ("ai", "au", "am", "ad"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_version_{suffix}")
+
+
+def project_version(project_id):
+    """Bieżąca wersja projektu (0, jeśli nie było jeszcze zapisu)."""
+    return (
+        ProjectVersion.objects.filter(project_id=project_id)
+        .values_list("version", flat=True)
+        .first()
+        or 0
+    )
+
+
+class _Stats:
+    """
+    Liczniki trafień procesu, co `STATS_FLUSH` odczytów dopisywane
+    do wspólnych liczników w cache - jeden zapis na wiele żądań.
+    """
+
+    def __init__(self):
+        self.local = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, outcome):
+        with self.lock:
+            self.local[outcome] += 1
+            if sum(self.local.values()) < STATS_FLUSH:
+                return
+            pending, self.local = self.local, Counter()
+        self._flush(pending)
+
+    @staticmethod
+    def _flush(pending):
+        cache = caches[CACHE_ALIAS]
+        for outcome, n in pending.items():
+            key = f"stats:{outcome}"
+            if not cache.add(key, n, timeout=None):
+                cache.incr(key, n)
+
+    def totals(self):
+        with self.lock:
+            pending, self.local = self.local, Counter()
+        self._flush(pending)
+        cache = caches[CACHE_ALIAS]
+        hits = cache.get("stats:hit", 0)
+        misses = cache.get("stats:miss", 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+
+
+stats = _Stats()
+
+
+def cached_response(request, scope, project_id, build):
+    """
+    Odpowiedź `build()` z cache pod kluczem (zakres, projekt, wersja, URL).
+
+    Zapamiętywane są dane odpowiedzi 200 (nie wyrenderowane bajty), więc
+    negocjacja formatu działa jak bez cache. Nagłówek `X-Cache` mówi,
+    czy było trafienie.
+    """
+    if connection.vendor != "sqlite":
+        return build()
+    cache = caches[CACHE_ALIAS]
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    key = f"{scope}:{project_id}:{project_version(project_id)}:{url}"
+    data = cache.get(key)
+    if data is not None:
+        stats.record("hit")
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+    stats.record("miss")
+    response = build()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+    return response
@@ -0,0 +1,119 @@
+"""
+Strumieniowy eksport projektu do CSV i NDJSON.
+
+Wiersze czytane są przez `values_list(...).iterator(chunk_size=...)` i od
+razu zamieniane na tekst, a odpowiedź wysyłana porcjami
+(`StreamingHttpResponse`), więc zużycie pamięci nie zależy od liczby zadań.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from tasks.models import Dependency, Task
+
+CHUNK_SIZE = 2000
+
+PROJECT_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "status",
+    "priority",
+    "owner_id",
+    "start_date",
+    "end_date",
+    "created_at",
+    "updated_at",
+]
+TASK_FIELDS = [
+    "id",
+    "parent_id",
+    "title",
+    "description",
+    "assignee_id",
+    "status",
+    "start_date",
+    "end_date",
+    "progress",
+    "sort_index",
+    "estimated_hours",
+    "actual_hours",
+    "depth",
+    "created_at",
+    "updated_at",
+]
+DEPENDENCY_FIELDS = ["id", "predecessor_id", "successor_id", "type", "lag_days"]
+
+TABLES = {
+    "tasks": TASK_FIELDS,
+    "dependencies": DEPENDENCY_FIELDS,
+}
+
+
+def table_rows(project, table, chunk_size=CHUNK_SIZE):
+    """Krotki wierszy tabeli projektu w kolejności indeksu."""
+    if table == "tasks":
+        qs = Task.objects.filter(project=project).order_by("sort_index", "id")
+    else:
+        qs = Dependency.objects.filter(successor__project=project).order_by("id")
+    return qs.values_list(*TABLES[table]).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """Pseudo-plik dla csv.writer: `write` zwraca tekst zamiast go buforować."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(lines, size=CHUNK_SIZE):
+    """Łączy linie w porcje, żeby nie wysyłać osobnego kawałka na wiersz."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(project, table="tasks", chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    fields = TABLES[table]
+
+    def lines():
+        yield writer.writerow(fields)
+        for row in table_rows(project, table, chunk_size):
+            yield writer.writerow([_csv_value(v) for v in row])
+
+    return _chunks(lines(), chunk_size)
+
+
+def iter_ndjson(project, chunk_size=CHUNK_SIZE):
+    """
+    Projekt, potem jego zadania i zależności - jeden obiekt JSON na linię,
+    rodzaj rekordu w kluczu "record".
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def line(kind, fields, row):
+        return encoder.encode({"record": kind, **dict(zip(fields, row))}) + "\n"
+
+    def lines():
+        yield line(
+            "project", PROJECT_FIELDS, [getattr(project, f) for f in PROJECT_FIELDS]
+        )
+        for table, kind in (("tasks", "task"), ("dependencies", "dependency")):
+            for row in table_rows(project, table, chunk_size):
+                yield line(kind, TABLES[table], row)
+
+    return _chunks(lines(), chunk_size)
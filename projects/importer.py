@@ -0,0 +1,413 @@
+"""
+Hurtowy import projektu z CSV, NDJSON albo JSON w kształcie Gantta.
+
+Wejście czytane jest strumieniowo i sprowadzane do wspólnej postaci:
+zadania i zależności z kluczami zewnętrznymi (ID z pliku źródłowego).
+Cały graf - rodzice, krawędzie, cykle, poprawność pól - sprawdzany jest
+raz w pamięci, a dopiero potem zapisywany w jednej transakcji: zadania
+poziomami drzewa przez `bulk_create` (plus jeden UPDATE ścieżek na poziom),
+zależności przez `bulk_create`. Liczba zapytań zależy od liczby paczek,
+a nie od liczby wierszy.
+
+Obsługiwane formaty:
+
+- `ndjson` - format eksportu (`projects.export.iter_ndjson`),
+- `csv` - tabela zadań z eksportu (plus opcjonalnie tabela zależności),
+- `gantt` - `{"data": [...], "links": [...]}` jak w `GanttProjectView`.
+"""
+import codecs
+import csv
+import json
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max
+
+from tasks import tree
+from tasks.graph import DependencyGraph
+from tasks.models import Dependency, Task
+from tasks.ordering import SORT_STEP
+from tasks.signals import send_tasks_changed
+
+from .models import Project
+
+FORMATS = ("csv", "ndjson", "gantt")
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "gantt"}
+MEDIA_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/json": "gantt",
+}
+BATCH_SIZE = 1000
+MAX_ERRORS = 50
+
+TASK_FIELDS = [
+    "title",
+    "description",
+    "assignee_id",
+    "status",
+    "start_date",
+    "end_date",
+    "progress",
+    "estimated_hours",
+    "actual_hours",
+]
+PROJECT_FIELDS = ["name", "description", "status", "priority", "start_date", "end_date"]
+
+# typy krawędzi dhtmlxGantt zapisane liczbowo
+GANTT_LINK_TYPES = {"0": "FS", "1": "SS", "2": "FF", "3": "SF"}
+
+
+class ImportFailed(ValueError):
+    """Import odrzucony; `errors` to lista `{"line": n, "error": "..."}`."""
+
+    def __init__(self, errors):
+        super().__init__("Import odrzucony.")
+        self.errors = errors
+
+
+def detect_format(filename=None, content_type=None):
+    """Format z rozszerzenia pliku albo typu MIME; None, jeśli nieznany."""
+    if filename:
+        name = str(filename).lower()
+        return next((f for ext, f in EXTENSIONS.items() if name.endswith(ext)), None)
+    if content_type:
+        return MEDIA_TYPES.get(content_type.split(";")[0].strip())
+    return None
+
+
+def _key(value):
+    if value in (None, "", 0, "0"):
+        return None
+    return str(value)
+
+
+def _lines(stream):
+    """Linie tekstu ze strumienia bajtów (plik, upload, ciało żądania)."""
+    return codecs.iterdecode(stream, "utf-8-sig")
+
+
+def parse_ndjson(stream):
+    """Rekordy z linii NDJSON: (numer linii, rodzaj, słownik)."""
+    project = None
+    tasks, links = [], []
+    for number, line in enumerate(_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ImportFailed([{"line": number, "error": "Niepoprawny JSON."}])
+        if not isinstance(row, dict):
+            raise ImportFailed([{"line": number, "error": "Oczekiwano obiektu JSON."}])
+        record = row.pop("record", "task")
+        if record == "project":
+            project = row
+        elif record == "task":
+            tasks.append(_task_row(number, row))
+        elif record == "dependency":
+            links.append(_link_row(number, row))
+        else:
+            raise ImportFailed(
+                [{"line": number, "error": f"Nieznany rekord: {record}."}]
+            )
+    return project, tasks, links
+
+
+def parse_csv(stream, dependencies=None):
+    """Zadania z CSV (kolumny jak w eksporcie), zależności z opcjonalnego drugiego CSV."""
+    # numer linii to numer wiersza danych (nagłówek to linia 1)
+    tasks = [
+        _task_row(number, row)
+        for number, row in enumerate(csv.DictReader(_lines(stream)), start=2)
+    ]
+    links = []
+    if dependencies is not None:
+        links = [
+            _link_row(number, row)
+            for number, row in enumerate(csv.DictReader(_lines(dependencies)), start=2)
+        ]
+    return None, tasks, links
+
+
+def parse_gantt(stream):
+    """Dokument `{"data": [...], "links": [...]}`; numer linii to pozycja w tablicy."""
+    try:
+        doc = json.loads("".join(_lines(stream)))
+    except ValueError:
+        raise ImportFailed([{"line": 0, "error": "Niepoprawny JSON."}])
+    if not isinstance(doc, dict):
+        raise ImportFailed([{"line": 0, "error": "Oczekiwano obiektu JSON."}])
+    tasks = []
+    for number, row in _objects(doc, "data"):
+        progress = row.get("progress")
+        if progress not in (None, ""):
+            try:
+                # Gantt trzyma postęp jako ułamek 0-1
+                progress = round(float(progress) * 100)
+            except (TypeError, ValueError):
+                raise ImportFailed(
+                    [{"line": number, "error": "progress: Niepoprawna liczba."}]
+                )
+        tasks.append(
+            _task_row(
+                number,
+                {
+                    "id": row.get("id"),
+                    "parent_id": row.get("parent"),
+                    "title": row.get("text"),
+                    "start_date": row.get("start_date"),
+                    "end_date": row.get("end_date"),
+                    "progress": progress,
+                    "status": row.get("status"),
+                },
+            )
+        )
+    links = []
+    for number, row in _objects(doc, "links"):
+        link_type = str(row.get("type") or "FS")
+        links.append(
+            _link_row(
+                number,
+                {
+                    "predecessor_id": row.get("source"),
+                    "successor_id": row.get("target"),
+                    "type": GANTT_LINK_TYPES.get(link_type, link_type),
+                    "lag_days": row.get("lag"),
+                },
+            )
+        )
+    return None, tasks, links
+
+
+def _objects(doc, key):
+    """Pozycje tablicy `doc[key]` z numerami; każda musi być obiektem."""
+    rows = doc.get(key, [])
+    if not isinstance(rows, list):
+        raise ImportFailed([{"line": 0, "error": f"{key}: Oczekiwano tablicy."}])
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise ImportFailed(
+                [{"line": number, "error": f"{key}: Oczekiwano obiektu JSON."}]
+            )
+        yield number, row
+
+
+def _task_row(number, row):
+    data = {f: row.get(f) for f in TASK_FIELDS if row.get(f) not in (None, "")}
+    return {
+        "line": number,
+        "key": _key(row.get("id")),
+        "parent": _key(row.get("parent_id")),
+        "data": data,
+    }
+
+
+def _link_row(number, row):
+    return {
+        "line": number,
+        "predecessor": _key(row.get("predecessor_id")),
+        "successor": _key(row.get("successor_id")),
+        "type": row.get("type") or Dependency.Type.FS,
+        "lag_days": row.get("lag_days") or 0,
+    }
+
+
+def _clean_fields(model, data):
+    """Konwersja i walidacja wartości polami modelu; zwraca (dane, błąd)."""
+    cleaned = {}
+    for name, value in data.items():
+        field = model._meta.get_field(name)
+        try:
+            value = field.to_python(value)
+            if field.choices and value not in dict(field.flatchoices):
+                raise ValidationError(f"Niedozwolona wartość: {value}.")
+            field.run_validators(value)
+        except ValidationError as e:
+            return None, f"{name}: {' '.join(e.messages)}"
+        cleaned[name] = value
+    return cleaned, None
+
+
+def validate(tasks, links):
+    """
+    Sprawdza cały graf w pamięci. Zwraca (zadania poziomami, krawędzie);
+    rzuca ImportFailed z listą błędów.
+    """
+    errors = []
+
+    def error(line, message):
+        errors.append({"line": line, "error": message})
+        if len(errors) >= MAX_ERRORS:
+            raise ImportFailed(errors)
+
+    by_key = {}
+    # wiersze po _clean_fields; pozostałe mają surowe wartości
+    cleaned_rows = []
+    for index, row in enumerate(tasks):
+        if row["key"] is None:
+            row["key"] = f"#{index}"
+        if row["key"] in by_key:
+            error(row["line"], f"Powtórzony klucz zadania: {row['key']}.")
+            continue
+        by_key[row["key"]] = row
+        if not row["data"].get("title"):
+            error(row["line"], "title: To pole jest wymagane.")
+            continue
+        cleaned, message = _clean_fields(Task, row["data"])
+        if message:
+            error(row["line"], message)
+            continue
+        row["data"] = cleaned
+        cleaned_rows.append(row)
+        start, end = cleaned.get("start_date"), cleaned.get("end_date")
+        if start and end and end < start:
+            error(
+                row["line"],
+                "Data zakończenia nie może być wcześniejsza niż data rozpoczęcia.",
+            )
+
+    assignees = {
+        r["data"]["assignee_id"] for r in cleaned_rows if r["data"].get("assignee_id")
+    }
+    if assignees:
+        known = set(
+            get_user_model().objects.filter(pk__in=assignees).values_list("pk", flat=True)
+        )
+        for row in cleaned_rows:
+            if row["data"].get("assignee_id") not in (None, *known):
+                error(row["line"], f"Nie ma użytkownika {row['data']['assignee_id']}.")
+
+    # poziomy drzewa; zadania w cyklu rodziców nigdy nie trafiają do poziomu
+    children = defaultdict(list)
+    for row in by_key.values():
+        if row["parent"] is not None and row["parent"] not in by_key:
+            error(row["line"], f"Nie ma zadania nadrzędnego {row['parent']}.")
+        children[row["parent"]].append(row)
+    levels = []
+    level = children.get(None, [])
+    placed = 0
+    while level:
+        levels.append(level)
+        placed += len(level)
+        level = [child for row in level for child in children.get(row["key"], ())]
+    if placed < len(by_key) and not errors:
+        error(0, "Zadania nadrzędne tworzą cykl.")
+
+    edges = set()
+    valid_links = []
+    graph = DependencyGraph()
+    for row in links:
+        pred, succ = row["predecessor"], row["successor"]
+        if pred not in by_key or succ not in by_key:
+            error(row["line"], "Zależność wskazuje nieistniejące zadanie.")
+            continue
+        if pred == succ:
+            error(row["line"], "Zadanie nie może zależeć od samego siebie.")
+            continue
+        cleaned, message = _clean_fields(
+            Dependency, {"type": row["type"], "lag_days": row["lag_days"]}
+        )
+        if message:
+            error(row["line"], message)
+            continue
+        if (pred, succ, cleaned["type"]) in edges:
+            error(row["line"], "Taka zależność już istnieje.")
+            continue
+        edges.add((pred, succ, cleaned["type"]))
+        graph.add_edge(pred, succ)
+        row.update(cleaned)
+        valid_links.append(row)
+    try:
+        graph.topological_order()
+    except ValueError:
+        error(0, "Zależności tworzą cykl.")
+
+    if errors:
+        raise ImportFailed(errors)
+    return levels, valid_links
+
+
+@transaction.atomic
+def import_project(
+    fmt,
+    stream,
+    project=None,
+    owner=None,
+    name=None,
+    dependencies=None,
+    batch_size=BATCH_SIZE,
+):
+    """
+    Importuje zadania i zależności do `project` albo do nowego projektu
+    (z rekordu "project" w NDJSON albo o nazwie `name`, właściciel `owner`).
+    Zwraca (projekt, liczba zadań, liczba zależności).
+    """
+    if fmt == "ndjson":
+        project_row, tasks, links = parse_ndjson(stream)
+    elif fmt == "csv":
+        project_row, tasks, links = parse_csv(stream, dependencies)
+    elif fmt == "gantt":
+        project_row, tasks, links = parse_gantt(stream)
+    else:
+        raise ImportFailed([{"line": 0, "error": f"Nieznany format: {fmt}."}])
+
+    levels, links = validate(tasks, links)
+
+    if project is None:
+        project_row = project_row or {}
+        data = {f: project_row[f] for f in PROJECT_FIELDS if project_row.get(f) is not None}
+        if name:
+            data["name"] = name
+        if not data.get("name"):
+            raise ImportFailed([{"line": 0, "error": "Brak nazwy projektu."}])
+        cleaned, message = _clean_fields(Project, data)
+        if message:
+            raise ImportFailed([{"line": 0, "error": message}])
+        if Project.objects.filter(name=cleaned["name"]).exists():
+            raise ImportFailed(
+                [{"line": 0, "error": f"Projekt o nazwie {cleaned['name']} już istnieje."}]
+            )
+        project = Project.objects.create(owner=owner, **cleaned)
+
+    # kolejność jak w pliku, za istniejącymi zadaniami projektu
+    base = (
+        Task.objects.filter(project=project).aggregate(Max("sort_index"))[
+            "sort_index__max"
+        ]
+        or 0
+    )
+    order = {id(row): i for i, row in enumerate(tasks)}
+
+    created = {}
+    for depth, level in enumerate(levels):
+        batch = []
+        for row in level:
+            task = Task(
+                project=project,
+                parent_id=created[row["parent"]].pk if row["parent"] else None,
+                sort_index=base + SORT_STEP * (order[id(row)] + 1),
+                **row["data"],
+            )
+            created[row["key"]] = task
+            batch.append(task)
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+        # ścieżki znane są dopiero po nadaniu ID; rodzice mają je już ustawione
+        tree.fill_paths(Task.objects.filter(project=project, path=""), depth)
+
+    Dependency.objects.bulk_create(
+        [
+            Dependency(
+                predecessor_id=created[row["predecessor"]].pk,
+                successor_id=created[row["successor"]].pk,
+                type=row["type"],
+                lag_days=row["lag_days"],
+            )
+            for row in links
+        ],
+        batch_size=batch_size,
+    )
+    send_tasks_changed((t.assignee_id for t in created.values()), [project.pk])
+    return project, len(created), len(links)
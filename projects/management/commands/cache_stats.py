@@ -0,0 +1,23 @@
+"""
+Trafienia cache odpowiedzi API (`projects.cache`) zsumowane dla wszystkich
+procesów roboczych. Każdy proces dopisuje swoje liczniki co `STATS_FLUSH`
+odczytów, więc wynik może nie obejmować ostatnich żądań.
+
+Usage:
+    python manage.py cache_stats
+"""
+from django.core.management.base import BaseCommand
+
+from projects.cache import stats
+
+
+class Command(BaseCommand):
+    help = "Pokazuje trafienia i chybienia cache odpowiedzi API"
+
+    def handle(self, *args, **options):
+        totals = stats.totals()
+        rate = totals["hit_rate"]
+        self.stdout.write(
+            f"Trafienia: {totals['hits']}, chybienia: {totals['misses']}, "
+            f"skuteczność: {'-' if rate is None else f'{rate:.1%}'}"
+        )
@@ -0,0 +1,75 @@
+"""
+Hurtowy import projektu z pliku CSV, NDJSON albo JSON Gantta.
+
+Usage:
+    python manage.py import_workly export.ndjson --owner alice
+    python manage.py import_workly tasks.csv --name "Migracja" --dependencies deps.csv
+    python manage.py import_workly gantt.json --format gantt --project 3
+"""
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.importer import FORMATS, ImportFailed, detect_format, import_project
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Importuje zadania i zależności (CSV, NDJSON, JSON Gantta) w jednej transakcji"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Plik wejściowy")
+        parser.add_argument("--format", choices=FORMATS, help="Domyślnie z rozszerzenia pliku")
+        parser.add_argument("--project", type=int, help="ID istniejącego projektu")
+        parser.add_argument("--name", help="Nazwa nowego projektu")
+        parser.add_argument("--owner", help="Nazwa użytkownika właściciela nowego projektu")
+        parser.add_argument("--dependencies", help="CSV z zależnościami (tylko dla --format csv)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or detect_format(filename=path.name)
+        if fmt is None:
+            raise CommandError("Nie można ustalić formatu; podaj --format.")
+
+        project = owner = None
+        if options["project"]:
+            try:
+                project = Project.objects.get(pk=options["project"])
+            except Project.DoesNotExist:
+                raise CommandError(f"Nie ma projektu {options['project']}.")
+        if options["owner"]:
+            try:
+                owner = get_user_model().objects.get(username=options["owner"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Nie ma użytkownika {options['owner']}.")
+
+        started = time.perf_counter()
+        dependencies = open(options["dependencies"], "rb") if options["dependencies"] else None
+        try:
+            with path.open("rb") as stream:
+                project, tasks, links = import_project(
+                    fmt,
+                    stream,
+                    project=project,
+                    owner=owner,
+                    name=options["name"],
+                    dependencies=dependencies,
+                    batch_size=options["batch_size"],
+                )
+        except ImportFailed as e:
+            for err in e.errors:
+                self.stderr.write(f"linia {err['line']}: {err['error']}")
+            raise CommandError("Import odrzucony, nic nie zapisano.")
+        finally:
+            if dependencies:
+                dependencies.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Projekt {project.pk} ({project.name}): {tasks} zadań, "
+                f"{links} zależności w {time.perf_counter() - started:.1f} s"
+            )
+        )
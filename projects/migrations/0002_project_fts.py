@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from workly.search import create_fts_index, drop_fts_index
+
+
+def create_index(apps, schema_editor):
+    create_fts_index(schema_editor, "projects_project", ["name", "description"])
+
+
+def drop_index(apps, schema_editor):
+    drop_fts_index(schema_editor, "projects_project")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
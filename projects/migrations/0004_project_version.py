@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:06
+
+from django.db import migrations, models
+
+from projects.cache import create_version_triggers, drop_version_triggers
+
+
+def create_triggers(apps, schema_editor):
+    create_version_triggers(schema_editor)
+
+
+def drop_triggers(apps, schema_editor):
+    drop_version_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_created_idx'),
+        ('tasks', '0008_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectVersion',
+            fields=[
+                ('project_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Projekt')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Wersja')),
+            ],
+            options={
+                'verbose_name': 'Wersja projektu',
+                'verbose_name_plural': 'Wersje projektów',
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
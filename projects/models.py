@@ -6,6 +6,32 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+class ProjectQuerySet(models.QuerySet):
+    def with_task_stats(self):
+        """
+        Agregaty zadań liczone w tym samym zapytaniu co lista projektów.
+        Godziny i postęp tylko z liści - rodzice mają w nich roll-upy dzieci.
+        """
+        from tasks.models import Task
+        from tasks.rollup import leaf_q
+
+        leaf = leaf_q("tasks__")
+
+        status_counts = {
+            f"tasks_{value}_count": models.Count(
+                "tasks", filter=models.Q(tasks__status=value)
+            )
+            for value in Task.Status.values
+        }
+        return self.annotate(
+            tasks_count=models.Count("tasks"),
+            tasks_avg_progress=models.Avg("tasks__progress", filter=leaf),
+            tasks_estimated_hours=models.Sum("tasks__estimated_hours", filter=leaf),
+            tasks_actual_hours=models.Sum("tasks__actual_hours", filter=leaf),
+            **status_counts,
+        )
+
+
 class Project(models.Model):
     class Status(models.TextChoices):
         PLANNED = "planned", "Planowany"
@@ -52,8 +78,28 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data utworzenia")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Data aktualizacji")
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # domyślne sortowanie listy i pozycja kursora (created_at, id)
+            models.Index(fields=["created_at", "id"], name="project_created_idx"),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ProjectVersion(models.Model):
+    """
+    Licznik wersji danych projektu podbijany triggerami (`projects.cache`)
+    przy każdym zapisie projektu, jego zadań i zależności.
+    """
+
+    project_id = models.BigIntegerField(primary_key=True, verbose_name="Projekt")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Wersja")
+
+    class Meta:
+        verbose_name = "Wersja projektu"
+        verbose_name_plural = "Wersje projektów"
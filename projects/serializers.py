@@ -1,9 +1,25 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from workly.values import ValuesSerializer
 from .models import Project
 
 
+def _hours(value):
+    if value is None:
+        return None
+    return str(Decimal(value).quantize(Decimal("0.01")))
+
+
+def _task_statuses():
+    from tasks.models import Task
+
+    return Task.Status.values
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     tasks_count = serializers.SerializerMethodField()
+    task_stats = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
@@ -19,8 +35,36 @@ class ProjectSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "tasks_count",
+            "task_stats",
         ]
-        read_only_fields = ["created_at", "updated_at", "tasks_count"]
+        read_only_fields = ["created_at", "updated_at", "tasks_count", "task_stats"]
+
+    def _stats_source(self, obj):
+        # listy używają Project.objects.with_task_stats(); pojedyncze obiekty
+        # (np. po create/update) doliczają agregaty jednym zapytaniem
+        if not hasattr(obj, "tasks_count"):
+            annotated = Project.objects.with_task_stats().get(pk=obj.pk)
+            for key, value in annotated.__dict__.items():
+                if key.startswith("tasks_"):
+                    setattr(obj, key, value)
+        return obj
 
     def get_tasks_count(self, obj):
-        return obj.tasks.count()
+        return self._stats_source(obj).tasks_count
+
+    def get_task_stats(self, obj):
+        obj = self._stats_source(obj)
+        avg = obj.tasks_avg_progress
+        return {
+            "by_status": {
+                value: getattr(obj, f"tasks_{value}_count")
+                for value in _task_statuses()
+            },
+            "avg_progress": round(avg, 1) if avg is not None else None,
+            "estimated_hours": _hours(obj.tasks_estimated_hours),
+            "actual_hours": _hours(obj.tasks_actual_hours),
+        }
+
+
+# szybka ścieżka list (workly.values); agregaty z with_task_stats() są w wierszu
+ProjectValuesSerializer = ValuesSerializer(ProjectSerializer)
@@ -1,11 +1,27 @@
 """
 Tests for Projects API endpoints.
 """
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from datetime import date, timedelta
+from tasks.bulk import bulk_create_dependencies
+from tasks.events import ChangeFeedBroker, LocalBroker
+from tasks.models import Dependency, Task
+from .cache import project_version, stats as cache_stats
+from .export import iter_csv
 from .models import Project
 
 User = get_user_model()
@@ -238,6 +254,15 @@ class ProjectAPITestCase(TestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['name'], 'Python Project')
 
+    def test_search_projects_prefix(self):
+        """Test that project search matches word prefixes via the FTS index."""
+        Project.objects.create(name='Migracja danych', owner=self.user)
+        Project.objects.create(name='Kampania', description='Migrowanie treści', owner=self.user)
+        response = self.client.get('/api/projects/?search=migr')
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get('/api/projects/?search=migracja')
+        self.assertEqual([p['name'] for p in response.data['results']], ['Migracja danych'])
+
     def test_ordering_projects(self):
         """Test ordering projects."""
         project1 = Project.objects.create(
@@ -286,3 +311,400 @@ class ProjectAPITestCase(TestCase):
         response = self.client.get(f'/api/projects/{project.id}/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['tasks_count'], 2)
+
+    def test_task_stats_field(self):
+        """Test that per-project task aggregates are included."""
+        from tasks.models import Task
+        project = Project.objects.create(
+            name='Stats Project',
+            status='active',
+            priority=2,
+            owner=self.user
+        )
+        Task.objects.create(project=project, title='T1', status='todo',
+                            progress=20, estimated_hours=4, actual_hours=1)
+        Task.objects.create(project=project, title='T2', status='done',
+                            progress=100, estimated_hours='2.5')
+        response = self.client.get(f'/api/projects/{project.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['task_stats']
+        self.assertEqual(stats['by_status']['todo'], 1)
+        self.assertEqual(stats['by_status']['done'], 1)
+        self.assertEqual(stats['by_status']['blocked'], 0)
+        self.assertEqual(stats['avg_progress'], 60.0)
+        self.assertEqual(stats['estimated_hours'], '6.50')
+        self.assertEqual(stats['actual_hours'], '1.00')
+
+    def test_list_projects_constant_queries(self):
+        """Test that the project list does not issue a query per project."""
+        from tasks.models import Task
+        for i in range(10):
+            project = Project.objects.create(name=f'Project {i}', owner=self.user)
+            Task.objects.create(project=project, title='Task')
+        # COUNT(*) paginacji + jedna strona z agregatami
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(p['tasks_count'] == 1 for p in response.data['results']))
+
+    def test_cursor_pagination_by_created_at(self):
+        """Test that cursors on datetimes keep microseconds and lose no rows."""
+        for i in range(30):
+            Project.objects.create(name=f'Cursor {i}', owner=self.user)
+        expected = sorted(Project.objects.values_list('id', flat=True))
+        for url in ['/api/projects/?cursor=', '/api/projects/?ordering=created_at&cursor=']:
+            seen = []
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen.extend(p['id'] for p in response.data['results'])
+                url = response.data['next']
+            self.assertEqual(sorted(seen), expected)
+            self.assertEqual(len(seen), len(set(seen)))
+
+    def test_export_csv_streams_tasks(self):
+        """Test that tasks are streamed as CSV in index order."""
+        project = Project.objects.create(name='Export', owner=self.user)
+        first = Task.objects.create(project=project, title='Pierwsze, "cytat"', sort_index=1,
+                                    start_date=date(2025, 1, 1), estimated_hours=2)
+        Task.objects.create(project=project, title='Drugie', sort_index=2, parent=first)
+        response = self.client.get(f'/api/projects/{project.id}/export.csv/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ['id', 'parent_id', 'title'])
+        self.assertEqual(rows[1][2], 'Pierwsze, "cytat"')
+        self.assertEqual(rows[1][6], '2025-01-01')
+        self.assertEqual(rows[2][1], str(first.id))
+        self.assertEqual(len(rows), 3)
+
+        response = self.client.get(f'/api/projects/{project.id}/export.csv/?table=nope')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_ndjson(self):
+        """Test that NDJSON export emits the project, its tasks and dependencies."""
+        project = Project.objects.create(name='Export', owner=self.user)
+        a = Task.objects.create(project=project, title='A')
+        b = Task.objects.create(project=project, title='B')
+        Dependency.objects.create(predecessor=a, successor=b)
+        response = self.client.get(f'/api/projects/{project.id}/export.ndjson/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['record'] for line in lines], ['project', 'task', 'task', 'dependency'])
+        self.assertEqual(lines[0]['name'], 'Export')
+        self.assertEqual(lines[3]['predecessor_id'], a.id)
+        self.assertEqual(lines[3]['type'], 'FS')
+
+    def test_export_reads_in_chunks(self):
+        """Test that export memory stays flat: rows are fetched chunk by chunk."""
+        project = Project.objects.create(name='Export', owner=self.user)
+        Task.objects.bulk_create([Task(project=project, title=f'T{i}') for i in range(25)])
+        chunks = list(iter_csv(project, chunk_size=10))
+        # nagłówek + 25 wierszy w porcjach po 10 linii
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(c.count('\n') for c in chunks), 26)
+
+    def test_import_ndjson_round_trip(self):
+        """Test that an NDJSON export imports into a new project with tree and links."""
+        source = Project.objects.create(name='Źródło', owner=self.user)
+        root = Task.objects.create(project=source, title='Root', estimated_hours=3)
+        child = Task.objects.create(project=source, title='Child', parent=root, assignee=self.user)
+        other = Task.objects.create(project=source, title='Other')
+        Dependency.objects.create(predecessor=child, successor=other, type='SS', lag_days=2)
+        body = b''.join(self.client.get(f'/api/projects/{source.id}/export.ndjson/').streaming_content)
+
+        response = self.client.post('/api/projects/import/', body, content_type='application/x-ndjson')
+        # nazwa projektu jest unikalna
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            '/api/projects/import/?name=Kopia', body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['tasks'], response.data['dependencies']), (3, 1))
+        project = Project.objects.get(pk=response.data['project'])
+        self.assertEqual(project.name, 'Kopia')
+        self.assertEqual(project.owner, self.user)
+        new_child = Task.objects.get(project=project, title='Child')
+        self.assertEqual(new_child.parent.title, 'Root')
+        self.assertEqual(new_child.path, f'{new_child.parent_id:010d}/{new_child.id:010d}/')
+        self.assertEqual(new_child.assignee, self.user)
+        dep = Dependency.objects.get(successor__project=project)
+        self.assertEqual((dep.predecessor_id, dep.type, dep.lag_days), (new_child.id, 'SS', 2))
+
+    def test_import_gantt_into_existing_project(self):
+        """Test importing the Gantt JSON shape into an owned project."""
+        project = Project.objects.create(name='Cel', owner=self.user)
+        doc = {
+            'data': [
+                {'id': 10, 'text': 'A', 'start_date': '2025-01-01', 'end_date': '2025-01-03', 'progress': 0.5, 'parent': 0},
+                {'id': 11, 'text': 'B', 'parent': 10, 'status': 'done'},
+            ],
+            'links': [{'id': 1, 'source': 10, 'target': 11, 'type': '1', 'lag': 0}],
+        }
+        response = self.client.post(f'/api/projects/{project.id}/import/', doc, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        a = Task.objects.get(project=project, title='A')
+        self.assertEqual(a.progress, 50)
+        self.assertEqual(Task.objects.get(title='B').parent, a)
+        self.assertEqual(Dependency.objects.get(predecessor=a).type, 'SS')
+
+        other = Project.objects.create(name='Cudzy', owner=self.other_user)
+        response = self.client.post(f'/api/projects/{other.id}/import/', doc, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_rejects_invalid_graph_atomically(self):
+        """Test that a cycle or bad reference rejects the whole import."""
+        tasks_csv = b'id,parent_id,title,status\n1,,A,todo\n2,1,B,bogus\n3,9,C,todo\n'
+        deps_csv = b'predecessor_id,successor_id,type\n1,2,FS\n2,1,FS\n'
+        upload = io.BytesIO(tasks_csv)
+        upload.name = 'tasks.csv'
+        response = self.client.post('/api/projects/import/?name=X', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['line'] for e in response.data['errors']], [3, 4])
+        self.assertFalse(Project.objects.filter(name='X').exists())
+
+        from .importer import ImportFailed, import_project
+        with self.assertRaises(ImportFailed) as ctx:
+            import_project(
+                'csv', io.BytesIO(b'id,title\n1,A\n2,B\n'), name='Y',
+                dependencies=io.BytesIO(deps_csv),
+            )
+        self.assertEqual(ctx.exception.errors[0]['error'], 'Zależności tworzą cykl.')
+        self.assertFalse(Project.objects.filter(name='Y').exists())
+
+    def test_import_rejects_non_object_records(self):
+        """Test that JSON values other than objects are import errors, not 500s."""
+        project = Project.objects.create(name='Cel', owner=self.user)
+        body = b'{"title": "A"}\n[1]\n'
+        response = self.client.post(
+            '/api/projects/import/?name=Z', body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+        url = f'/api/projects/{project.id}/import/'
+        for doc, line in [
+            ([{'id': 1, 'text': 'A'}], 0),
+            ({'data': {'id': 1}}, 0),
+            ({'data': [{'id': 1, 'text': 'A'}, 'B']}, 2),
+            ({'data': [], 'links': [None]}, 1),
+        ]:
+            response = self.client.post(url, doc, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, doc)
+            self.assertEqual(response.data['errors'][0]['line'], line)
+        self.assertFalse(Project.objects.filter(name='Z').exists())
+        self.assertFalse(Task.objects.filter(project=project).exists())
+
+    def test_import_rejects_non_numeric_assignee(self):
+        """Test that a non-numeric assignee is a line error, not a 500."""
+        project = Project.objects.create(name='Cel', owner=self.user)
+        body = (
+            b'{"title": "A", "assignee_id": %d}\n'
+            b'{"title": "B", "assignee_id": "abc"}\n'
+            b'{"title": "C", "assignee_id": 999999}\n' % self.user.id
+        )
+        response = self.client.post(
+            f'/api/projects/{project.id}/import/', body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['line'] for e in response.data['errors']], [2, 3])
+        self.assertIn('Nie ma użytkownika 999999', response.data['errors'][1]['error'])
+        self.assertFalse(Task.objects.filter(project=project).exists())
+
+    def test_import_command_batches_queries(self):
+        """Test that the command loads a tree with a query count independent of row count."""
+        lines = ['id,parent_id,title']
+        for i in range(1, 301):
+            lines.append(f'{i},{(i - 1) // 10 if i > 10 else ""},T{i}')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('\n'.join(lines))
+        self.addCleanup(os.unlink, f.name)
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_workly', f.name, '--name', 'Masowy', '--owner', 'testuser', stdout=out)
+        # paczki INSERT ograniczone limitem parametrów SQLite, a nie wiersz po wierszu
+        self.assertLess(len(queries), 20)
+        self.assertIn('300 zadań', out.getvalue())
+        project = Project.objects.get(name='Masowy')
+        self.assertEqual(Task.objects.filter(project=project).count(), 300)
+        self.assertEqual(Task.objects.get(project=project, title='T300').depth, 2)
+
+    def test_change_feed(self):
+        """Test that the change feed returns only deltas since the cursor, with tombstones."""
+        project = Project.objects.create(name='Feed', owner=self.user)
+        other = Project.objects.create(name='Other feed', owner=self.user)
+        a = Task.objects.create(project=project, title='A')
+        b = Task.objects.create(project=project, title='B')
+        Task.objects.create(project=other, title='Elsewhere')
+        dep = Dependency.objects.create(predecessor=a, successor=b)
+
+        response = self.client.get(f'/api/projects/{project.id}/changes/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({t['title'] for t in response.data['tasks']}, {'A', 'B'})
+        self.assertEqual([d['id'] for d in response.data['dependencies']], [dep.id])
+        cursor = response.data['cursor']
+
+        # nic się nie zmieniło: pusta odpowiedź, ten sam kursor
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/projects/{project.id}/changes/?since={cursor}')
+        self.assertEqual((response.data['tasks'], response.data['cursor']), ([], cursor))
+
+        # zmiany hurtowe też trafiają do feedu
+        Task.objects.filter(pk=a.pk).update(title='A2')
+        dep_id = dep.id
+        dep.delete()
+        c = Task.objects.create(project=project, title='C')
+        response = self.client.get(f'/api/projects/{project.id}/changes/?since={cursor}')
+        self.assertEqual([t['title'] for t in response.data['tasks']], ['A2', 'C'])
+        self.assertEqual(response.data['deleted'], {'tasks': [], 'dependencies': [dep_id]})
+        cursor = response.data['cursor']
+
+        c.project = other
+        c.save()
+        response = self.client.get(f'/api/projects/{project.id}/changes/?since={cursor}')
+        self.assertEqual(response.data['deleted']['tasks'], [c.id])
+
+    def test_change_feed_pages(self):
+        """Test that the feed pages with has_more and a monotonic cursor."""
+        project = Project.objects.create(name='Feed', owner=self.user)
+        Task.objects.bulk_create([Task(project=project, title=f'T{i}') for i in range(5)])
+        first = self.client.get(f'/api/projects/{project.id}/changes/?limit=3')
+        self.assertTrue(first.data['has_more'])
+        second = self.client.get(
+            f'/api/projects/{project.id}/changes/?limit=3&since={first.data["cursor"]}'
+        )
+        self.assertFalse(second.data['has_more'])
+        self.assertGreater(second.data['cursor'], first.data['cursor'])
+        titles = [t['title'] for t in first.data['tasks'] + second.data['tasks']]
+        self.assertEqual(sorted(titles), [f'T{i}' for i in range(5)])
+
+    async def test_local_broker_fanout(self):
+        """Test that events reach every subscriber and overflow becomes a resync."""
+        broker = LocalBroker()
+        first, second, other = broker.subscribe(1), broker.subscribe(1), broker.subscribe(2)
+        await asyncio.to_thread(broker.notify, 1, {'kind': 'task', 'id': 5})
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {'kind': 'task', 'id': 5})
+        self.assertEqual(await asyncio.wait_for(second.get(), 1), {'kind': 'task', 'id': 5})
+        self.assertTrue(other.empty())
+        for i in range(first.maxsize + 1):
+            broker.publish(1, {'id': i})
+        await asyncio.sleep(0)
+        self.assertEqual(first.get_nowait(), {'resync': True})
+        self.assertTrue(first.empty())
+        for project_id, queue in ((1, first), (1, second), (2, other)):
+            broker.unsubscribe(project_id, queue)
+        self.assertEqual(dict(broker.subscribers), {})
+
+    async def test_change_feed_broker(self):
+        """Test that the change feed broker publishes rows written outside signals."""
+        project = await Project.objects.acreate(name='Broker', owner=self.user)
+        broker = ChangeFeedBroker()
+        broker.interval = 0.01
+        queue = broker.subscribe(project.id)
+        while broker.last is None:
+            await asyncio.sleep(0.01)
+        await Task.objects.abulk_create([Task(project=project, title='Hurt')])
+        event = await asyncio.wait_for(queue.get(), 2)
+        broker.unsubscribe(project.id, queue)
+        self.assertEqual((event['kind'], event['deleted']), ('task', False))
+        self.assertEqual(event['cursor'], broker.last)
+        await asyncio.wait_for(broker.poller, 1)
+
+    async def test_project_events_stream(self):
+        """Test that the SSE endpoint streams task changes of the project."""
+        project = await Project.objects.acreate(name='SSE', owner=self.user)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/api/projects/{project.id}/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertIn(b'event: ready', await anext(stream))
+
+        def create_task():
+            with self.captureOnCommitCallbacks(execute=True):
+                return Task.objects.create(project=project, title='Nowe')
+
+        task = await sync_to_async(create_task)()
+        chunk = await asyncio.wait_for(anext(stream), 2)
+        self.assertTrue(chunk.startswith(b'event: change\n'))
+        self.assertEqual(
+            json.loads(chunk.split(b'data: ')[1]),
+            {'kind': 'task', 'id': task.id, 'deleted': False},
+        )
+
+        def link_tasks():
+            other = Task.objects.create(project=project, title='Druga')
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_create_dependencies([{'predecessor': task.id, 'successor': other.id}])
+
+        # zapis hurtowy (bez post_save) też budzi klienta
+        await sync_to_async(link_tasks)()
+        chunks = []
+        while not chunks or not chunks[-1].startswith(b'event: resync\n'):
+            chunks.append(await asyncio.wait_for(anext(stream), 2))
+        await stream.aclose()
+
+        response = await self.async_client.get('/api/projects/999999/events/')
+        self.assertEqual(response.status_code, 404)
+        await self.async_client.alogout()
+        response = await self.async_client.get(f'/api/projects/{project.id}/events/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_project_events_requires_asgi(self):
+        """Test that the SSE endpoint refuses to stream under WSGI."""
+        project = Project.objects.create(name='SSE WSGI', owner=self.user)
+        self.client.force_login(self.user)
+        response = self.client.get(f'/api/projects/{project.id}/events/')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.streaming)
+
+    def test_response_cache_versioned_by_project(self):
+        """Test that project GETs are cached until any write bumps the version."""
+        project = Project.objects.create(name='Cache', owner=self.user)
+        other = Project.objects.create(name='Other', owner=self.user)
+        task = Task.objects.create(project=project, title='A')
+        before = cache_stats.totals()
+        urls = [
+            f'/api/projects/{project.id}/',
+            f'/api/tasks/?project={project.id}',
+            f'/api/projects/{project.id}/gantt/',
+        ]
+        for url in urls:
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'HIT')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(urls[0]).data['tasks_count'], 1)
+
+        # zapis innego projektu nie unieważnia
+        Task.objects.create(project=other, title='B')
+        self.assertEqual(self.client.get(urls[0])['X-Cache'], 'HIT')
+
+        # zapis hurtowy omija sygnały, ale podbija wersję triggerem
+        version = project_version(project.id)
+        Task.objects.filter(pk=task.pk).update(title='A2')
+        self.assertGreater(project_version(project.id), version)
+        response = self.client.get(urls[1])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'A2')
+
+        Task.objects.bulk_create([Task(project=project, title='C')])
+        self.assertEqual(self.client.get(urls[0]).data['tasks_count'], 2)
+        Dependency.objects.create(predecessor=task, successor=Task.objects.get(title='C'))
+        response = self.client.get(urls[2])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['links']), 1)
+
+        after = cache_stats.totals()
+        self.assertEqual(after['hits'] - before['hits'], 5)
+        self.assertEqual(after['misses'] - before['misses'], 6)
+
+    def test_cache_stats_command(self):
+        """Test that the cache_stats command reports shared hit/miss totals."""
+        project = Project.objects.create(name='Stats', owner=self.user)
+        before = cache_stats.totals()
+        url = f'/api/projects/{project.id}/'
+        self.client.get(url)
+        self.client.get(url)
+        out = io.StringIO()
+        call_command('cache_stats', stdout=out)
+        self.assertIn(f"Trafienia: {before['hits'] + 1}, chybienia: {before['misses'] + 1}", out.getvalue())
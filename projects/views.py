@@ -1,3 +1,64 @@
-from django.shortcuts import render
+"""
+Strumień zdarzeń projektu (server-sent events).
 
-# Create your views here.
+Widok jest asynchroniczny: pod serwerem ASGI otwarte połączenie czeka na
+kolejce brokera (`tasks.events`) i nie zajmuje wątku ani bazy. Po zdarzeniu
+klient pobiera szczegóły z `/api/projects/{id}/changes/`.
+
+Strumień wymaga serwera ASGI (np. `uvicorn workly.asgi:application`).
+Pod WSGI (`runserver`, gunicorn z workerami synchronicznymi) Django
+skonsumowałby cały nieskończony generator przed wysłaniem odpowiedzi
+i żądanie wisiałoby bez końca, więc widok odpowiada wtedy 503.
+"""
+import asyncio
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+
+from tasks.events import get_broker
+
+from .models import Project
+
+KEEPALIVE = 15
+RETRY_MS = 3000
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(project_id):
+    broker = get_broker()
+    queue = broker.subscribe(project_id)
+    try:
+        yield f"retry: {RETRY_MS}\n" + _event("ready", {"project": project_id})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                # komentarz podtrzymuje połączenie przez proxy
+                yield ": keepalive\n\n"
+                continue
+            yield _event("resync" if event.get("resync") else "change", event)
+    finally:
+        broker.unsubscribe(project_id, queue)
+
+
+async def project_events(request, pk):
+    """GET /api/projects/{id}/events/ - zmiany zadań i zależności projektu."""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Strumień zdarzeń wymaga serwera ASGI."}, status=503
+        )
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Nie podano danych uwierzytelniających."}, status=403
+        )
+    if not await Project.objects.filter(pk=pk).aexists():
+        raise Http404("Projekt nie istnieje.")
+    response = StreamingHttpResponse(_stream(pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
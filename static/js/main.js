@@ -2,15 +2,21 @@
 const API_BASE = '/api';
 
 async function apiRequest(url, options = {}) {
+    // revalidate: true - przeglądarka trzyma odpowiedź i odpytuje serwer
+    // z If-None-Match (ETag); niezmienione dane wracają jako 304 bez body
+    const { revalidate = false, ...fetchOptions } = options;
+    options = fetchOptions;
     const defaultOptions = {
         headers: {
             'Content-Type': 'application/json',
             'X-CSRFToken': getCookie('csrftoken'),
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
+            ...(revalidate ? {} : {
+                'Cache-Control': 'no-cache',
+                'Pragma': 'no-cache',
+            }),
         },
         credentials: 'same-origin',
-        cache: 'no-store', // Prevent caching completely
+        cache: revalidate ? 'no-cache' : 'no-store', // revalidate: always ask the server (ETag/304); otherwise bypass the cache completely
     };
     
     const response = await fetch(`${API_BASE}${url}`, {
@@ -140,9 +146,45 @@ function getPriorityBadge(priority) {
     return `<span class="badge ${p.class}">${p.label}</span>`;
 }
 
+// Feed zmian projektu: zwraca nowy kursor, zmienione i usunięte obiekty
+async function projectChanges(projectId, since = 0) {
+    const result = { cursor: since, tasks: [], dependencies: [], deleted: { tasks: [], dependencies: [] } };
+    let page;
+    do {
+        page = await apiRequest(`/projects/${projectId}/changes/?since=${result.cursor}`);
+        result.cursor = page.cursor;
+        result.tasks.push(...page.tasks);
+        result.dependencies.push(...page.dependencies);
+        result.deleted.tasks.push(...page.deleted.tasks);
+        result.deleted.dependencies.push(...page.deleted.dependencies);
+    } while (page.has_more);
+    return result;
+}
+
+// Subskrypcja zdarzeń projektu (SSE); po zdarzeniu dociąga feed zmian
+function watchProject(projectId, since, onChanges) {
+    const source = new EventSource(`/api/projects/${projectId}/events/`);
+    let cursor = since;
+    let pending = null;
+    const refresh = () => {
+        if (pending) return;
+        pending = setTimeout(async () => {
+            pending = null;
+            const changes = await projectChanges(projectId, cursor);
+            cursor = changes.cursor;
+            onChanges(changes);
+        }, 200);
+    };
+    source.addEventListener('change', refresh);
+    source.addEventListener('resync', refresh);
+    return source;
+}
+
 // Export for use in other scripts
 window.WorklyAPI = {
     request: apiRequest,
+    projectChanges,
+    watchProject,
     formatDate,
     getStatusBadge,
     getPriorityBadge,
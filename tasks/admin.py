@@ -17,7 +17,7 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ("project", "status", "assignee")
     search_fields = ("title", "description")
     autocomplete_fields = ("project", "parent", "assignee")
-    ordering = ("project", "sort_index", "id")
+    ordering = ("project_id", "sort_index", "id")
 
 
 @admin.register(Dependency)
@@ -1,24 +1,48 @@
 from django.db import transaction
-from django.db.models import Max
 from django.db.models.deletion import ProtectedError
 from django_filters.rest_framework import DjangoFilterBackend
+from projects.cache import cached_response
 from projects.models import Project
+from workly.search import FullTextSearchFilter
+from workly.values import ValuesListMixin
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Dependency, Task
-from .serializers import DependencySerializer, TaskSerializer
+from . import tree
+from .bulk import apply_task_batch, bulk_create_dependencies, copy_subtree
+from .filters import DependencyFilter
+from .serializers import (
+    DependencyBulkItemSerializer,
+    DependencySerializer,
+    TaskBatchSerializer,
+    TaskSerializer,
+    TaskValuesSerializer,
+)
+from .ordering import move_task, next_sort_index
 from .permissions import IsAssigneeOrProjectOwnerOrReadOnly
+from .rollup import ROLLUP_FIELDS, rollup_ancestors
+from .scheduling import propagate_from
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+def _batch_id(value):
+    """ID zadania z pozycji paczki (liczba albo napis z cyframi), inaczej None."""
+    if isinstance(value, str) and value.isdecimal():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and 0 < value < 2**63:
+        return value
+    return None
+
+
+class TaskViewSet(ValuesListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAssigneeOrProjectOwnerOrReadOnly]
     queryset = Task.objects.select_related("project", "assignee", "parent").all()
     serializer_class = TaskSerializer
+    values_serializer = TaskValuesSerializer
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ["project", "status", "assignee", "parent"]
     search_fields = ["title", "description"]
@@ -30,7 +54,58 @@ class TaskViewSet(viewsets.ModelViewSet):
         "id",
         "title",
     ]
-    ordering = ["project", "sort_index", "id"]
+    ordering = ["project_id", "sort_index", "id"]
+
+    def list(self, request, *args, **kwargs):
+        # lista jednego projektu (?project=) z cache wersjonowanego projektem
+        build = lambda: super(TaskViewSet, self).list(request, *args, **kwargs)
+        project = request.query_params.get("project", "")
+        if not project.isdigit():
+            return build()
+        return cached_response(request, "tasks", int(project), build)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            project = serializer.validated_data["project"]
+            task = serializer.save(sort_index=next_sort_index(project.pk))
+            rollup_ancestors([task.path])
+
+    def perform_update(self, serializer):
+        old = serializer.instance
+        old_dates = (old.start_date, old.end_date)
+        old_path = old.path
+        old_rollup = [getattr(old, f) for f in ROLLUP_FIELDS]
+        with transaction.atomic():
+            task = serializer.save()
+            self.rescheduled = []
+            if (task.start_date, task.end_date) != old_dates and (
+                self.request.query_params.get("propagate") not in ("0", "false")
+            ):
+                # przesuń tylko podgraf następników zmienionego zadania
+                self.rescheduled = propagate_from(task)
+
+            # roll-up tylko łańcuchów przodków zmienionych zadań
+            paths = []
+            if old_path != task.path or old_rollup != [
+                getattr(task, f) for f in ROLLUP_FIELDS
+            ]:
+                paths += [old_path, task.path]
+            if self.rescheduled:
+                paths += Task.objects.filter(pk__in=self.rescheduled).values_list(
+                    "path", flat=True
+                )
+            rollup_ancestors(paths)
+
+    def perform_destroy(self, instance):
+        path = instance.path
+        with transaction.atomic():
+            instance.delete()
+            rollup_ancestors([path])
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response.data["rescheduled"] = getattr(self, "rescheduled", [])
+        return response
 
     def destroy(self, request, *args, **kwargs):
         try:
@@ -61,60 +136,210 @@ class TaskViewSet(viewsets.ModelViewSet):
         if target_parent_id:
             target_parent = Task.objects.get(pk=target_parent_id)
 
-        @transaction.atomic
-        def perform_copy():
-            def next_sort_index(project):
-                return (
-                    Task.objects.filter(project=project).aggregate(Max("sort_index"))[
-                        "sort_index__max"
-                    ]
-                    or 0
-                ) + 10
-
-            def clone_one(source_task, parent_override, project_override, root=False):
-                title = new_title if (root and new_title) else source_task.title
-                clone = Task.objects.create(
-                    project=project_override,
-                    parent=parent_override,
-                    title=(
-                        title
-                        if not root
-                        else (new_title or f"Kopia: {source_task.title}")
-                    ),
-                    description=source_task.description,
-                    assignee=source_task.assignee,
-                    status=source_task.status,
-                    start_date=source_task.start_date,
-                    end_date=source_task.end_date,
-                    progress=source_task.progress,
-                    sort_index=next_sort_index(project_override),
-                    estimated_hours=source_task.estimated_hours,
-                    actual_hours=None,  # reset metryk wykonania
+        new_task = copy_subtree(
+            src,
+            target_project,
+            parent=target_parent,
+            title=new_title,
+            include_children=include_children,
+            include_dependencies=bool(request.data.get("include_dependencies", False)),
+        )
+        rollup_ancestors([new_task.path])
+        serializer = self.get_serializer(new_task)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        """
+        Przenosi zadanie przed `before` albo za `after` (ID zadań z tego samego
+        projektu; bez nich - na koniec) i opcjonalnie zmienia `parent`.
+
+        Zwykle zmienia się tylko jeden wiersz; gdy w `sort_index` brakuje
+        przerwy, przenumerowywane jest lokalne okno sąsiadów (`rebalanced`).
+        """
+        task = self.get_object()
+        refs = {}
+        for key in ("before", "after", "parent"):
+            value = request.data.get(key)
+            if value in (None, ""):
+                continue
+            ref = Task.objects.filter(pk=value, project_id=task.project_id).first()
+            if ref is None or ref.pk == task.pk:
+                return Response(
+                    {key: ["Zadanie musi być innym zadaniem z tego samego projektu."]},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
-                return clone
+            refs[key] = ref
+        if "before" in refs and "after" in refs:
+            return Response(
+                {"detail": "Podaj tylko jedno z pól: before lub after."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            # korzeń
-            new_root = clone_one(src, target_parent, target_project, root=True)
+        set_parent = "parent" in request.data
+        parent = refs.get("parent")
+        # rodzic nie może leżeć w poddrzewie przenoszonego zadania
+        if parent is not None and parent.path.startswith(task.path):
+            return Response(
+                {"parent": ["Zadanie nie może być przeniesione pod własne poddrzewo."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            # rekurencyjnie dzieci (jeśli trzeba)
-            if include_children:
+        old_path = task.path
+        with transaction.atomic():
+            rebalanced = move_task(
+                task,
+                before=refs.get("before"),
+                after=refs.get("after"),
+                parent=parent,
+                set_parent=set_parent,
+            )
+            if task.path != old_path:
+                rollup_ancestors([old_path, task.path])
+        data = dict(self.get_serializer(task).data)
+        data["rebalanced"] = rebalanced
+        return Response(data)
 
-                def clone_children(src_parent, dst_parent):
-                    for ch in src_parent.children.all().order_by("sort_index", "id"):
-                        ch_clone = clone_one(ch, dst_parent, target_project)
-                        clone_children(ch, ch_clone)
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Paczka operacji na zadaniach: lista (lub {"operations": [...]}) pozycji
+        {"op": "create", "data": {...}}, {"op": "update", "id": 1, "data": {...}}
+        i {"op": "delete", "id": 1}.
 
-                clone_children(src, new_root)
-            return new_root
+        Uprawnienia sprawdzane są raz na projekt, a całość zapisywana
+        `bulk_create`/`bulk_update` w jednej transakcji. Jeśli którakolwiek
+        pozycja jest błędna, nic nie jest zapisywane (400 z błędami pozycji).
+        """
+        operations = request.data
+        if isinstance(operations, dict):
+            operations = operations.get("operations")
+        if not isinstance(operations, list):
+            return Response(
+                {"detail": "Oczekiwano listy operacji."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        new_task = perform_copy()
-        serializer = self.get_serializer(new_task)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        u = request.user
+        ids = {_batch_id(op.get("id")) for op in operations if isinstance(op, dict)}
+        ids.discard(None)
+        existing = Task.objects.select_related("project").in_bulk(ids)
+        project_access = {}
+
+        def can_edit(task):
+            if task.project_id not in project_access:
+                project_access[task.project_id] = (
+                    u.is_staff or u.is_superuser or task.project.owner_id == u.id
+                )
+            return project_access[task.project_id] or task.assignee_id == u.id
+
+        creates, updates, deletes = [], [], []
+        plan = []
+        errors = []
+        seen = set()
+        for index, op in enumerate(operations):
+            kind = op.get("op") if isinstance(op, dict) else None
+            error = None
+            if kind == "create":
+                serializer = TaskBatchSerializer(data=op.get("data") or {})
+                if serializer.is_valid():
+                    plan.append((index, kind, len(creates)))
+                    creates.append(serializer.validated_data)
+                else:
+                    error = serializer.errors
+            elif kind in ("update", "delete"):
+                pk = _batch_id(op.get("id"))
+                task = existing.get(pk)
+                if pk is None:
+                    error = {"id": ["Oczekiwano liczbowego ID zadania."]}
+                elif task is None:
+                    error = {"detail": "Nie znaleziono zadania."}
+                elif task.pk in seen:
+                    error = {"detail": "Zadanie występuje w paczce więcej niż raz."}
+                elif not can_edit(task):
+                    error = {"detail": "Brak uprawnień do zadania."}
+                elif kind == "delete":
+                    seen.add(task.pk)
+                    plan.append((index, kind, task.pk))
+                    deletes.append(task.pk)
+                else:
+                    seen.add(task.pk)
+                    serializer = TaskBatchSerializer(
+                        task, data=op.get("data") or {}, partial=True
+                    )
+                    if serializer.is_valid():
+                        plan.append((index, kind, len(updates)))
+                        updates.append((task, serializer.validated_data))
+                    else:
+                        error = serializer.errors
+            else:
+                error = {"op": ["Nieznana operacja (create/update/delete)."]}
+            if error:
+                errors.append({"index": index, "errors": error})
+
+        if not errors:
+            # przeniesienia razem nie mogą utworzyć cyklu (A pod B i B pod A)
+            moves = {
+                task.pk: data["parent"] for task, data in updates if "parent" in data
+            }
+            cycles = tree.reparent_cycles(moves)
+            for index, kind, position in plan:
+                if kind == "update" and updates[position][0].pk in cycles:
+                    errors.append(
+                        {
+                            "index": index,
+                            "errors": {
+                                "parent": [
+                                    "Przeniesienia w paczce tworzą cykl w drzewie zadań."
+                                ]
+                            },
+                        }
+                    )
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        old_paths = [task.path for task, _ in updates] + [
+            existing[pk].path for pk in deletes
+        ]
+        try:
+            with transaction.atomic():
+                created, updated = apply_task_batch(creates, updates, deletes)
+                rollup_ancestors(
+                    old_paths + [t.path for t in created] + [t.path for t in updated]
+                )
+        except ProtectedError:
+            return Response(
+                {
+                    "detail": "Nie można usunąć zadania, które jest powiązane zależnościami."
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        results = []
+        for index, kind, ref in plan:
+            if kind == "delete":
+                results.append({"index": index, "op": kind, "id": ref})
+            else:
+                task = created[ref] if kind == "create" else updated[ref]
+                results.append(
+                    {
+                        "index": index,
+                        "op": kind,
+                        "id": task.pk,
+                        "data": TaskSerializer(task).data,
+                    }
+                )
+        return Response({"results": results})
 
 
 class DependencyViewSet(viewsets.ModelViewSet):
     queryset = Dependency.objects.select_related("predecessor", "successor", "predecessor__project", "successor__project").all()
     serializer_class = DependencySerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = DependencyFilter
+    ordering_fields = ["id", "created_at", "lag_days"]
+    ordering = ["id"]
 
     def get_permissions(self):
         from .permissions import IsDependencyProjectOwnerOrReadOnly
@@ -136,3 +361,49 @@ class DependencyViewSet(viewsets.ModelViewSet):
             else:
                 error_dict = {'__all__': [str(e)]}
             raise DRFValidationError(error_dict)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Hurtowe tworzenie zależności: lista krawędzi (lub {"dependencies": [...]}).
+
+        Cała paczka jest sprawdzana jednym przebiegiem po grafie projektu,
+        poprawne krawędzie zapisywane są w jednej transakcji, a dla
+        odrzuconych zwracane są błędy z indeksem pozycji.
+        """
+        payload = request.data
+        if isinstance(payload, dict):
+            payload = payload.get("dependencies")
+        if not isinstance(payload, list):
+            return Response(
+                {"detail": "Oczekiwano listy zależności."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        valid_items = []
+        indexes = []
+        errors = []
+        for index, raw in enumerate(payload):
+            item = DependencyBulkItemSerializer(data=raw)
+            if item.is_valid():
+                valid_items.append(item.validated_data)
+                indexes.append(index)
+            else:
+                errors.append({"index": index, "errors": item.errors})
+
+        created, plan_errors = bulk_create_dependencies(valid_items, user=request.user)
+        for error in plan_errors:
+            error["index"] = indexes[error["index"]]
+        errors = sorted(errors + plan_errors, key=lambda e: e["index"])
+
+        return Response(
+            {
+                "created": DependencySerializer(created, many=True).data,
+                "errors": errors,
+            },
+            status=(
+                status.HTTP_201_CREATED
+                if created or not errors
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
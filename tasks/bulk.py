@@ -0,0 +1,297 @@
+"""
+Hurtowa walidacja i zapis zależności.
+
+Wszystkie krawędzie z paczki są sprawdzane jednym przebiegiem względem grafu
+projektu (zadania i istniejące krawędzie ładowane po jednym zapytaniu),
+a poprawne zapisywane przez `bulk_create`.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .graph import DependencyGraph
+from . import tree
+from .models import Dependency, Task
+from .ordering import SORT_STEP, last_sort_indexes
+from .signals import send_tasks_changed
+
+
+def plan_dependencies(items, user=None):
+    """
+    Sprawdza listę krawędzi (słowniki predecessor/successor/type/lag_days).
+
+    Zwraca krotkę (nowe obiekty Dependency, błędy, ID ich projektów), gdzie
+    błędy to lista `{"index": i, "errors": {...}}` dla odrzuconych pozycji. Jeśli podano
+    `user`, wymagane jest bycie właścicielem projektu (lub staff).
+    """
+    task_ids = {i["predecessor"] for i in items} | {i["successor"] for i in items}
+    tasks = {
+        row[0]: row
+        for row in Task.objects.filter(pk__in=task_ids).values_list(
+            "id", "project_id", "project__owner_id"
+        )
+    }
+    project_ids = {row[1] for row in tasks.values()}
+
+    graphs = defaultdict(DependencyGraph)
+    existing = set()
+    for pred_id, succ_id, dep_type, project_id in Dependency.objects.filter(
+        successor__project_id__in=project_ids
+    ).values_list("predecessor_id", "successor_id", "type", "successor__project_id"):
+        graphs[project_id].add_edge(pred_id, succ_id)
+        existing.add((pred_id, succ_id, dep_type))
+
+    is_admin = user is not None and (user.is_staff or user.is_superuser)
+    to_create = []
+    errors = []
+    touched = set()
+    for index, item in enumerate(items):
+        pred_id, succ_id = item["predecessor"], item["successor"]
+        dep_type = item.get("type") or Dependency.Type.FS
+        error = None
+        if pred_id not in tasks or succ_id not in tasks:
+            error = {"__all__": ["Zadanie nie istnieje."]}
+        elif pred_id == succ_id:
+            error = {"__all__": ["Zadanie nie może zależeć od samego siebie."]}
+        elif tasks[pred_id][1] != tasks[succ_id][1]:
+            error = {
+                "__all__": [
+                    "Oba zadania w zależności muszą należeć do tego samego projektu."
+                ]
+            }
+        elif user is not None and not is_admin and tasks[succ_id][2] != user.id:
+            error = {"__all__": ["Brak uprawnień do projektu."]}
+        elif (pred_id, succ_id, dep_type) in existing:
+            error = {"__all__": ["Taka zależność już istnieje."]}
+        else:
+            graph = graphs[tasks[succ_id][1]]
+            if graph.would_create_cycle(pred_id, succ_id):
+                error = {"__all__": ["Dodanie tej zależności spowodowałoby cykl."]}
+            else:
+                graph.add_edge(pred_id, succ_id)
+                existing.add((pred_id, succ_id, dep_type))
+                touched.add(tasks[succ_id][1])
+                to_create.append(
+                    Dependency(
+                        predecessor_id=pred_id,
+                        successor_id=succ_id,
+                        type=dep_type,
+                        lag_days=item.get("lag_days") or 0,
+                    )
+                )
+        if error:
+            errors.append({"index": index, "errors": error})
+    return to_create, errors, touched
+
+
+@transaction.atomic
+def bulk_create_dependencies(items, user=None, batch_size=500):
+    """Waliduje paczkę krawędzi i zapisuje poprawne w jednej transakcji."""
+    to_create, errors, project_ids = plan_dependencies(items, user=user)
+    created = Dependency.objects.bulk_create(to_create, batch_size=batch_size)
+    send_tasks_changed((), project_ids)
+    return created, errors
+
+COPY_FIELDS = [
+    "id",
+    "parent_id",
+    "title",
+    "description",
+    "assignee_id",
+    "status",
+    "start_date",
+    "end_date",
+    "progress",
+    "sort_index",
+    "estimated_hours",
+]
+
+
+def _load_subtree(src):
+    """
+    Wiersze poddrzewa `src` (łącznie z nim) poziomami, w kolejności
+    (sort_index, id). Poddrzewo czytane jest jednym zapytaniem zakresowym
+    po zmaterializowanej ścieżce.
+    """
+    rows = src.get_descendants(include_self=True).values(*COPY_FIELDS)
+    children = defaultdict(list)
+    by_id = {}
+    for row in rows:
+        by_id[row["id"]] = row
+        children[row["parent_id"]].append(row)
+    for siblings in children.values():
+        siblings.sort(key=lambda r: (r["sort_index"], r["id"]))
+
+    levels = [[by_id[src.pk]]]
+    while True:
+        level = [ch for row in levels[-1] for ch in children.get(row["id"], ())]
+        if not level:
+            return levels, children
+        levels.append(level)
+
+
+@transaction.atomic
+def copy_subtree(
+    src,
+    project,
+    parent=None,
+    title=None,
+    include_children=False,
+    include_dependencies=False,
+    batch_size=500,
+):
+    """
+    Kopiuje zadanie (opcjonalnie z całym poddrzewem i jego wewnętrznymi
+    zależnościami) do `project` pod `parent`.
+
+    Zakres `sort_index` alokowany jest raz, a każdy poziom drzewa zapisywany
+    jednym `bulk_create`. Zwraca skopiowany korzeń.
+    """
+    if include_children:
+        levels, children = _load_subtree(src)
+    else:
+        levels = [[{f: getattr(src, f) for f in COPY_FIELDS}]]
+        children = {}
+
+    # kolejność sort_index jak w oryginale: przejście pre-order
+    order = []
+    stack = [levels[0][0]]
+    while stack:
+        row = stack.pop()
+        order.append(row["id"])
+        stack.extend(reversed(children.get(row["id"], ())))
+    base = (
+        Task.objects.filter(project=project).aggregate(Max("sort_index"))[
+            "sort_index__max"
+        ]
+        or 0
+    )
+    sort_index = {
+        src_id: base + SORT_STEP * (i + 1) for i, src_id in enumerate(order)
+    }
+
+    clones = {}
+    for depth, level in enumerate(levels):
+        batch = []
+        for row in level:
+            root = depth == 0
+            clone = Task(
+                project=project,
+                parent_id=(
+                    (parent.pk if parent else None)
+                    if root
+                    else clones[row["parent_id"]].pk
+                ),
+                title=(title or f"Kopia: {row['title']}") if root else row["title"],
+                description=row["description"],
+                assignee_id=row["assignee_id"],
+                status=row["status"],
+                start_date=row["start_date"],
+                end_date=row["end_date"],
+                progress=row["progress"],
+                sort_index=sort_index[row["id"]],
+                estimated_hours=row["estimated_hours"],
+                actual_hours=None,  # reset metryk wykonania
+            )
+            clones[row["id"]] = clone
+            batch.append(clone)
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+
+    # ścieżki drzewa znane są dopiero po nadaniu ID; jeden zapis dla całej kopii
+    parent_paths = {parent.pk: parent.path} if parent else {}
+    Task.objects.bulk_update(
+        tree.assign_paths(list(clones.values()), parent_paths),
+        ["path", "depth"],
+        batch_size=batch_size,
+    )
+
+    if include_dependencies and len(clones) > 1:
+        # tylko krawędzie wewnątrz poddrzewa; podzapytanie zakresowe po ścieżce
+        # zamiast listy ID (limit parametrów SQLite przy dużych poddrzewach)
+        subtree_ids = src.get_descendants(include_self=True).values("id")
+        edges = Dependency.objects.filter(
+            successor_id__in=subtree_ids, predecessor_id__in=subtree_ids
+        ).values_list("predecessor_id", "successor_id", "type", "lag_days")
+        Dependency.objects.bulk_create(
+            [
+                Dependency(
+                    predecessor_id=clones[pred_id].pk,
+                    successor_id=clones[succ_id].pk,
+                    type=dep_type,
+                    lag_days=lag,
+                )
+                for pred_id, succ_id, dep_type, lag in edges
+                if pred_id in clones and succ_id in clones
+            ],
+            batch_size=batch_size,
+        )
+
+    send_tasks_changed(
+        (c.assignee_id for c in clones.values()), {c.project_id for c in clones.values()}
+    )
+    return clones[src.pk]
+
+
+@transaction.atomic
+def apply_task_batch(creates=(), updates=(), deletes=(), batch_size=500):
+    """
+    Zapisuje zwalidowaną paczkę zmian zadań w jednej transakcji.
+
+    `creates` to słowniki validated_data, `updates` pary (zadanie, validated_data),
+    `deletes` lista ID. Zwraca (utworzone, zaktualizowane). ProtectedError przy
+    usuwaniu wycofuje całą paczkę. Nowe zadania bez `sort_index` trafiają
+    na koniec projektu, w kolejności paczki.
+    """
+    pending = [data for data in creates if "sort_index" not in data]
+    if pending:
+        last = last_sort_indexes({data["project"].pk for data in pending})
+        creates = list(creates)
+        for i, data in enumerate(creates):
+            if "sort_index" not in data:
+                last[data["project"].pk] += SORT_STEP
+                creates[i] = {**data, "sort_index": last[data["project"].pk]}
+    created = Task.objects.bulk_create(
+        [Task(**data) for data in creates], batch_size=batch_size
+    )
+    if created:
+        parent_paths = {t.parent_id: t.parent.path for t in created if t.parent_id}
+        Task.objects.bulk_update(
+            tree.assign_paths(created, parent_paths),
+            ["path", "depth"],
+            batch_size=batch_size,
+        )
+
+    updated = []
+    reparented = []
+    fields = set()
+    users = {t.assignee_id for t in created}
+    now = timezone.now()
+    for task, data in updates:
+        users.add(task.assignee_id)
+        if "parent" in data and getattr(data["parent"], "pk", None) != task.parent_id:
+            reparented.append(task)
+        for attr, value in data.items():
+            setattr(task, attr, value)
+        task.updated_at = now
+        fields.update(data)
+        updated.append(task)
+    if updated:
+        Task.objects.bulk_update(
+            updated,
+            sorted(fields) + ["updated_at"],
+            batch_size=batch_size,
+        )
+    for task in reparented:
+        # ścieżka sprzed paczki mogła się zmienić przy przeniesieniu przodka
+        task.path, task.depth = (
+            Task.objects.filter(pk=task.pk).values_list("path", "depth").get()
+        )
+        task.sync_path()
+    users.update(t.assignee_id for t in updated)
+    send_tasks_changed(users, {t.project_id for t in created + updated})
+
+    if deletes:
+        Task.objects.filter(pk__in=deletes).delete()
+    return created, updated
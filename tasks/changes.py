@@ -0,0 +1,92 @@
+"""
+Feed zmian projektu z tombstone'ami.
+
+Triggery SQLite na `tasks_task` i `tasks_dependency` po każdym INSERT,
+UPDATE i DELETE zastępują wiersz obiektu w `tasks_change` nowym. Dzięki
+AUTOINCREMENT jego `id` rośnie monotonicznie i nigdy się nie powtarza,
+a że SQLite szereguje transakcje zapisujące, kolejność `id` to kolejność
+commitów. Triggery obejmują też `bulk_create`, `bulk_update` i
+`QuerySet.update`. Tabela ma najwyżej jeden wiersz na obiekt (plus
+tombstone'y usuniętych), więc nie rośnie z liczbą zapisów.
+
+Tak jak przy indeksie FTS (`workly.search`): migracja przebudowująca
+tabelę zadań lub zależności musi ponownie wywołać
+`create_change_triggers`.
+"""
+from .models import Change, Dependency, Task
+
+TRIGGERS = {
+    "tasks_task": ("task", "{row}.project_id"),
+    "tasks_dependency": (
+        "dependency",
+        "(SELECT project_id FROM tasks_task WHERE id = {row}.successor_id)",
+    ),
+}
+
+
+def _record(kind, project, row, deleted):
+    return (
+        f"DELETE FROM tasks_change WHERE project_id = {project} "
+        f"AND kind = '{kind}' AND object_id = {row}.id; "
+        f"INSERT INTO tasks_change (project_id, kind, object_id, deleted) "
+        f"VALUES ({project}, '{kind}', {row}.id, {deleted});"
+    )
+
+
+def create_change_triggers(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, (kind, project) in TRIGGERS.items():
+        new = project.format(row="new")
+        old = project.format(row="old")
+        for sql in [
+            f"CREATE TRIGGER {table}_change_ai AFTER INSERT ON {table} "
+            f"BEGIN {_record(kind, new, 'new', 0)} END",
+            f"CREATE TRIGGER {table}_change_au AFTER UPDATE ON {table} "
+            f"BEGIN {_record(kind, new, 'new', 0)} END",
+            # przeniesienie do innego projektu: tombstone w starym
+            f"CREATE TRIGGER {table}_change_am AFTER UPDATE ON {table} "
+            f"WHEN {old} IS NOT {new} BEGIN {_record(kind, old, 'old', 1)} END",
+            f"CREATE TRIGGER {table}_change_ad AFTER DELETE ON {table} "
+            f"BEGIN {_record(kind, old, 'old', 1)} END",
+        ]:
+            schema_editor.execute(sql)
+
+
+def drop_change_triggers(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in TRIGGERS:
+        for suffix in ("ai", "au", "am", "ad"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_change_{suffix}")
+
+
+def changes_since(project_id, since=0, limit=500):
+    """
+    Zmiany projektu po kursorze `since`: (aktualne zadania, aktualne
+    zależności, ID usuniętych zadań, ID usuniętych zależności, nowy kursor,
+    czy jest więcej). Trzy zapytania niezależnie od rozmiaru projektu.
+    """
+    rows = list(
+        Change.objects.filter(project_id=project_id, id__gt=since)
+        .order_by("id")
+        .values_list("id", "kind", "object_id", "deleted")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    ids = {(kind, deleted): [] for kind in Change.Kind.values for deleted in (False, True)}
+    for _, kind, object_id, deleted in rows:
+        ids[kind, deleted].append(object_id)
+
+    task_ids = ids[Change.Kind.TASK, False]
+    dep_ids = ids[Change.Kind.DEPENDENCY, False]
+    tasks = list(Task.objects.filter(pk__in=task_ids)) if task_ids else []
+    deps = list(Dependency.objects.filter(pk__in=dep_ids)) if dep_ids else []
+    return (
+        tasks,
+        deps,
+        ids[Change.Kind.TASK, True],
+        ids[Change.Kind.DEPENDENCY, True],
+        rows[-1][0] if rows else since,
+        has_more,
+    )
@@ -0,0 +1,172 @@
+"""
+Powiadomienia o zmianach zadań i zależności dla otwartych stron (SSE).
+
+Broker rozsyła zdarzenia do subskrybentów projektu przez kolejki asyncio,
+więc bezczynny widz to jedno połączenie i czekająca kolejka - bez zapytań.
+Zdarzenie mówi tylko, co się zmieniło (`kind`, `id`, `deleted`); dane
+klient dociąga feedem `/api/projects/{id}/changes/`.
+
+Broker wybiera ustawienie `WORKLY_EVENT_BROKER`:
+
+- `LocalBroker` (domyślny) - zdarzenia z sygnałów `post_save`/`post_delete`
+  i `tasks_changed` (zapisy hurtowe: paczki, przeniesienia, propagacja dat,
+  roll-upy, kopiowanie, import) w tym samym procesie,
+- `ChangeFeedBroker` - dla wielu procesów roboczych: każdy proces czyta
+  nowe wiersze dziennika zmian (`tasks.changes`) jednym zapytaniem na
+  interwał, tylko gdy ma subskrybentów. Obejmuje też zapisy z innych
+  procesów.
+
+Zapis hurtowy nie mówi, które wiersze zmienił, więc jego zdarzeniem jest
+`resync` - klient pobiera feed od swojego kursora.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Change, Dependency, Task
+from .signals import tasks_changed
+
+QUEUE_SIZE = 100
+RESYNC = {"resync": True}
+
+
+class LocalBroker:
+    """Pub/sub w procesie; `publish` można wołać z dowolnego wątku."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, project_id, event):
+        with self.lock:
+            targets = list(self.subscribers.get(project_id, ()))
+        for subscriber in targets:
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # pętla zamknięta bez wypisania się (np. zabity worker)
+                self._discard(project_id, subscriber)
+
+    def notify(self, project_id, event):
+        """Zdarzenie z sygnału modelu."""
+        self.publish(project_id, event)
+
+    @staticmethod
+    def _put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # wolny klient: zamiast zaległych zdarzeń jedno "pobierz feed"
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def subscribe(self, project_id):
+        """Kolejka zdarzeń projektu; wywołać w pętli asyncio odbiorcy."""
+        queue = asyncio.Queue(QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[project_id].add((asyncio.get_running_loop(), queue))
+        self.subscribed(project_id)
+        return queue
+
+    def unsubscribe(self, project_id, queue):
+        self._discard(project_id, (asyncio.get_running_loop(), queue))
+
+    def _discard(self, project_id, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[project_id]
+
+    def subscribed(self, project_id):
+        """Punkt rozszerzenia wywoływany po dodaniu subskrybenta."""
+
+
+class ChangeFeedBroker(LocalBroker):
+    """
+    Broker dla wielu procesów: źródłem zdarzeń jest dziennik zmian w bazie,
+    a nie sygnały, więc widzi zapisy z innych procesów i ścieżek hurtowych.
+    """
+
+    interval = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self.poller = None
+        self.last = None
+
+    def notify(self, project_id, event):
+        # zmianę i tak odczyta poller z dziennika; bez duplikatów
+        pass
+
+    def subscribed(self, project_id):
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.get_running_loop().create_task(self.poll())
+
+    async def poll(self):
+        self.last = await sync_to_async(self._last_id)()
+        while self.subscribers:
+            rows = await sync_to_async(self._fetch)(self.last, list(self.subscribers))
+            for seq, project_id, kind, object_id, deleted in rows:
+                self.last = seq
+                self.publish(
+                    project_id,
+                    {"cursor": seq, "kind": kind, "id": object_id, "deleted": deleted},
+                )
+            await asyncio.sleep(self.interval)
+
+    @staticmethod
+    def _last_id():
+        return Change.objects.aggregate(last=Max("id"))["last"] or 0
+
+    @staticmethod
+    def _fetch(last, project_ids):
+        return list(
+            Change.objects.filter(id__gt=last, project_id__in=project_ids)
+            .order_by("id")
+            .values_list("id", "project_id", "kind", "object_id", "deleted")[:1000]
+        )
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    path = getattr(settings, "WORKLY_EVENT_BROKER", "tasks.events.LocalBroker")
+    return import_string(path)()
+
+
+def _notify(project_id, kind, pk, deleted):
+    event = {"kind": kind, "id": pk, "deleted": deleted}
+    # po zatwierdzeniu transakcji - wycofana zmiana nie wywoła odświeżenia
+    transaction.on_commit(lambda: get_broker().notify(project_id, event))
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_event(sender, instance, **kwargs):
+    _notify(instance.project_id, "task", instance.pk, "created" not in kwargs)
+
+
+@receiver([post_save, post_delete], sender=Dependency)
+def dependency_event(sender, instance, **kwargs):
+    _notify(
+        instance.successor.project_id, "dependency", instance.pk, "created" not in kwargs
+    )
+
+
+@receiver(tasks_changed)
+def bulk_event(sender, project_ids=(), **kwargs):
+    for project_id in project_ids:
+        transaction.on_commit(
+            lambda project_id=project_id: get_broker().notify(project_id, RESYNC)
+        )
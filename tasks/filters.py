@@ -0,0 +1,13 @@
+import django_filters
+
+from .models import Dependency
+
+
+class DependencyFilter(django_filters.FilterSet):
+    # zależność zawsze łączy zadania z jednego projektu, więc filtr po
+    # projekcie następnika idzie po indeksie tasks_task.project_id
+    project = django_filters.NumberFilter(field_name="successor__project")
+
+    class Meta:
+        model = Dependency
+        fields = ["project", "predecessor", "successor", "type"]
@@ -0,0 +1,87 @@
+"""
+Graf zależności projektu trzymany w pamięci.
+
+Krawędzie projektu są ładowane jednym zapytaniem do listy sąsiedztwa,
+a pytania w stylu "czy ta krawędź utworzy cykl?" są rozstrzygane w O(V+E)
+bez kolejnych zapytań do bazy.
+"""
+from collections import defaultdict, deque
+
+
+class DependencyGraph:
+    """Skierowany graf zależności: predecessor -> successor."""
+
+    def __init__(self, edges=()):
+        self.successors = defaultdict(set)
+        self.predecessors = defaultdict(set)
+        for predecessor_id, successor_id in edges:
+            self.add_edge(predecessor_id, successor_id)
+
+    @classmethod
+    def for_project(cls, project_id, exclude_ids=()):
+        """Ładuje wszystkie krawędzie projektu jednym zapytaniem."""
+        from .models import Dependency
+
+        qs = Dependency.objects.filter(successor__project_id=project_id)
+        if exclude_ids:
+            qs = qs.exclude(pk__in=exclude_ids)
+        return cls(qs.values_list("predecessor_id", "successor_id"))
+
+    def add_edge(self, predecessor_id, successor_id):
+        self.successors[predecessor_id].add(successor_id)
+        self.predecessors[successor_id].add(predecessor_id)
+
+    def has_path(self, source_id, target_id):
+        """Czy istnieje ścieżka source -> ... -> target (iteracyjny BFS)."""
+        if source_id == target_id:
+            return True
+        visited = {source_id}
+        queue = deque([source_id])
+        while queue:
+            node = queue.popleft()
+            for nxt in self.successors.get(node, ()):
+                if nxt == target_id:
+                    return True
+                if nxt not in visited:
+                    visited.add(nxt)
+                    queue.append(nxt)
+        return False
+
+    def would_create_cycle(self, predecessor_id, successor_id):
+        """Krawędź pred -> succ zamyka cykl, jeśli succ już prowadzi do pred."""
+        return self.has_path(successor_id, predecessor_id)
+
+    def descendants(self, node_id):
+        """Wszystkie zadania osiągalne z node_id (bez niego samego)."""
+        seen = set()
+        queue = deque([node_id])
+        while queue:
+            node = queue.popleft()
+            for nxt in self.successors.get(node, ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        seen.discard(node_id)
+        return seen
+
+    def topological_order(self, nodes=()):
+        """
+        Porządek topologiczny (algorytm Kahna).
+
+        `nodes` pozwala dołączyć węzły bez krawędzi. Rzuca ValueError, jeśli
+        graf zawiera cykl.
+        """
+        all_nodes = set(nodes) | set(self.successors) | set(self.predecessors)
+        in_degree = {n: len(self.predecessors.get(n, ())) for n in all_nodes}
+        queue = deque(sorted(n for n, d in in_degree.items() if d == 0))
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for nxt in self.successors.get(node, ()):
+                in_degree[nxt] -= 1
+                if in_degree[nxt] == 0:
+                    queue.append(nxt)
+        if len(order) != len(all_nodes):
+            raise ValueError("Graf zależności zawiera cykl.")
+        return order
@@ -0,0 +1,74 @@
+"""
+Porównanie rendererów API na ładunkach wykresu Gantta i listy zadań.
+
+Usage:
+    python manage.py bench_renderers --project 3
+    python manage.py bench_renderers --project 3 --tasks 1000 --repeat 10
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from gantt.api import GanttProjectView
+from projects.models import Project
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from workly.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+
+
+class Command(BaseCommand):
+    help = "Mierzy czas i rozmiar renderowania JSON (json, orjson) i MessagePack"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, required=True, help="ID projektu")
+        parser.add_argument(
+            "--tasks", type=int, default=None, help="Liczba zadań listy (domyślnie wszystkie)"
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options["project"])
+        except Project.DoesNotExist:
+            raise CommandError("Projekt nie istnieje.")
+
+        tasks = (
+            Task.objects.filter(project=project)
+            .select_related("project", "assignee", "parent")
+            .order_by("sort_index", "id")
+        )
+        if options["tasks"]:
+            tasks = tasks[: options["tasks"]]
+        view = GanttProjectView()
+        payloads = {
+            "gantt": view.payload(project, False),
+            "gantt compact": view.compact_payload(project, False),
+            "lista zadań": TaskSerializer(tasks, many=True).data,
+        }
+        renderers = {"json (DRF)": JSONRenderer(), "orjson": ORJSONRenderer()}
+        if msgpack is not None:
+            renderers["msgpack"] = MessagePackRenderer()
+        else:
+            self.stdout.write("msgpack nie jest zainstalowany - pomijam MessagePack")
+
+        for name, data in payloads.items():
+            self.stdout.write(f"\n{name}")
+            baseline = None
+            for label, renderer in renderers.items():
+                elapsed, size = self.measure(renderer, data, options["repeat"])
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"  {label:<12} {elapsed * 1000:9.1f} ms  {size / 1024:9.1f} KiB"
+                    f"  x{baseline / elapsed:.1f}"
+                )
+
+    @staticmethod
+    def measure(renderer, data, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = renderer.render(data)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(body)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('tasks', '0004_alter_dependency_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['project_id', 'sort_index', 'id'], 'verbose_name': 'Zadanie', 'verbose_name_plural': 'Zadania'},
+        ),
+        migrations.AddIndex(
+            model_name='dependency',
+            index=models.Index(fields=['successor', 'predecessor', 'type', 'lag_days'], name='dependency_successor_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'sort_index', 'id'], name='task_project_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'start_date', 'end_date'], name='task_assignee_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status'], name='task_assignee_status_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    parents = dict(Task.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def path_of(task_id):
+        if task_id not in paths:
+            parent_id = parents[task_id]
+            prefix = path_of(parent_id) if parent_id else ""
+            paths[task_id] = prefix + f"{task_id:010d}/"
+        return paths[task_id]
+
+    tasks = []
+    for task_id in parents:
+        path = path_of(task_id)
+        tasks.append(Task(id=task_id, path=path, depth=path.count("/") - 1))
+    Task.objects.bulk_update(tasks, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('tasks', '0005_task_dependency_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Poziom zagnieżdżenia'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1024, verbose_name='Ścieżka'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['path'], name='task_path_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from workly.search import create_fts_index, drop_fts_index
+
+
+def create_index(apps, schema_editor):
+    create_fts_index(schema_editor, "tasks_task", ["title", "description"])
+
+
+def drop_index(apps, schema_editor):
+    drop_fts_index(schema_editor, "tasks_task")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+from tasks.changes import create_change_triggers, drop_change_triggers
+
+
+def fill_changes(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Dependency = apps.get_model("tasks", "Dependency")
+    Change = apps.get_model("tasks", "Change")
+    Change.objects.bulk_create(
+        [
+            Change(project_id=project_id, kind="task", object_id=pk)
+            for pk, project_id in Task.objects.order_by("id").values_list("id", "project_id")
+        ]
+        + [
+            Change(project_id=project_id, kind="dependency", object_id=pk)
+            for pk, project_id in Dependency.objects.order_by("id").values_list(
+                "id", "successor__project_id"
+            )
+        ],
+        batch_size=500,
+    )
+
+
+def create_triggers(apps, schema_editor):
+    create_change_triggers(schema_editor)
+
+
+def drop_triggers(apps, schema_editor):
+    drop_change_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.BigIntegerField(verbose_name='Projekt')),
+                ('kind', models.CharField(choices=[('task', 'Zadanie'), ('dependency', 'Zależność')], max_length=10, verbose_name='Rodzaj')),
+                ('object_id', models.BigIntegerField(verbose_name='ID obiektu')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Usunięty')),
+            ],
+            options={
+                'verbose_name': 'Zmiana',
+                'verbose_name_plural': 'Zmiany',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['project_id', 'id'], name='change_project_seq_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project_id', 'kind', 'object_id'), name='uniq_change_object')],
+            },
+        ),
+        migrations.RunPython(fill_changes, migrations.RunPython.noop),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from itertools import groupby
+
+from django.db import migrations
+
+SORT_STEP = 10
+
+
+def spread_sort_index(apps, schema_editor):
+    """
+    Projekty z powtórzonymi indeksami (np. same zera sprzed alokacji przy
+    tworzeniu) dostają indeksy co SORT_STEP w dotychczasowej kolejności,
+    żeby pierwsze przesunięcie nie przenumerowywało całej listy.
+    """
+    Task = apps.get_model("tasks", "Task")
+    rows = (
+        Task.objects.order_by("project_id", "sort_index", "id")
+        .values_list("project_id", "id", "sort_index")
+        .iterator(chunk_size=2000)
+    )
+    changed = []
+    for _, project_rows in groupby(rows, key=lambda row: row[0]):
+        project_rows = list(project_rows)
+        values = [row[2] for row in project_rows]
+        if len(set(values)) == len(values):
+            continue
+        changed.extend(
+            Task(pk=pk, sort_index=SORT_STEP * (i + 1))
+            for i, (_, pk, value) in enumerate(project_rows)
+            if value != SORT_STEP * (i + 1)
+        )
+    Task.objects.bulk_update(changed, ["sort_index"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_sort_index, migrations.RunPython.noop),
+    ]
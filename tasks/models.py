@@ -3,6 +3,8 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
 from projects.models import Project
 from django.core.exceptions import ValidationError
+from .graph import DependencyGraph
+from . import tree
 
 User = get_user_model()
 
@@ -85,13 +87,39 @@ class Task(models.Model):
         verbose_name="Rzeczywiste godziny",
     )
 
+    # zmaterializowana ścieżka drzewa (zob. tasks.tree), utrzymywana w save()
+    path = models.CharField(
+        max_length=1024, blank=True, default="", editable=False, verbose_name="Ścieżka"
+    )
+    depth = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Poziom zagnieżdżenia"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Data utworzenia")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Data aktualizacji")
 
     class Meta:
         verbose_name = "Zadanie"
         verbose_name_plural = "Zadania"
-        ordering = ["project", "sort_index", "id"]
+        # project_id, a nie project: "project" sortowałoby po Project.Meta.ordering
+        # (join + sortowanie w temp B-tree zamiast odczytu z indeksu)
+        ordering = ["project_id", "sort_index", "id"]
+        indexes = [
+            # lista zadań projektu w domyślnym porządku (bez sortowania w temp B-tree)
+            models.Index(
+                fields=["project", "sort_index", "id"], name="task_project_sort_idx"
+            ),
+            # "moje zadania": sortowanie po starcie i okno czasowe
+            # (start_date <= koniec AND end_date >= początek) - indeks pokrywający
+            models.Index(
+                fields=["assignee", "start_date", "end_date"],
+                name="task_assignee_dates_idx",
+            ),
+            # podsumowania po statusie dla użytkownika
+            models.Index(fields=["assignee", "status"], name="task_assignee_status_idx"),
+            # poddrzewo jako zakres ścieżek
+            models.Index(fields=["path"], name="task_path_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -102,6 +130,33 @@ class Task(models.Model):
             return max((self.end_date - self.start_date).days, 0)
         return None
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.sync_path()
+
+    def sync_path(self):
+        """Aktualizuje path/depth po wstawieniu lub zmianie rodzica."""
+        ids = tree.path_ids(self.path)
+        parent_from_path = ids[-2] if len(ids) > 1 else None
+        if ids and ids[-1] == self.pk and parent_from_path == self.parent_id:
+            return
+        parent_path = ""
+        if self.parent_id:
+            parent_path = (
+                Task.objects.filter(pk=self.parent_id).values_list("path", flat=True).get()
+            )
+        tree.move_subtree(self, parent_path)
+
+    def get_descendants(self, include_self=False):
+        """Poddrzewo jednym zapytaniem zakresowym po indeksie ścieżki."""
+        return tree.subtree(self.path, include_self=include_self)
+
+    def get_ancestors(self):
+        """Przodkowie od korzenia (ID wynikają ze ścieżki)."""
+        return Task.objects.filter(pk__in=tree.path_ids(self.path)[:-1]).order_by(
+            "depth"
+        )
+
 
 # --- Model zależności między zadaniami ---
 class Dependency(models.Model):
@@ -138,6 +193,13 @@ class Dependency(models.Model):
         verbose_name = "Zależność"
         verbose_name_plural = "Zależności"
         ordering = ["id"]
+        indexes = [
+            # krawędzie projektu (join po successor -> project) bez sięgania do tabeli
+            models.Index(
+                fields=["successor", "predecessor", "type", "lag_days"],
+                name="dependency_successor_cov_idx",
+            ),
+        ]
         constraints = [
             # zakaz duplikatów: ten sam łuk + typ tylko raz
             models.UniqueConstraint(
@@ -165,24 +227,47 @@ class Dependency(models.Model):
                 raise ValidationError(
                     "Oba zadania w zależności muszą należeć do tego samego projektu."
                 )
-            # Walidacja cykli zależności
-            # Sprawdź, czy successor nie jest pośrednio poprzednikiem predecessor
-            visited = set()
-
-            def dfs(task):
-                if task.id in visited:
-                    return False
-                visited.add(task.id)
-                for dep in Dependency.objects.filter(predecessor=task):
-                    if dep.successor_id == self.predecessor_id:
-                        return True
-                    if dfs(dep.successor):
-                        return True
-                return False
-
-            if dfs(self.successor):
+            # Walidacja cykli zależności: cały graf projektu jednym zapytaniem,
+            # a przeszukiwanie w pamięci (bez zapytania na każdy węzeł)
+            graph = DependencyGraph.for_project(
+                self.successor.project_id,
+                exclude_ids=[self.pk] if self.pk else (),
+            )
+            if graph.would_create_cycle(self.predecessor_id, self.successor_id):
                 raise ValidationError("Dodanie tej zależności spowodowałoby cykl.")
 
     def save(self, *args, **kwargs):
         self.full_clean()
         return super().save(*args, **kwargs)
+
+
+# --- Dziennik zmian (feed synchronizacji) ---
+class Change(models.Model):
+    """
+    Ostatnia zmiana zadania lub zależności w projekcie. Wiersze utrzymują
+    triggery bazy (`tasks.changes`), a rosnące `id` jest kursorem feedu.
+    Każdy obiekt ma w projekcie co najwyżej jeden wiersz; usunięcie
+    zostawia wiersz z `deleted=True` (tombstone).
+    """
+
+    class Kind(models.TextChoices):
+        TASK = "task", "Zadanie"
+        DEPENDENCY = "dependency", "Zależność"
+
+    project_id = models.BigIntegerField(verbose_name="Projekt")
+    kind = models.CharField(max_length=10, choices=Kind.choices, verbose_name="Rodzaj")
+    object_id = models.BigIntegerField(verbose_name="ID obiektu")
+    deleted = models.BooleanField(default=False, verbose_name="Usunięty")
+
+    class Meta:
+        verbose_name = "Zmiana"
+        verbose_name_plural = "Zmiany"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["project_id", "id"], name="change_project_seq_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project_id", "kind", "object_id"], name="uniq_change_object"
+            ),
+        ]
@@ -0,0 +1,130 @@
+"""
+Kolejność zadań w projekcie oparta o przerwy w `sort_index`.
+
+Zadanie wstawiane jest w środek przerwy między sąsiadami, więc zwykłe
+przesunięcie zmienia jeden wiersz. Dopiero gdy przerwa się skończy,
+przenumerowywane jest najmniejsze lokalne okno (jeden `bulk_update`).
+Nowe zadania trafiają na koniec projektu co `SORT_STEP` (`next_sort_index`),
+więc przerwy istnieją od początku, a nie dopiero po pierwszym przesunięciu.
+"""
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Task
+from .signals import send_tasks_changed
+
+SORT_STEP = 10
+WINDOW = 64
+
+
+def last_sort_indexes(project_ids):
+    """Największy sort_index w każdym z projektów (0 dla pustych), jednym zapytaniem."""
+    last = dict.fromkeys(project_ids, 0)
+    rows = (
+        Task.objects.filter(project_id__in=last)
+        .values("project_id")
+        .annotate(last=Max("sort_index"))
+        .order_by()
+    )
+    for row in rows:
+        last[row["project_id"]] = row["last"] or 0
+    return last
+
+
+def next_sort_index(project_id):
+    """Indeks dla nowego zadania na końcu projektu."""
+    return last_sort_indexes([project_id])[project_id] + SORT_STEP
+
+
+def _rows_after(task, value, task_id):
+    """(id, sort_index) zadań projektu za pozycją (value, task_id)."""
+    qs = Task.objects.filter(project_id=task.project_id).exclude(pk=task.pk)
+    if task_id is not None:
+        qs = qs.filter(Q(sort_index__gt=value) | Q(sort_index=value, id__gt=task_id))
+    return qs.order_by("sort_index", "id").values_list("id", "sort_index")
+
+
+def _previous(task, anchor):
+    """Zadanie bezpośrednio przed `anchor` (bez przenoszonego) albo None."""
+    return (
+        Task.objects.filter(project_id=task.project_id)
+        .exclude(pk=task.pk)
+        .filter(
+            Q(sort_index__lt=anchor.sort_index)
+            | Q(sort_index=anchor.sort_index, id__lt=anchor.pk)
+        )
+        .order_by("-sort_index", "-id")
+        .values_list("id", "sort_index")
+        .first()
+    )
+
+
+def _allocate(task, after_value, after_id):
+    """
+    Nowy sort_index tuż za (after_value, after_id) oraz lista (id, sort_index)
+    sąsiadów, którym trzeba zmienić indeks, jeśli przerwa jest wyczerpana.
+    """
+    window = WINDOW
+    while True:
+        rows = list(_rows_after(task, after_value, after_id)[:window])
+        for k, (_, limit) in enumerate(rows):
+            # zmieścić trzeba przenoszone zadanie i k sąsiadów przed rows[k]
+            if limit - after_value >= k + 2:
+                step = (limit - after_value) // (k + 2)
+                break
+        else:
+            if len(rows) == window:
+                window *= 2
+                continue
+            # koniec projektu: za ostatnim nie ma górnego ograniczenia
+            k, step = len(rows), SORT_STEP
+        new_value = after_value + step
+        moved = [
+            (row_id, after_value + step * (i + 2))
+            for i, (row_id, _) in enumerate(rows[:k])
+        ]
+        return new_value, moved
+
+
+@transaction.atomic
+def move_task(task, before=None, after=None, parent=None, set_parent=False):
+    """
+    Ustawia zadanie przed `before` albo za `after` (albo na końcu projektu)
+    i opcjonalnie zmienia rodzica. Zwraca ID przenumerowanych sąsiadów.
+    """
+    if after is not None:
+        after_value, after_id = after.sort_index, after.pk
+    else:
+        if before is not None:
+            prev = _previous(task, before)
+        else:
+            prev = (
+                Task.objects.filter(project_id=task.project_id)
+                .exclude(pk=task.pk)
+                .order_by("-sort_index", "-id")
+                .values_list("id", "sort_index")
+                .first()
+            )
+        # brak poprzednika: wstawiamy na początek (indeksy są >= 0)
+        after_id, after_value = prev if prev else (None, -1)
+
+    new_value, moved = _allocate(task, after_value, after_id)
+
+    now = timezone.now()
+    changes = {"sort_index": new_value, "updated_at": now}
+    if set_parent:
+        changes["parent"] = parent
+    Task.objects.filter(pk=task.pk).update(**changes)
+    for attr, value in changes.items():
+        setattr(task, attr, value)
+    if set_parent:
+        task.sync_path()
+
+    if moved:
+        neighbours = [
+            Task(pk=row_id, sort_index=value, updated_at=now) for row_id, value in moved
+        ]
+        Task.objects.bulk_update(neighbours, ["sort_index", "updated_at"])
+        send_tasks_changed((), [task.project_id])
+    return [row_id for row_id, _ in moved]
@@ -0,0 +1,121 @@
+"""
+Przyrostowe roll-upy zadań nadrzędnych.
+
+Po zmianie zadania przeliczany jest wyłącznie łańcuch jego przodków (ze
+zmaterializowanej ścieżki), poziomami od najgłębszego: jedno zapytanie
+agregujące dzieci i jeden `bulk_update` na poziom. Rodzic dostaje:
+
+- `estimated_hours` / `actual_hours` - sumy z dzieci,
+- `progress` - średnią ważoną `estimated_hours` dzieci (zwykłą średnią,
+  gdy żadne dziecko nie ma oszacowania),
+- `start_date` / `end_date` - najwcześniejszy start i najpóźniejszy koniec.
+
+Pola, dla których żadne dziecko nie ma wartości, zostają bez zmian.
+Zadanie, które straciło ostatnie dziecko, przestaje być podsumowaniem:
+godziny wracają do pustych, a postęp do zera (daty zostają jako jego
+własny termin).
+
+Roll-upy trzymane są w tych samych kolumnach co wartości liści, więc
+agregaty po wielu zadaniach (statystyki projektu, obciążenie) liczą
+tylko liście (`leaf_q`) - inaczej godziny byłyby liczone podwójnie.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, F, FloatField, Max, Min, Q, Sum
+from django.utils import timezone
+
+from . import tree
+from .models import Task
+from .signals import send_tasks_changed
+
+ROLLUP_FIELDS = ["progress", "estimated_hours", "actual_hours", "start_date", "end_date"]
+# wartości zadania, które przestało mieć dzieci
+LEAF_RESET = {"progress": 0, "estimated_hours": None, "actual_hours": None}
+
+
+def leaf_q(prefix=""):
+    """Warunek "zadanie bez dzieci", np. `leaf_q("tasks__")` w agregacie projektu."""
+    parents = Task.objects.filter(parent__isnull=False).values("parent_id")
+    return ~Q(**{f"{prefix}pk__in": parents})
+
+
+def _hours(value):
+    return Decimal(value).quantize(Decimal("0.01")) if value is not None else None
+
+
+def rollup_ancestors(paths):
+    """
+    Przelicza przodków zadań o podanych ścieżkach (np. stara i nowa ścieżka
+    przeniesionego zadania). Zwraca ID zmienionych przodków.
+    """
+    ids = set()
+    for path in paths:
+        if path:
+            ids.update(tree.path_ids(path)[:-1])
+    if not ids:
+        return []
+
+    ancestors = {t.pk: t for t in Task.objects.filter(pk__in=ids)}
+    levels = defaultdict(list)
+    for task in ancestors.values():
+        levels[task.depth].append(task.pk)
+
+    now = timezone.now()
+    changed = []
+    for depth in sorted(levels, reverse=True):
+        stats = (
+            Task.objects.filter(parent_id__in=levels[depth])
+            .values("parent_id")
+            .annotate(
+                n=Count("id"),
+                progress_sum=Sum("progress"),
+                weighted=Sum(
+                    F("progress") * F("estimated_hours"), output_field=FloatField()
+                ),
+                estimated=Sum("estimated_hours"),
+                actual=Sum("actual_hours"),
+                start=Min("start_date"),
+                end=Max("end_date"),
+            )
+            .order_by()
+        )
+        level_changed = []
+        childless = set(levels[depth])
+        for row in stats:
+            childless.discard(row["parent_id"])
+            task = ancestors[row["parent_id"]]
+            estimated = _hours(row["estimated"])
+            if estimated:
+                progress = round(row["weighted"] / float(estimated))
+            else:
+                progress = round(row["progress_sum"] / row["n"])
+            values = {
+                "progress": min(max(progress, 0), 100),
+                "estimated_hours": estimated,
+                "actual_hours": _hours(row["actual"]),
+                "start_date": row["start"],
+                "end_date": row["end"],
+            }
+            dirty = False
+            for field, value in values.items():
+                if value is not None and getattr(task, field) != value:
+                    setattr(task, field, value)
+                    dirty = True
+            if dirty:
+                task.updated_at = now
+                level_changed.append(task)
+        for pk in childless:
+            task = ancestors[pk]
+            if any(getattr(task, field) != value for field, value in LEAF_RESET.items()):
+                for field, value in LEAF_RESET.items():
+                    setattr(task, field, value)
+                task.updated_at = now
+                level_changed.append(task)
+        if level_changed:
+            Task.objects.bulk_update(level_changed, ROLLUP_FIELDS + ["updated_at"])
+            changed.extend(level_changed)
+    send_tasks_changed(
+        (t.assignee_id for t in changed), (t.project_id for t in changed)
+    )
+    return [t.pk for t in changed]
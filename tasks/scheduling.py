@@ -0,0 +1,232 @@
+"""
+Harmonogramowanie metodą ścieżki krytycznej (CPM).
+
+Wszystko liczone jest w pamięci na liczbach dni (`date.toordinal()`), po
+sortowaniu topologicznym grafu zależności. Czas trwania zadania to
+`end_date - start_date` (tak jak `Task.duration_days`), a więzy typów
+zależności z opóźnieniem `lag` wyglądają następująco:
+
+- FS: ES(s) >= EF(p) + lag
+- SS: ES(s) >= ES(p) + lag
+- FF: EF(s) >= EF(p) + lag
+- SF: EF(s) >= ES(p) + lag
+
+Zadanie nie startuje wcześniej niż jego zaplanowany `start_date`; zadania
+bez dat dostają start projektu i zerowy czas trwania.
+"""
+from collections import defaultdict, namedtuple
+from datetime import date
+
+from django.utils import timezone
+
+from .graph import DependencyGraph
+from .signals import send_tasks_changed
+
+TaskSchedule = namedtuple(
+    "TaskSchedule",
+    ["early_start", "early_finish", "late_start", "late_finish", "total_float"],
+)
+
+
+class Schedule:
+    """Wynik CPM dla projektu (wartości to liczby dni porządkowych)."""
+
+    def __init__(self, tasks, order, start, finish):
+        self.tasks = tasks
+        self.order = order
+        self.start = start
+        self.finish = finish
+
+    @property
+    def critical_path(self):
+        """Zadania z zerowym zapasem w porządku topologicznym."""
+        return [tid for tid in self.order if self.tasks[tid].total_float <= 0]
+
+    def as_dict(self, task_id):
+        s = self.tasks[task_id]
+        return {
+            "es": date.fromordinal(s.early_start).isoformat(),
+            "ef": date.fromordinal(s.early_finish).isoformat(),
+            "ls": date.fromordinal(s.late_start).isoformat(),
+            "lf": date.fromordinal(s.late_finish).isoformat(),
+            "slack": s.total_float,
+            "critical": s.total_float <= 0,
+        }
+
+
+def _duration(start_date, end_date):
+    if start_date and end_date:
+        return max((end_date - start_date).days, 0)
+    return 0
+
+
+def compute_schedule(tasks, links, project_start=None):
+    """
+    Liczy ES/EF/LS/LF i zapas dla zadań.
+
+    `tasks` to krotki (id, start_date, end_date), `links` to krotki
+    (predecessor_id, successor_id, type, lag_days). Rzuca ValueError, jeśli
+    graf zawiera cykl.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return Schedule({}, [], None, None)
+
+    if project_start is None:
+        starts = [t[1] for t in tasks if t[1]]
+        project_start = min(starts) if starts else date.today()
+    anchor = project_start.toordinal()
+
+    planned = {}
+    duration = {}
+    for task_id, start_date, end_date in tasks:
+        planned[task_id] = start_date.toordinal() if start_date else anchor
+        duration[task_id] = _duration(start_date, end_date)
+
+    incoming = defaultdict(list)
+    outgoing = defaultdict(list)
+    graph = DependencyGraph()
+    for pred_id, succ_id, dep_type, lag in links:
+        if pred_id not in planned or succ_id not in planned:
+            continue
+        incoming[succ_id].append((pred_id, dep_type, lag or 0))
+        outgoing[pred_id].append((succ_id, dep_type, lag or 0))
+        graph.add_edge(pred_id, succ_id)
+
+    order = graph.topological_order(nodes=planned)
+
+    # przebieg w przód
+    es = {}
+    ef = {}
+    for tid in order:
+        d = duration[tid]
+        start = planned[tid]
+        for pred_id, dep_type, lag in incoming.get(tid, ()):
+            if dep_type == "SS":
+                bound = es[pred_id] + lag
+            elif dep_type == "FF":
+                bound = ef[pred_id] + lag - d
+            elif dep_type == "SF":
+                bound = es[pred_id] + lag - d
+            else:
+                bound = ef[pred_id] + lag
+            if bound > start:
+                start = bound
+        es[tid] = start
+        ef[tid] = start + d
+
+    finish = max(ef.values())
+
+    # przebieg wstecz
+    lf = {}
+    ls = {}
+    for tid in reversed(order):
+        d = duration[tid]
+        late = finish
+        for succ_id, dep_type, lag in outgoing.get(tid, ()):
+            if dep_type == "SS":
+                bound = ls[succ_id] - lag + d
+            elif dep_type == "FF":
+                bound = lf[succ_id] - lag
+            elif dep_type == "SF":
+                bound = lf[succ_id] - lag + d
+            else:
+                bound = ls[succ_id] - lag
+            if bound < late:
+                late = bound
+        lf[tid] = late
+        ls[tid] = late - d
+
+    result = {
+        tid: TaskSchedule(es[tid], ef[tid], ls[tid], lf[tid], ls[tid] - es[tid])
+        for tid in order
+    }
+    return Schedule(result, order, min(es.values()), finish)
+
+
+def schedule_project(project):
+    """Ładuje zadania i zależności projektu (dwa zapytania) i liczy CPM."""
+    from .models import Dependency, Task
+
+    tasks = Task.objects.filter(project=project).values_list(
+        "id", "start_date", "end_date"
+    )
+    links = Dependency.objects.filter(successor__project=project).values_list(
+        "predecessor_id", "successor_id", "type", "lag_days"
+    )
+    return compute_schedule(tasks, links, project_start=project.start_date)
+
+
+def propagate_from(task):
+    """
+    Przesuwa następniki zadania po zmianie jego dat (tylko w przód).
+
+    Graf projektu ładowany jest jednym zapytaniem, ale daty wczytywane są
+    wyłącznie dla podgrafu osiągalnego z `task`. Następnik przesuwa się
+    tylko wtedy, gdy więzy zależności są naruszone; czas trwania zostaje
+    zachowany. Zmienione zadania zapisywane są jednym `bulk_update`.
+    Zwraca listę ID przesuniętych zadań.
+    """
+    from .models import Dependency, Task
+
+    edges = list(
+        Dependency.objects.filter(successor__project_id=task.project_id).values_list(
+            "predecessor_id", "successor_id", "type", "lag_days"
+        )
+    )
+    affected = DependencyGraph((p, s) for p, s, _, _ in edges).descendants(task.id)
+    if not affected:
+        return []
+
+    rows = {
+        t.id: t
+        for t in Task.objects.filter(pk__in=affected).only(
+            "id", "start_date", "end_date", "assignee_id"
+        )
+    }
+    rows[task.id] = task
+    incoming = defaultdict(list)
+    subgraph = DependencyGraph()
+    for pred_id, succ_id, dep_type, lag in edges:
+        if pred_id in rows and succ_id in rows:
+            incoming[succ_id].append((pred_id, dep_type, lag or 0))
+            subgraph.add_edge(pred_id, succ_id)
+
+    changed = []
+    for tid in subgraph.topological_order(nodes=rows):
+        t = rows[tid]
+        if tid == task.id or not t.start_date:
+            continue
+        d = _duration(t.start_date, t.end_date)
+        start = t.start_date.toordinal()
+        new_start = start
+        for pred_id, dep_type, lag in incoming.get(tid, ()):
+            p = rows[pred_id]
+            if not p.start_date:
+                continue
+            p_start = p.start_date.toordinal()
+            p_finish = p_start + _duration(p.start_date, p.end_date)
+            if dep_type == "SS":
+                bound = p_start + lag
+            elif dep_type == "FF":
+                bound = p_finish + lag - d
+            elif dep_type == "SF":
+                bound = p_start + lag - d
+            else:
+                bound = p_finish + lag
+            new_start = max(new_start, bound)
+        if new_start != start:
+            shift = new_start - start
+            t.start_date = date.fromordinal(new_start)
+            if t.end_date:
+                t.end_date = date.fromordinal(t.end_date.toordinal() + shift)
+            changed.append(t)
+
+    if changed:
+        now = timezone.now()
+        for t in changed:
+            t.updated_at = now
+        Task.objects.bulk_update(changed, ["start_date", "end_date", "updated_at"])
+        # propagacja nie wychodzi poza projekt; project_id wierszy jest odroczone
+        send_tasks_changed((t.assignee_id for t in changed), [task.project_id])
+    return [t.id for t in changed]
@@ -1,7 +1,41 @@
+from django.db.models import Case, Func, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
 from rest_framework import serializers
+from workly.values import ValuesSerializer
 from .models import Task, Dependency
 
 
+class DaysBetween(Func):
+    """Liczba dni od `start` do `end` (daty) jako liczba całkowita."""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+
+# Task.duration_days w SQL (dla ścieżki values())
+DURATION_DAYS = Case(
+    When(
+        Q(start_date__isnull=False, end_date__isnull=False),
+        then=Greatest(DaysBetween("end_date", "start_date"), Value(0)),
+    ),
+    default=None,
+    output_field=IntegerField(),
+)
+
+
 class TaskSerializer(serializers.ModelSerializer):
     duration_days = serializers.ReadOnlyField()
 
@@ -27,6 +61,28 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at", "duration_days"]
 
+    def validate_parent(self, parent):
+        if (
+            parent is not None
+            and self.instance is not None
+            and self.instance.path
+            and parent.path.startswith(self.instance.path)
+        ):
+            raise serializers.ValidationError(
+                "Zadanie nie może być przeniesione pod własne poddrzewo."
+            )
+        return parent
+
+
+# szybka ścieżka list (workly.values): ten sam JSON co TaskSerializer
+TaskValuesSerializer = ValuesSerializer(TaskSerializer, duration_days=DURATION_DAYS)
+
+
+class TaskBatchSerializer(TaskSerializer):
+    """TaskSerializer z edytowalnym sort_index (zmiana kolejności w paczce)."""
+
+    sort_index = serializers.IntegerField(min_value=0, required=False)
+
 
 class DependencySerializer(serializers.ModelSerializer):
     class Meta:
@@ -41,3 +97,14 @@ class DependencySerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["created_at", "updated_at"]
+
+
+class DependencyBulkItemSerializer(serializers.Serializer):
+    """Pojedyncza krawędź w hurtowym tworzeniu (bez zapytań do bazy)."""
+
+    predecessor = serializers.IntegerField()
+    successor = serializers.IntegerField()
+    type = serializers.ChoiceField(
+        choices=Dependency.Type.choices, default=Dependency.Type.FS
+    )
+    lag_days = serializers.IntegerField(default=0)
@@ -0,0 +1,21 @@
+"""
+Sygnały zmian hurtowych zadań.
+
+`bulk_create` i `bulk_update` nie wysyłają `post_save`, więc ścieżki
+hurtowe (paczki, kopiowanie, propagacja dat, roll-upy) ogłaszają zmianę
+sygnałem `tasks_changed`. Argumenty: `user_ids` - ID przypisanych
+użytkowników (sprzed i po zmianie), których zmiana dotyczy, oraz
+`project_ids` - projekty ze zmienionymi zadaniami lub zależnościami.
+"""
+from django.dispatch import Signal
+
+tasks_changed = Signal()
+
+
+def send_tasks_changed(user_ids, project_ids=()):
+    from .models import Task
+
+    user_ids = {uid for uid in user_ids if uid}
+    project_ids = {pid for pid in project_ids if pid}
+    if user_ids or project_ids:
+        tasks_changed.send(sender=Task, user_ids=user_ids, project_ids=project_ids)
@@ -1,13 +1,29 @@
 """
 Tests for Tasks API endpoints.
 """
+import json
+import unittest
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from workly.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
 from datetime import date, timedelta
+from decimal import Decimal
 from projects.models import Project
+from projects.serializers import ProjectSerializer, ProjectValuesSerializer
+from django.core.exceptions import ValidationError
 from .models import Task, Dependency
+from .graph import DependencyGraph
+from .scheduling import compute_schedule
+from .bulk import apply_task_batch, copy_subtree
+from .serializers import TaskSerializer, TaskValuesSerializer
+from .rollup import rollup_ancestors
 
 User = get_user_model()
 
@@ -297,6 +313,80 @@ class TaskAPITestCase(TestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['title'], 'Python Task')
 
+    def test_search_tasks_full_text(self):
+        """Test prefix, diacritic-insensitive and ranked search over the FTS index."""
+        first = Task.objects.create(project=self.project, title='Wdrożenie', description='serwer')
+        second = Task.objects.create(
+            project=self.project, title='Wdrożenie wdrożenie', description='wdrożenie'
+        )
+        Task.objects.create(project=self.project, title='Inne', description='')
+        response = self.client.get('/api/tasks/?search=wdroz')
+        self.assertEqual([t['id'] for t in response.data['results']], [second.id, first.id])
+        # wszystkie słowa są wymagane, składnia FTS5 nie przechodzi
+        response = self.client.get('/api/tasks/?search=wdro serw"*')
+        self.assertEqual([t['id'] for t in response.data['results']], [first.id])
+        # jawne sortowanie ma pierwszeństwo przed trafnością
+        response = self.client.get('/api/tasks/?search=wdrozenie&ordering=id')
+        self.assertEqual([t['id'] for t in response.data['results']], [first.id, second.id])
+
+    def test_search_common_term_scales(self):
+        """Test that ranked search of a common term runs the FTS match once."""
+        Task.objects.bulk_create(
+            [Task(project=self.project, title=f'Alpha {i}', description='alpha ' * (i % 3))
+             for i in range(3000)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/?search=alpha')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3000)
+        # najwięcej wystąpień (opis "alpha alpha") na początku
+        top = Task.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual(top.description.count('alpha'), 2)
+        page = [q['sql'] for q in queries.captured_queries if 'rank' in q['sql']]
+        self.assertEqual(len(page), 1)
+        self.assertEqual(page[0].count('MATCH'), 1)
+
+    def test_cursor_pagination(self):
+        """Test walking task pages with a cursor in both directions without COUNT."""
+        other = Project.objects.create(name='Second', owner=self.user)
+        for i in range(30):
+            Task.objects.create(project=self.project if i % 2 else other, title=f'T{i}', sort_index=i // 4)
+        expected = list(Task.objects.values_list('id', flat=True))
+
+        seen = []
+        url = '/api/tasks/?cursor='
+        pages = []
+        while url:
+            # brak COUNT(*): tylko zapytanie o stronę
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            last = response
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append([t['id'] for t in response.data['results']])
+            seen.extend(pages[-1])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(p) for p in pages], [25, 5])
+
+        back = self.client.get(last.data['previous'])
+        self.assertEqual([t['id'] for t in back.data['results']], pages[0])
+        self.assertIsNone(back.data['previous'])
+
+        response = self.client.get('/api/tasks/?cursor=&count=1&ordering=-title')
+        self.assertEqual(response.data['count'], 30)
+        self.assertEqual(response.data['results'][0]['title'], 'T9')
+        self.assertEqual(self.client.get('/api/tasks/?cursor=xyz').status_code, 404)
+
+    def test_search_index_follows_bulk_writes(self):
+        """Test that the FTS index stays in sync with bulk updates and deletes."""
+        task = Task.objects.create(project=self.project, title='Alfa')
+        Task.objects.filter(pk=task.pk).update(title='Beta')
+        self.assertEqual(self.client.get('/api/tasks/?search=alfa').data['results'], [])
+        self.assertEqual(len(self.client.get('/api/tasks/?search=beta').data['results']), 1)
+        task.delete()
+        self.assertEqual(self.client.get('/api/tasks/?search=beta').data['results'], [])
+
     def test_copy_task(self):
         """Test copying a task."""
         task = Task.objects.create(
@@ -335,6 +425,292 @@ class TaskAPITestCase(TestCase):
         copied_task = Task.objects.exclude(id=task.id).first()
         self.assertEqual(copied_task.title, 'Custom Copy Title')
 
+    def test_copy_task_with_children_and_dependencies(self):
+        """Test copying a whole subtree with its internal dependencies."""
+        root = Task.objects.create(project=self.project, title='Root', sort_index=10)
+        a = Task.objects.create(project=self.project, title='A', parent=root, sort_index=30)
+        b = Task.objects.create(project=self.project, title='B', parent=root, sort_index=20)
+        a1 = Task.objects.create(project=self.project, title='A1', parent=a, sort_index=40)
+        outside = Task.objects.create(project=self.project, title='Outside', sort_index=50)
+        Dependency.objects.create(predecessor=b, successor=a, type='FS', lag_days=2)
+        Dependency.objects.create(predecessor=a, successor=a1, type='SS')
+        Dependency.objects.create(predecessor=a1, successor=outside, type='FS')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                f'/api/tasks/{root.id}/copy/',
+                {'include_children': True, 'include_dependencies': True,
+                 'project': self.other_project.id},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # krawędzie czytane zakresem ścieżek poddrzewa, nie całym projektem
+        [edges_sql] = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "tasks_dependency"' in q['sql']
+        ]
+        self.assertIn('"path"', edges_sql)
+        self.assertNotIn('project_id', edges_sql)
+        copies = list(Task.objects.filter(project=self.other_project).order_by('sort_index'))
+        self.assertEqual([t.title for t in copies], ['Kopia: Root', 'B', 'A', 'A1'])
+        self.assertEqual([t.sort_index for t in copies], [10, 20, 30, 40])
+        new_root, new_b, new_a, new_a1 = copies
+        self.assertEqual(response.data['id'], new_root.id)
+        self.assertEqual(new_a.parent_id, new_root.id)
+        self.assertEqual(new_a1.parent_id, new_a.id)
+        deps = set(
+            Dependency.objects.filter(successor__project=self.other_project)
+            .values_list('predecessor_id', 'successor_id', 'type', 'lag_days')
+        )
+        self.assertEqual(deps, {(new_b.id, new_a.id, 'FS', 2), (new_a.id, new_a1.id, 'SS', 0)})
+
+    def test_copy_task_query_count_independent_of_subtree_size(self):
+        """Test that copying a subtree costs a query per level, not per node."""
+        root = Task.objects.create(project=self.project, title='Root')
+        for i in range(20):
+            child = Task.objects.create(project=self.project, title=f'C{i}', parent=root)
+            Task.objects.create(project=self.project, title=f'G{i}', parent=child)
+        # get_object, savepoint, poddrzewo, MAX(sort_index), 3 poziomy,
+        # ścieżki drzewa, release
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                f'/api/tasks/{root.id}/copy/', {'include_children': True}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.count(), 82)
+
+    def test_batch_operations(self):
+        """Test creating, updating and deleting tasks in one batch."""
+        t1 = Task.objects.create(project=self.project, title='T1', assignee=self.user)
+        t2 = Task.objects.create(project=self.project, title='T2', assignee=self.other_user)
+        t3 = Task.objects.create(project=self.project, title='T3')
+        data = {'operations': [
+            {'op': 'update', 'id': t1.id, 'data': {'status': 'done', 'sort_index': 30}},
+            {'op': 'update', 'id': t2.id, 'data': {'progress': 40, 'sort_index': 10}},
+            {'op': 'create', 'data': {'project': self.project.id, 'title': 'New'}},
+            {'op': 'delete', 'id': t3.id},
+        ]}
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([r['op'] for r in results], ['update', 'update', 'create', 'delete'])
+        self.assertEqual(results[0]['data']['status'], 'done')
+        t1.refresh_from_db()
+        t2.refresh_from_db()
+        self.assertEqual((t1.status, t1.sort_index), ('done', 30))
+        self.assertEqual((t2.progress, t2.sort_index), (40, 10))
+        self.assertTrue(Task.objects.filter(title='New', project=self.project).exists())
+        self.assertFalse(Task.objects.filter(pk=t3.pk).exists())
+
+    def test_batch_is_all_or_nothing(self):
+        """Test that a single invalid item rejects the whole batch."""
+        mine = Task.objects.create(project=self.project, title='Mine', assignee=self.user)
+        foreign = Task.objects.create(
+            project=self.other_project, title='Foreign', assignee=self.other_user
+        )
+        data = [
+            {'op': 'update', 'id': mine.id, 'data': {'status': 'done'}},
+            {'op': 'update', 'id': foreign.id, 'data': {'status': 'done'}},
+            {'op': 'update', 'id': mine.id, 'data': {'progress': 500}},
+            {'op': 'move'},
+        ]
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2, 3])
+        mine.refresh_from_db()
+        self.assertEqual(mine.status, 'todo')
+
+    def test_batch_ids_coerced_and_validated(self):
+        """Test that numeric string ids work and malformed ids are per-item errors."""
+        task = Task.objects.create(project=self.project, title='T', assignee=self.user)
+        data = [
+            {'op': 'update', 'id': 'abc', 'data': {'status': 'done'}},
+            {'op': 'delete', 'id': True},
+            {'op': 'delete', 'id': 10 ** 30},
+            {'op': 'delete'},
+        ]
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['errors']
+        self.assertEqual([e['index'] for e in errors], [0, 1, 2, 3])
+        self.assertTrue(all('id' in e['errors'] for e in errors))
+        response = self.client.post(
+            '/api/tasks/batch/',
+            [{'op': 'update', 'id': str(task.id), 'data': {'status': 'done'}}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'done')
+
+    def test_batch_delete_protected(self):
+        """Test that deleting a task with dependencies rolls back the batch."""
+        t1 = Task.objects.create(project=self.project, title='T1')
+        t2 = Task.objects.create(project=self.project, title='T2')
+        Dependency.objects.create(predecessor=t1, successor=t2)
+        data = [
+            {'op': 'update', 'id': t2.id, 'data': {'title': 'Renamed'}},
+            {'op': 'delete', 'id': t1.id},
+        ]
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        t2.refresh_from_db()
+        self.assertEqual(t2.title, 'T2')
+
+    def test_batch_update_query_count(self):
+        """Test that batch updates do not cost a query per task."""
+        tasks = [Task.objects.create(project=self.project, title=f'T{i}') for i in range(30)]
+        data = [
+            {'op': 'update', 'id': t.id, 'data': {'sort_index': 100 - i, 'status': 'review'}}
+            for i, t in enumerate(tasks)
+        ]
+        # zadania, 2x savepoint, bulk_update, 2x release (brak rodziców - bez roll-upu)
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(status='review').count(), 30)
+
+    def test_batch_reparents_ancestor_and_descendant(self):
+        """Test that moving a task and its descendant in one batch keeps paths valid."""
+        a = Task.objects.create(project=self.project, title='A')
+        b = Task.objects.create(project=self.project, title='B', parent=a)
+        c = Task.objects.create(project=self.project, title='C', parent=b)
+        x = Task.objects.create(project=self.project, title='X')
+        y = Task.objects.create(project=self.project, title='Y')
+        data = [
+            {'op': 'update', 'id': a.id, 'data': {'parent': x.id}},
+            {'op': 'update', 'id': c.id, 'data': {'parent': y.id}},
+        ]
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        c.refresh_from_db()
+        y.refresh_from_db()
+        self.assertEqual(c.path, y.path + f'{c.id:010d}/')
+        self.assertEqual(list(y.get_descendants()), [c])
+        x.refresh_from_db()
+        self.assertEqual(
+            sorted(t.title for t in x.get_descendants()), ['A', 'B']
+        )
+
+    def test_batch_rejects_reparent_cycle(self):
+        """Test that reparents forming a cycle together are rejected with 400."""
+        a = Task.objects.create(project=self.project, title='A')
+        b = Task.objects.create(project=self.project, title='B')
+        c = Task.objects.create(project=self.project, title='C', parent=b)
+        data = [
+            {'op': 'update', 'id': a.id, 'data': {'parent': c.id}},
+            {'op': 'update', 'id': b.id, 'data': {'parent': a.id}},
+        ]
+        response = self.client.post('/api/tasks/batch/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['errors']], [0, 1])
+        a.refresh_from_db()
+        self.assertIsNone(a.parent_id)
+
+    def _ordered_titles(self):
+        return list(
+            Task.objects.filter(project=self.project).values_list('title', flat=True)
+        )
+
+    def test_move_task_into_gap(self):
+        """Test that moving into a gap only touches the moved task."""
+        a = Task.objects.create(project=self.project, title='A', sort_index=10)
+        b = Task.objects.create(project=self.project, title='B', sort_index=20)
+        c = Task.objects.create(project=self.project, title='C', sort_index=30)
+        response = self.client.post(f'/api/tasks/{c.id}/move/', {'after': a.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sort_index'], 15)
+        self.assertEqual(response.data['rebalanced'], [])
+        self.assertEqual(self._ordered_titles(), ['A', 'C', 'B'])
+        response = self.client.post(f'/api/tasks/{b.id}/move/', {'before': a.id}, format='json')
+        self.assertEqual(response.data['sort_index'], 4)
+        self.assertEqual(self._ordered_titles(), ['B', 'A', 'C'])
+        response = self.client.post(f'/api/tasks/{b.id}/move/', {}, format='json')
+        self.assertEqual(response.data['sort_index'], 25)
+        self.assertEqual(self._ordered_titles(), ['A', 'C', 'B'])
+
+    def test_move_task_rebalances_local_window(self):
+        """Test that an exhausted gap renumbers only the nearby rows."""
+        tasks = [
+            Task.objects.create(project=self.project, title=f'T{i}', sort_index=i)
+            for i in range(5)
+        ]
+        far = Task.objects.create(project=self.project, title='Far', sort_index=1000)
+        moving = Task.objects.create(project=self.project, title='M', sort_index=2000)
+        response = self.client.post(
+            f'/api/tasks/{moving.id}/move/', {'after': tasks[0].id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._ordered_titles(), ['T0', 'M', 'T1', 'T2', 'T3', 'T4', 'Far']
+        )
+        self.assertEqual(response.data['rebalanced'], [t.id for t in tasks[1:]])
+        far.refresh_from_db()
+        self.assertEqual(far.sort_index, 1000)
+
+    def test_move_task_with_equal_indexes(self):
+        """Test moving in a project where every task still has sort_index 0."""
+        a = Task.objects.create(project=self.project, title='A')
+        b = Task.objects.create(project=self.project, title='B')
+        c = Task.objects.create(project=self.project, title='C')
+        self.client.post(f'/api/tasks/{c.id}/move/', {'before': a.id}, format='json')
+        self.assertEqual(self._ordered_titles(), ['C', 'A', 'B'])
+        self.client.post(f'/api/tasks/{a.id}/move/', {'after': b.id}, format='json')
+        self.assertEqual(self._ordered_titles(), ['C', 'B', 'A'])
+
+    def test_created_tasks_get_gaps(self):
+        """Test that API and batch creates append with gaps so a move touches one row."""
+        ids = []
+        for title in ('A', 'B', 'C'):
+            response = self.client.post(
+                '/api/tasks/', {'project': self.project.id, 'title': title}, format='json'
+            )
+            ids.append(response.data['id'])
+            self.assertEqual(response.data['sort_index'], 10 * len(ids))
+        response = self.client.post('/api/tasks/batch/', [
+            {'op': 'create', 'data': {'project': self.project.id, 'title': 'D'}},
+            {'op': 'create', 'data': {'project': self.project.id, 'title': 'E'}},
+        ], format='json')
+        self.assertEqual([r['data']['sort_index'] for r in response.data['results']], [40, 50])
+        response = self.client.post(f'/api/tasks/{ids[2]}/move/', {'after': ids[0]}, format='json')
+        self.assertEqual(response.data['rebalanced'], [])
+        self.assertEqual(self._ordered_titles(), ['A', 'C', 'B', 'D', 'E'])
+
+    def test_migration_spreads_equal_indexes(self):
+        """Test that the data migration spreads tied indexes in the current order."""
+        from importlib import import_module
+        from django.apps import apps
+        migration = import_module('tasks.migrations.0009_spread_sort_index')
+        tied = [Task.objects.create(project=self.project, title=f'T{i}') for i in range(3)]
+        spaced = [
+            Task.objects.create(project=self.other_project, title=f'S{i}', sort_index=i * 7)
+            for i in range(2)
+        ]
+        migration.spread_sort_index(apps, None)
+        self.assertEqual(
+            [Task.objects.get(pk=t.pk).sort_index for t in tied + spaced], [10, 20, 30, 0, 7]
+        )
+
+    def test_move_task_parent(self):
+        """Test changing the parent and rejecting moves under own subtree."""
+        root = Task.objects.create(project=self.project, title='Root', sort_index=10)
+        child = Task.objects.create(project=self.project, title='Child', parent=root, sort_index=20)
+        other = Task.objects.create(project=self.project, title='Other', sort_index=30)
+        response = self.client.post(
+            f'/api/tasks/{root.id}/move/', {'parent': child.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            f'/api/tasks/{child.id}/move/', {'parent': other.id, 'after': other.id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['parent'], other.id)
+        response = self.client.post(
+            f'/api/tasks/{child.id}/move/', {'parent': None}, format='json'
+        )
+        self.assertIsNone(response.data['parent'])
+
     def test_unauthenticated_access(self):
         """Test that unauthenticated users cannot access tasks."""
         self.client.force_authenticate(user=None)
@@ -357,6 +733,73 @@ class TaskAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['duration_days'], 10)
 
+    def test_update_task_reschedules_successors(self):
+        """Test that moving a task's end date pushes its successors."""
+        d0 = date(2025, 1, 1)
+        task1 = Task.objects.create(
+            project=self.project, title='Task 1', assignee=self.user,
+            start_date=d0, end_date=d0 + timedelta(days=5)
+        )
+        task2 = Task.objects.create(
+            project=self.project, title='Task 2', assignee=self.user,
+            start_date=d0 + timedelta(days=5), end_date=d0 + timedelta(days=7)
+        )
+        task3 = Task.objects.create(
+            project=self.project, title='Task 3', assignee=self.user,
+            start_date=d0 + timedelta(days=20), end_date=d0 + timedelta(days=21)
+        )
+        unrelated = Task.objects.create(
+            project=self.project, title='Unrelated', assignee=self.user,
+            start_date=d0, end_date=d0 + timedelta(days=1)
+        )
+        Dependency.objects.create(predecessor=task1, successor=task2, type='FS', lag_days=1)
+        Dependency.objects.create(predecessor=task2, successor=task3, type='FS')
+        # chain behind task3; moved only by the second, larger shift
+        chain = [task3]
+        for i in range(20):
+            successor = Task.objects.create(
+                project=self.project, title=f'Chain {i}', assignee=self.user,
+                start_date=d0 + timedelta(days=22 + i), end_date=d0 + timedelta(days=22 + i)
+            )
+            Dependency.objects.create(predecessor=chain[-1], successor=successor, type='FS')
+            chain.append(successor)
+        with self.assertNumQueries(10):
+            response = self.client.patch(
+                f'/api/tasks/{task1.id}/',
+                {'end_date': (d0 + timedelta(days=10)).isoformat()},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rescheduled'], [task2.id])
+        task2.refresh_from_db()
+        self.assertEqual(task2.start_date, d0 + timedelta(days=11))
+        self.assertEqual(task2.end_date, d0 + timedelta(days=13))
+        # task3 ma wystarczający zapas
+        task3.refresh_from_db()
+        self.assertEqual(task3.start_date, d0 + timedelta(days=20))
+        unrelated.refresh_from_db()
+        self.assertEqual(unrelated.start_date, d0)
+
+        # shifting 22 successors costs the same queries as shifting one
+        with self.assertNumQueries(10):
+            response = self.client.patch(
+                f'/api/tasks/{task1.id}/',
+                {'end_date': (d0 + timedelta(days=40)).isoformat()},
+                format='json'
+            )
+        self.assertEqual(len(response.data['rescheduled']), 22)
+
+    def test_update_task_without_date_change_does_not_reschedule(self):
+        """Test that non-date updates skip propagation."""
+        task = Task.objects.create(
+            project=self.project, title='Task', assignee=self.user
+        )
+        response = self.client.patch(
+            f'/api/tasks/{task.id}/', {'title': 'Renamed'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rescheduled'], [])
+
 
 class DependencyAPITestCase(TestCase):
     """Test cases for Dependency API endpoints."""
@@ -567,3 +1010,592 @@ class DependencyAPITestCase(TestCase):
         response = self.client.get('/api/dependencies/')
         # IsAuthenticatedOrReadOnly returns 403 for unauthenticated users
         self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+    def test_bulk_create_dependencies(self):
+        """Test bulk creation with per-edge errors."""
+        task3 = Task.objects.create(
+            project=self.project,
+            title='Task 3',
+            status='todo',
+            assignee=self.user
+        )
+        data = [
+            {'predecessor': self.task1.id, 'successor': self.task2.id, 'type': 'FS'},
+            {'predecessor': self.task2.id, 'successor': task3.id, 'lag_days': 2},
+            # zamyka cykl z dwiema poprzednimi krawędziami z tej samej paczki
+            {'predecessor': task3.id, 'successor': self.task1.id},
+            {'predecessor': self.task1.id, 'successor': self.task1.id},
+            {'predecessor': self.task1.id},
+        ]
+        response = self.client.post('/api/dependencies/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual([e['index'] for e in response.data['errors']], [2, 3, 4])
+        self.assertIn('cykl', str(response.data['errors'][0]).lower())
+        self.assertEqual(Dependency.objects.count(), 2)
+        self.assertEqual(
+            Dependency.objects.get(successor=task3).lag_days, 2
+        )
+
+    def test_bulk_create_dependencies_duplicate_and_permissions(self):
+        """Test that duplicates and foreign projects are rejected."""
+        Dependency.objects.create(
+            predecessor=self.task1,
+            successor=self.task2,
+            type='FS'
+        )
+        other1 = Task.objects.create(project=self.other_project, title='O1')
+        other2 = Task.objects.create(project=self.other_project, title='O2')
+        data = {'dependencies': [
+            {'predecessor': self.task1.id, 'successor': self.task2.id, 'type': 'FS'},
+            {'predecessor': other1.id, 'successor': other2.id},
+        ]}
+        response = self.client.post('/api/dependencies/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['errors']), 2)
+        self.assertEqual(Dependency.objects.count(), 1)
+
+    def test_bulk_create_dependencies_query_count(self):
+        """Test that bulk creation cost does not grow with the batch size."""
+        tasks = [
+            Task.objects.create(project=self.project, title=f'Chain {i}')
+            for i in range(30)
+        ]
+        data = [
+            {'predecessor': a.id, 'successor': b.id}
+            for a, b in zip(tasks, tasks[1:])
+        ]
+        # sesja/uwierzytelnienie są pominięte (force_authenticate):
+        # savepoint, zadania, krawędzie, insert, release
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/dependencies/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Dependency.objects.count(), 29)
+
+    def test_filter_dependencies(self):
+        """Test filtering dependencies by project, successor and type."""
+        task3 = Task.objects.create(project=self.project, title='Task 3')
+        other1 = Task.objects.create(project=self.other_project, title='O1')
+        other2 = Task.objects.create(project=self.other_project, title='O2')
+        dep1 = Dependency.objects.create(predecessor=self.task1, successor=self.task2, type='FS')
+        dep2 = Dependency.objects.create(predecessor=self.task2, successor=task3, type='SS')
+        Dependency.objects.create(predecessor=other1, successor=other2, type='FS')
+
+        response = self.client.get(f'/api/dependencies/?project={self.project.id}')
+        self.assertEqual([d['id'] for d in response.data['results']], [dep1.id, dep2.id])
+        response = self.client.get(f'/api/dependencies/?successor={task3.id}')
+        self.assertEqual([d['id'] for d in response.data['results']], [dep2.id])
+        response = self.client.get(f'/api/dependencies/?predecessor={self.task1.id}')
+        self.assertEqual([d['id'] for d in response.data['results']], [dep1.id])
+        response = self.client.get(f'/api/dependencies/?project={self.project.id}&type=SS')
+        self.assertEqual([d['id'] for d in response.data['results']], [dep2.id])
+
+    def test_project_dependencies_listing(self):
+        """Test the project-scoped dependency listing."""
+        other1 = Task.objects.create(project=self.other_project, title='O1')
+        other2 = Task.objects.create(project=self.other_project, title='O2')
+        dep = Dependency.objects.create(predecessor=self.task1, successor=self.task2)
+        Dependency.objects.create(predecessor=other1, successor=other2)
+        response = self.client.get(f'/api/projects/{self.project.id}/dependencies/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d['id'] for d in response.data['results']], [dep.id])
+
+
+class DependencyGraphTestCase(TestCase):
+    """Test cases for the in-memory dependency graph."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.project = Project.objects.create(name='Graph Project')
+        self.tasks = [
+            Task.objects.create(project=self.project, title=f'Task {i}')
+            for i in range(4)
+        ]
+
+    def test_would_create_cycle(self):
+        """Test cycle detection on an in-memory graph."""
+        graph = DependencyGraph([(1, 2), (2, 3), (3, 4)])
+        self.assertTrue(graph.would_create_cycle(4, 1))
+        self.assertTrue(graph.would_create_cycle(3, 2))
+        self.assertFalse(graph.would_create_cycle(1, 4))
+        self.assertFalse(graph.would_create_cycle(5, 1))
+
+    def test_topological_order(self):
+        """Test topological ordering and cycle error."""
+        graph = DependencyGraph([(3, 1), (1, 2)])
+        self.assertEqual(graph.topological_order(nodes=[4]), [3, 4, 1, 2])
+        graph.add_edge(2, 3)
+        with self.assertRaises(ValueError):
+            graph.topological_order()
+
+    def test_for_project_single_query(self):
+        """Test that project edges are loaded with a single query."""
+        t0, t1, t2, t3 = self.tasks
+        Dependency.objects.create(predecessor=t0, successor=t1)
+        Dependency.objects.create(predecessor=t1, successor=t2)
+        with self.assertNumQueries(1):
+            graph = DependencyGraph.for_project(self.project.id)
+        self.assertTrue(graph.would_create_cycle(t2.id, t0.id))
+        self.assertEqual(graph.descendants(t0.id), {t1.id, t2.id})
+
+    def test_clean_query_count_independent_of_graph_size(self):
+        """Test that cycle validation does not query per visited node."""
+        t0, t1, t2, t3 = self.tasks
+        Dependency.objects.create(predecessor=t0, successor=t1)
+        Dependency.objects.create(predecessor=t1, successor=t2)
+        dep = Dependency(predecessor_id=t2.id, successor_id=t0.id)
+        # predecessor + successor + krawędzie projektu
+        with self.assertNumQueries(3):
+            with self.assertRaises(ValidationError):
+                dep.clean()
+
+
+class ScheduleTestCase(TestCase):
+    """Test cases for the CPM scheduler."""
+
+    def test_dependency_types(self):
+        """Test forward pass constraints for all dependency types."""
+        d0 = date(2025, 1, 1)
+        tasks = [
+            (1, d0, d0 + timedelta(days=4)),
+            (2, d0, d0 + timedelta(days=2)),
+            (3, d0, d0 + timedelta(days=2)),
+            (4, d0, d0 + timedelta(days=2)),
+            (5, d0, d0 + timedelta(days=2)),
+        ]
+        links = [
+            (1, 2, 'FS', 0),
+            (1, 3, 'SS', 1),
+            (1, 4, 'FF', 3),
+            (1, 5, 'SF', 6),
+        ]
+        schedule = compute_schedule(tasks, links)
+        base = d0.toordinal()
+        self.assertEqual(schedule.tasks[2].early_start - base, 4)
+        self.assertEqual(schedule.tasks[3].early_start - base, 1)
+        self.assertEqual(schedule.tasks[4].early_finish - base, 7)
+        self.assertEqual(schedule.tasks[5].early_finish - base, 6)
+        self.assertEqual(schedule.finish - base, 7)
+        self.assertEqual(schedule.critical_path, [1, 4])
+
+    def test_large_chain(self):
+        """Test that a long chain is scheduled end to end."""
+        d0 = date(2025, 1, 1)
+        n = 10000
+        tasks = [(i, d0, d0 + timedelta(days=1)) for i in range(n)]
+        links = [(i, i + 1, 'FS', 0) for i in range(n - 1)]
+        schedule = compute_schedule(tasks, links)
+        self.assertEqual(schedule.finish - d0.toordinal(), n)
+        self.assertEqual(len(schedule.critical_path), n)
+
+    def test_cycle_raises(self):
+        """Test that a cyclic graph is rejected."""
+        d0 = date(2025, 1, 1)
+        with self.assertRaises(ValueError):
+            compute_schedule([(1, d0, d0), (2, d0, d0)], [(1, 2, 'FS', 0), (2, 1, 'FS', 0)])
+
+
+class IndexUsageTestCase(TestCase):
+    """Test that hot query shapes are answered from indexes, not table scans."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(username='indexuser')
+        self.project = Project.objects.create(name='Index Project')
+
+    def assertUsesIndex(self, qs):
+        plan = qs.explain()
+        for line in plan.splitlines():
+            if 'tasks_task' in line or 'tasks_dependency' in line:
+                self.assertNotRegex(
+                    line, r'SCAN (tasks_task|tasks_dependency)(?!.*USING)', plan
+                )
+        self.assertIn('USING', plan)
+        return plan
+
+    def test_project_task_list(self):
+        """Test /api/tasks/?project= ordering comes straight from the index."""
+        plan = self.assertUsesIndex(
+            Task.objects.filter(project=self.project)
+        )
+        self.assertIn('task_project_sort_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_keyset_page(self):
+        """Test that a cursor page seeks the ordering index instead of sorting."""
+        from workly.pagination import KeysetPagination
+
+        paginator = KeysetPagination()
+        qs = Task.objects.all()
+        keys = paginator.get_keys(qs)
+        plan = self.assertUsesIndex(
+            qs.order_by(*paginator.order_by(keys, False)).filter(
+                paginator.after(keys, [self.project.id, 10, 5], False)
+            )[:26]
+        )
+        self.assertIn('task_project_sort_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_my_tasks(self):
+        """Test /api/my/tasks/ filter on assignee ordered by start date."""
+        plan = self.assertUsesIndex(
+            Task.objects.filter(assignee=self.user).order_by('start_date', 'sort_index', 'id')
+        )
+        self.assertIn('task_assignee_dates_idx', plan)
+
+    def test_my_timeline_overlap(self):
+        """Test the /api/my/timeline/ overlap predicate."""
+        start = date(2025, 1, 1)
+        end = start + timedelta(days=14)
+        plan = self.assertUsesIndex(
+            Task.objects.filter(assignee=self.user, start_date__lte=end, end_date__gte=start)
+            .order_by('start_date', 'sort_index', 'id')
+        )
+        self.assertIn('task_assignee_dates_idx', plan)
+        self.assertIn('start_date<?', plan)
+
+    def test_summary_by_status(self):
+        """Test the per-status group-by of /api/my/summary/."""
+        from django.db.models import Count
+        plan = self.assertUsesIndex(
+            Task.objects.filter(assignee=self.user)
+            .values('status').annotate(count=Count('id')).order_by('status')
+        )
+        self.assertIn('COVERING INDEX task_assignee_status_idx', plan)
+
+    def test_project_dependencies(self):
+        """Test the dependency -> successor -> project join of the Gantt/graph loaders."""
+        plan = self.assertUsesIndex(
+            Dependency.objects.filter(successor__project=self.project)
+            .values_list('predecessor_id', 'successor_id', 'type', 'lag_days')
+        )
+        self.assertIn('COVERING INDEX dependency_successor_cov_idx', plan)
+
+
+class TaskTreeTestCase(TestCase):
+    """Test cases for the materialized task hierarchy."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.project = Project.objects.create(name='Tree Project')
+        self.root = Task.objects.create(project=self.project, title='Root')
+        self.child = Task.objects.create(project=self.project, title='Child', parent=self.root)
+        self.leaf = Task.objects.create(project=self.project, title='Leaf', parent=self.child)
+        self.other = Task.objects.create(project=self.project, title='Other')
+
+    def test_paths_on_create(self):
+        """Test that path and depth are set on insert."""
+        self.assertEqual(self.root.path, f'{self.root.id:010d}/')
+        self.assertEqual(self.leaf.path, self.child.path + f'{self.leaf.id:010d}/')
+        self.assertEqual((self.root.depth, self.child.depth, self.leaf.depth), (0, 1, 2))
+
+    def test_descendants_and_ancestors(self):
+        """Test single-query subtree and ancestor lookups."""
+        with self.assertNumQueries(1):
+            ids = set(self.root.get_descendants().values_list('id', flat=True))
+        self.assertEqual(ids, {self.child.id, self.leaf.id})
+        self.assertEqual(
+            set(self.child.get_descendants(include_self=True).values_list('id', flat=True)),
+            {self.child.id, self.leaf.id},
+        )
+        self.assertEqual(list(self.leaf.get_ancestors()), [self.root, self.child])
+
+    def test_subtree_uses_index_range(self):
+        """Test that the subtree query is an indexed range scan."""
+        plan = self.root.get_descendants().explain()
+        self.assertIn('task_path_idx', plan)
+        self.assertIn('path>? AND path<?', plan)
+
+    def test_move_updates_whole_subtree(self):
+        """Test that re-parenting rewrites paths of all descendants."""
+        self.child.parent = self.other
+        self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertEqual(
+            self.leaf.path,
+            f'{self.other.id:010d}/{self.child.id:010d}/{self.leaf.id:010d}/'
+        )
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(set(self.root.get_descendants()), set())
+        self.child.parent = None
+        self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.depth, 1)
+
+    def test_save_without_parent_change_is_free(self):
+        """Test that ordinary saves do not touch the hierarchy."""
+        self.leaf.title = 'Renamed'
+        with self.assertNumQueries(1):
+            self.leaf.save()
+
+    def test_copy_and_batch_keep_paths(self):
+        """Test that bulk code paths fill in the hierarchy."""
+        new_root = copy_subtree(
+            self.root, self.project, parent=self.other, include_children=True
+        )
+        copies = new_root.get_descendants(include_self=True).order_by('depth')
+        self.assertEqual([t.depth for t in copies], [1, 2, 3])
+        self.assertTrue(all(t.path.startswith(self.other.path) for t in copies))
+        created, _ = apply_task_batch(
+            creates=[{'project': self.project, 'title': 'New', 'parent': self.leaf}]
+        )
+        created[0].refresh_from_db()
+        self.assertEqual(created[0].path, self.leaf.path + f'{created[0].id:010d}/')
+
+    def test_serializer_rejects_parent_inside_subtree(self):
+        """Test that a task cannot be re-parented under its own descendant."""
+        serializer = TaskSerializer(self.root, data={'parent': self.leaf.id}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('parent', serializer.errors)
+
+
+class RollupTestCase(TestCase):
+    """Test cases for incremental parent roll-ups."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='rollup', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(name='Rollup Project', owner=self.user)
+        self.root = Task.objects.create(project=self.project, title='Root')
+        self.parent = Task.objects.create(project=self.project, title='Parent', parent=self.root)
+        d0 = date(2025, 1, 1)
+        self.a = Task.objects.create(
+            project=self.project, title='A', parent=self.parent, progress=100,
+            estimated_hours=30, actual_hours=20, start_date=d0, end_date=d0 + timedelta(days=3)
+        )
+        self.b = Task.objects.create(
+            project=self.project, title='B', parent=self.parent, progress=0,
+            estimated_hours=10, start_date=d0 + timedelta(days=2), end_date=d0 + timedelta(days=9)
+        )
+
+    def test_rollup_weighted_by_estimate(self):
+        """Test that progress is weighted by estimated hours up the chain."""
+        changed = rollup_ancestors([self.a.path])
+        self.assertEqual(set(changed), {self.parent.id, self.root.id})
+        for task in (self.parent, self.root):
+            task.refresh_from_db()
+            self.assertEqual(task.progress, 75)
+            self.assertEqual(task.estimated_hours, Decimal('40.00'))
+            self.assertEqual(task.actual_hours, Decimal('20.00'))
+            self.assertEqual(task.start_date, date(2025, 1, 1))
+            self.assertEqual(task.end_date, date(2025, 1, 10))
+
+    def test_rollup_query_count(self):
+        """Test that a roll-up costs two queries per ancestor level plus one."""
+        # przodkowie + (agregat + bulk_update) x 2 poziomy
+        with self.assertNumQueries(5):
+            rollup_ancestors([self.a.path])
+        # nic się nie zmieniło - tylko odczyty
+        with self.assertNumQueries(3):
+            rollup_ancestors([self.a.path])
+
+    def test_api_update_rolls_up(self):
+        """Test that editing a child through the API updates its ancestors."""
+        response = self.client.patch(
+            f'/api/tasks/{self.b.id}/', {'progress': 100}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.progress, 100)
+
+    def test_api_move_rolls_up_old_and_new_parent(self):
+        """Test that re-parenting recomputes both ancestor chains."""
+        rollup_ancestors([self.a.path])
+        other = Task.objects.create(project=self.project, title='Other')
+        response = self.client.post(
+            f'/api/tasks/{self.a.id}/move/', {'parent': other.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.parent.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.parent.progress, 0)
+        self.assertEqual(self.parent.estimated_hours, Decimal('10.00'))
+        self.assertEqual(other.progress, 100)
+        self.assertEqual(other.estimated_hours, Decimal('30.00'))
+
+    def test_rollups_not_double_counted(self):
+        """Test that project stats and workload only count leaf tasks."""
+        for task in (self.root, self.parent, self.a):
+            Task.objects.filter(pk=task.pk).update(assignee=self.user)
+        rollup_ancestors([self.a.path])
+        response = self.client.get(f'/api/projects/{self.project.id}/')
+        stats = response.data['task_stats']
+        self.assertEqual(stats['estimated_hours'], '40.00')
+        self.assertEqual(stats['actual_hours'], '20.00')
+        self.assertEqual(stats['avg_progress'], 50.0)
+        self.assertEqual(stats['by_status']['todo'], 4)
+        response = self.client.get('/api/workload/', {'from': '2025-01-01', 'days': 4})
+        # tylko A (śr.-sob.): 30h na 3 dni robocze
+        self.assertEqual(response.data['tasks'][0], [1, 1, 1, 1])
+        self.assertEqual(response.data['hours'][0], [10.0, 10.0, 10.0, 0.0])
+
+    def test_parent_without_children_is_reset(self):
+        """Test that a parent losing its last child drops the rolled-up values."""
+        rollup_ancestors([self.a.path])
+        other = Task.objects.create(project=self.project, title='Other')
+        for child in (self.a, self.b):
+            response = self.client.post(
+                f'/api/tasks/{child.id}/move/', {'parent': other.id}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.parent.refresh_from_db()
+        self.assertEqual(self.parent.progress, 0)
+        self.assertIsNone(self.parent.estimated_hours)
+        self.assertIsNone(self.parent.actual_hours)
+        # dziadek ma teraz za dziecko "pusty" liść
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.progress, 0)
+        response = self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertEqual(response.data['task_stats']['estimated_hours'], '40.00')
+
+
+class RendererTestCase(TestCase):
+    """Test cases for the orjson and MessagePack renderers."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='render', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(name='Render \u2028 Project', owner=self.user)
+        parent = Task.objects.create(
+            project=self.project, title='Zażółć', estimated_hours=Decimal('1.50'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 3)
+        )
+        child = Task.objects.create(project=self.project, title='Child', parent=parent)
+        Dependency.objects.create(predecessor=parent, successor=child, lag_days=2)
+
+    def test_orjson_matches_drf_json(self):
+        """Test that opt-in orjson output matches DRF's JSONRenderer."""
+        data = {
+            'date': date(2025, 1, 2),
+            'datetime': datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'naive': datetime(2025, 1, 2, 3, 4, 5),
+            'decimal': Decimal('1.25'),
+            'text': 'łódź \u2028 \u2029 "x"',
+            'nested': [{1: None, 'b': (True, 1.5)}],
+        }
+        rendered = json.loads(ORJSONRenderer().render(data))
+        # daty natywnie w orjson, z pełnymi mikrosekundami
+        self.assertEqual(rendered.pop('datetime'), '2025-01-02T03:04:05.678901Z')
+        expected = json.loads(JSONRenderer().render(data))
+        del expected['datetime']
+        self.assertEqual(rendered, expected)
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(data))
+        for url in [
+            f'/api/projects/{self.project.id}/gantt/',
+            f'/api/projects/{self.project.id}/gantt/?compact=1',
+            f'/api/tasks/?project={self.project.id}',
+        ]:
+            # JSON DRF domyślnie, orjson tylko na życzenie
+            response = self.client.get(url)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            fast = self.client.get(url, HTTP_ACCEPT='application/vnd.workly+json')
+            self.assertEqual(fast['Content-Type'], 'application/vnd.workly+json')
+            self.assertEqual(fast.content, response.content)
+        sep = '&' if '?' in url else '?'
+        self.assertEqual(self.client.get(f'{url}{sep}format=orjson').content, response.content)
+        # wcięcie na życzenie klienta jak w DRF
+        response = self.client.get(
+            '/api/tasks/', HTTP_ACCEPT='application/vnd.workly+json; indent=2'
+        )
+        self.assertIn(b'\n  ', response.content)
+
+    def test_orjson_parser(self):
+        """Test that opt-in orjson bodies are parsed and malformed ones rejected."""
+        for content_type in ('application/json', 'application/vnd.workly+json'):
+            response = self.client.post(
+                '/api/tasks/', '{"project": %d, "title": "Nowe \u0142"}' % self.project.id,
+                content_type=content_type
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['title'], 'Nowe ł')
+            response = self.client.post('/api/tasks/', '{"title":', content_type=content_type)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('JSON parse error', response.data['detail'])
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        """Test that MessagePack is negotiated via Accept and decodes to the JSON data."""
+        url = f'/api/projects/{self.project.id}/gantt/'
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(
+            msgpack.unpackb(response.content),
+            json.loads(self.client.get(url).content),
+        )
+        body = MessagePackRenderer().render({'project': self.project.id, 'title': 'MP'})
+        response = self.client.post('/api/tasks/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class ValuesSerializerTestCase(TestCase):
+    """Test cases for the values()-based list serializers."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='values', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Values', owner=self.user, start_date=date(2025, 1, 1)
+        )
+        Project.objects.create(name='Empty')
+        d0 = date(2025, 1, 1)
+        root = Task.objects.create(
+            project=self.project, title='Root', assignee=self.user, status='in_progress',
+            start_date=d0, end_date=d0 + timedelta(days=10), progress=40,
+            estimated_hours=Decimal('12.5'), actual_hours=Decimal('3')
+        )
+        Task.objects.create(
+            project=self.project, title='Child', parent=root, assignee=self.user,
+            start_date=d0 + timedelta(days=5), end_date=d0 + timedelta(days=2)
+        )
+        Task.objects.create(project=self.project, title='Open', start_date=d0)
+        Task.objects.create(project=self.project, title='Empty', description='Opis')
+
+    def test_parity_with_model_serializers(self):
+        """Test that values() rows serialize exactly like the model serializers."""
+        tasks = Task.objects.order_by('id')
+        self.assertEqual(
+            TaskValuesSerializer.to_representation(TaskValuesSerializer.values(tasks)),
+            TaskSerializer(tasks, many=True).data,
+        )
+        self.assertEqual(
+            [t['duration_days'] for t in TaskValuesSerializer.values(tasks)],
+            [t.duration_days for t in tasks],
+        )
+        projects = Project.objects.with_task_stats().order_by('id')
+        self.assertEqual(
+            ProjectValuesSerializer.to_representation(ProjectValuesSerializer.values(projects)),
+            ProjectSerializer(projects, many=True).data,
+        )
+
+    def test_list_endpoints_render_identical_json(self):
+        """Test that list endpoints return the same JSON as the model serializers."""
+        cases = [
+            ('/api/tasks/?ordering=id', Task.objects.order_by('id'), TaskSerializer),
+            ('/api/my/tasks/?ordering=id', Task.objects.filter(assignee=self.user).order_by('id'),
+             TaskSerializer),
+            ('/api/projects/?ordering=name', Project.objects.with_task_stats().order_by('name'),
+             ProjectSerializer),
+        ]
+        for url, queryset, serializer_class in cases:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                json.loads(response.content)['results'],
+                json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data)),
+            )
+
+        # tryb kursora czyta pozycję z wierszy values()
+        Task.objects.bulk_create(
+            [Task(project=self.project, title=f'T{i}', start_date=date(2025, 2, i % 28 + 1))
+             for i in range(30)]
+        )
+        first = self.client.get('/api/tasks/?cursor=&ordering=start_date')
+        second = self.client.get(first.data['next'])
+        ids = [t['id'] for t in first.data['results'] + second.data['results']]
+        self.assertEqual(sorted(ids), sorted(Task.objects.values_list('id', flat=True)))
@@ -0,0 +1,133 @@
+"""
+Zmaterializowana ścieżka drzewa zadań (`Task.path`, `Task.depth`).
+
+Ścieżka to ID przodków i samego zadania, każde dopełnione zerami do stałej
+szerokości i zakończone "/", np. "0000000001/0000000007/". Dzięki temu:
+
+- poddrzewo to zakres `path >= p AND path < p[:-1] + "0"` (indeks, bez LIKE),
+- przodkowie wynikają z samej ścieżki, bez zapytań,
+- przeniesienie poddrzewa to jeden UPDATE z podmianą prefiksu.
+"""
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat, LPad, Substr
+
+from .signals import send_tasks_changed
+
+WIDTH = 10
+
+
+def segment(pk):
+    return f"{pk:0{WIDTH}d}/"
+
+
+def subtree_range(path):
+    """Granice (od, do) zakresu ścieżek poddrzewa; "0" następuje po "/"."""
+    return path, path[:-1] + "0"
+
+
+def path_ids(path):
+    """ID z kolejnych segmentów ścieżki (od korzenia do zadania)."""
+    return [int(part) for part in path.split("/") if part]
+
+
+def build_path(pk, parent_path=""):
+    path = (parent_path or "") + segment(pk)
+    return path, len(path_ids(path)) - 1
+
+
+def reparent_cycles(moves):
+    """
+    ID przenoszonych zadań, które po łącznym zastosowaniu `moves`
+    ({id zadania: nowy rodzic albo None}) trafiłyby do własnego poddrzewa.
+
+    Obecni rodzice wynikają ze ścieżek nowych rodziców, więc bez zapytań.
+    """
+    parents = {}
+    for parent in moves.values():
+        if parent is not None:
+            ids = path_ids(parent.path)
+            parents.update(zip(ids[1:], ids[:-1]))
+    for pk, parent in moves.items():
+        parents[pk] = parent.pk if parent is not None else None
+    cycles = set()
+    for pk in moves:
+        node, visited = parents.get(pk), set()
+        while node is not None and node not in visited:
+            if node == pk:
+                cycles.add(pk)
+                break
+            visited.add(node)
+            node = parents.get(node)
+    return cycles
+
+
+def subtree(path, include_self=True):
+    """QuerySet poddrzewa o danej ścieżce jako zakres po indeksie."""
+    from .models import Task
+
+    lo, hi = subtree_range(path)
+    qs = Task.objects.filter(path__gte=lo, path__lt=hi)
+    if not include_self:
+        qs = qs.exclude(path=path)
+    return qs
+
+
+def move_subtree(task, parent_path):
+    """
+    Przepina ścieżki zadania i całego jego poddrzewa pod `parent_path`
+    jednym UPDATE (stary prefiks zamieniany na nowy).
+    """
+    from .models import Task
+
+    old_path = task.path
+    new_path, new_depth = build_path(task.pk, parent_path)
+    if old_path == new_path:
+        return
+    if not old_path:
+        Task.objects.filter(pk=task.pk).update(path=new_path, depth=new_depth)
+    else:
+        if new_path.startswith(old_path):
+            raise ValueError("Zadanie nie może być przeniesione pod własne poddrzewo.")
+        moved = subtree(old_path).update(
+            path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+            depth=F("depth") + (new_depth - task.depth),
+        )
+        if moved > 1:
+            # potomkowie zmienili ścieżki bez post_save
+            send_tasks_changed((), [task.project_id])
+    task.path, task.depth = new_path, new_depth
+
+
+def assign_paths(tasks, parent_paths):
+    """
+    Uzupełnia path/depth świeżo wstawionych obiektów (po `bulk_create`).
+
+    `parent_paths` mapuje ID rodzica na jego ścieżkę; jest uzupełniana
+    w miarę przetwarzania, więc obiekty muszą iść od rodziców do dzieci.
+    Zwraca obiekty do zapisania przez `bulk_update(..., ["path", "depth"])`.
+    """
+    for task in tasks:
+        task.path, task.depth = build_path(
+            task.pk, parent_paths.get(task.parent_id, "") if task.parent_id else ""
+        )
+        parent_paths[task.pk] = task.path
+    return tasks
+
+
+def fill_paths(queryset, depth):
+    """
+    Ustawia path/depth wierszy `queryset` (jednego poziomu drzewa) jednym
+    UPDATE po stronie bazy: ścieżka rodzica + segment z własnego ID.
+    Dla dużych wstawień szybsze niż `bulk_update` z CASE na każdy wiersz.
+    """
+    from .models import Task
+
+    parent_path = Task.objects.filter(pk=OuterRef("parent_id")).values("path")
+    return queryset.update(
+        path=Concat(
+            Coalesce(Subquery(parent_path), Value("")),
+            LPad(Cast("id", CharField()), WIDTH, Value("0")),
+            Value("/"),
+        ),
+        depth=depth,
+    )
@@ -0,0 +1,183 @@
+"""
+Paginacja numerami stron z opcjonalnym trybem kursora (keyset).
+
+Parametr `?cursor=` (pusty dla pierwszej strony) przełącza listę w tryb
+kursora: kolejna strona to warunek "za ostatnim wierszem" po kolumnach
+sortowania (z kluczem głównym jako rozstrzygnięciem), a nie OFFSET, więc
+strona N kosztuje tyle co pierwsza i czyta indeks zgodny z sortowaniem.
+COUNT(*) liczony jest tylko na żądanie (`?count=1`).
+
+NULL traktowany jest jako najmniejsza wartość (NULLS FIRST rosnąco,
+NULLS LAST malejąco) niezależnie od bazy.
+"""
+import base64
+import json
+from datetime import datetime, time
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Niepoprawny kursor."
+    invalid_ordering_message = "To sortowanie nie jest obsługiwane w trybie kursora."
+
+    def get_keys(self, queryset):
+        """Pola sortowania [(pole, malejąco)], zakończone unikalnym kluczem."""
+        opts = queryset.model._meta
+        keys = []
+        for name in queryset.query.order_by or opts.ordering:
+            if not isinstance(name, str):
+                raise NotFound(self.invalid_ordering_message)
+            desc = name.startswith("-")
+            try:
+                name = name.lstrip("-")
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                raise NotFound(self.invalid_ordering_message)
+            if not field.concrete or field.many_to_many or field.one_to_many:
+                raise NotFound(self.invalid_ordering_message)
+            keys.append((field, desc))
+            if field.primary_key:
+                return keys
+        keys.append((opts.pk, keys[-1][1] if keys else False))
+        return keys
+
+    def encode_cursor(self, values, reverse):
+        # pełna precyzja: DjangoJSONEncoder ucina czas do milisekund, a kursor
+        # musi wskazywać dokładnie ostatni wiersz
+        values = [v.isoformat() if isinstance(v, (datetime, time)) else v for v in values]
+        raw = json.dumps([values, reverse], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, token, keys):
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            values, reverse = json.loads(raw)
+            if len(values) != len(keys):
+                raise ValueError
+            values = [
+                None if v is None else field.to_python(v)
+                for (field, _), v in zip(keys, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(reverse)
+
+    def order_by(self, keys, reverse):
+        order = []
+        for field, desc in keys:
+            name = field.attname
+            if desc != reverse:
+                order.append(F(name).desc(nulls_last=True) if field.null else f"-{name}")
+            else:
+                order.append(F(name).asc(nulls_first=True) if field.null else name)
+        return order
+
+    def after(self, keys, values, reverse):
+        """Warunek "za pozycją `values`" w kierunku przechodzenia."""
+        condition = None
+        for (field, desc), value in reversed(list(zip(keys, values))):
+            name = field.attname
+            if desc == reverse:  # rosnąco w kierunku przechodzenia
+                if value is None:
+                    strict = Q(**{f"{name}__isnull": False})
+                else:
+                    strict = Q(**{f"{name}__gt": value})
+            elif value is None:
+                strict = Q(pk__in=[])
+            else:
+                strict = Q(**{f"{name}__lt": value})
+                if field.null:
+                    strict |= Q(**{f"{name}__isnull": True})
+            if condition is None:
+                condition = strict
+            else:
+                if value is None:
+                    equal = Q(**{f"{name}__isnull": True})
+                else:
+                    equal = Q(**{name: value})
+                condition = strict | (equal & condition)
+        # zakres po pierwszej kolumnie, żeby baza zaczęła od seek w indeksie
+        (field, desc), value = keys[0], values[0]
+        if value is not None and (desc == reverse or not field.null):
+            lookup = "gte" if desc == reverse else "lte"
+            condition &= Q(**{f"{field.attname}__{lookup}": value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        keys = self.get_keys(queryset)
+        token = request.query_params.get(self.cursor_query_param)
+        values, reverse = self.decode_cursor(token, keys) if token else (None, False)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = queryset.order_by().count()
+
+        qs = queryset.order_by(*self.order_by(keys, reverse))
+        if values is not None:
+            qs = qs.filter(self.after(keys, values, reverse))
+        rows = list(qs[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = values is not None, has_more
+
+        position = [
+            # obiekty modelu albo słowniki z values()
+            [row[f.attname] if isinstance(row, dict) else getattr(row, f.attname) for f, _ in keys]
+            for row in rows[:1] + rows[-1:]
+        ]
+        self.first, self.last = (
+            (position[0], position[-1]) if position else (values, values)
+        )
+        return rows
+
+    def get_link(self, values, reverse):
+        url = self.request.build_absolute_uri()
+        if values is None:
+            return replace_query_param(url, self.cursor_query_param, "")
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(values, reverse)
+        )
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_link(self.last, False) if self.has_next else None,
+            "previous": self.get_link(self.first, True) if self.has_previous else None,
+            "results": data,
+        }
+        if self.count is not None:
+            payload = {"count": self.count, **payload}
+        return Response(payload)
+
+
+class DefaultPagination(PageNumberPagination):
+    """`PageNumberPagination`, a z parametrem `?cursor` - `KeysetPagination`."""
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
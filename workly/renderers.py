@@ -0,0 +1,70 @@
+"""
+Szybkie renderery API na życzenie klienta (negocjacja `Accept` albo
+`?format=`); domyślnym pozostaje `JSONRenderer` DRF.
+
+- `ORJSONRenderer` (`application/vnd.workly+json`, `?format=orjson`) -
+  JSON kodowany przez orjson: kompaktowy, UTF-8, escapowane U+2028/U+2029
+  jak w DRF. Daty i czasy orjson koduje natywnie (UTC jako "Z", pełne
+  mikrosekundy - DRF obcina do milisekund); `Decimal` i pozostałe typy
+  spoza JSON, których orjson nie zna, przechodzą przez enkoder DRF.
+  Odpowiedzi serializerów (daty już jako tekst) są bajt w bajt takie same
+  jak z `JSONRenderer`. Wcięcia (`; indent=`) i brak orjson obsługuje
+  renderer DRF.
+- `MessagePackRenderer` (`application/msgpack`, `?format=msgpack`) -
+  wymaga opcjonalnego pakietu `msgpack`; bez niego nie jest rejestrowany
+  (zob. `REST_FRAMEWORK` w ustawieniach).
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - zależność z requirements.txt
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_default = JSONEncoder().default
+
+LINE_SEPARATORS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+
+class ORJSONRenderer(JSONRenderer):
+    media_type = "application/vnd.workly+json"
+    format = "orjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not (self.compact and not self.ensure_ascii):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            # tylko typy, których orjson nie zna (Decimal, leniwe napisy...)
+            default=_default,
+            # klucze nie-str jak w json
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+        if LINE_SEPARATORS[0] in ret or LINE_SEPARATORS[1] in ret:
+            ret = ret.replace(LINE_SEPARATORS[0], b"\\u2028").replace(
+                LINE_SEPARATORS[1], b"\\u2029"
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # daty i Decimal tak samo jak w JSON (tekst ISO, liczba)
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
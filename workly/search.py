@@ -0,0 +1,118 @@
+"""
+Wyszukiwanie pełnotekstowe oparte o SQLite FTS5.
+
+Dla tabeli modelu tworzony jest indeks `<db_table>_fts` (external content)
+utrzymywany triggerami, więc obejmuje też `bulk_create`, `bulk_update`
+i `QuerySet.update`. Uwaga: gdy migracja przebudowuje tabelę modelu
+(SQLite robi to przy większości AlterField), triggery znikają razem ze
+starą tabelą - taka migracja musi ponownie wywołać `create_fts_index`.
+
+`FullTextSearchFilter` zastępuje `SearchFilter`: `?search=` dopasowuje
+prefiksy słów (bez rozróżniania wielkości liter i znaków diakrytycznych)
+i, jeśli nie podano `?ordering=` ani `?cursor`, sortuje wyniki według
+trafności (bm25) - wtedy tabela indeksu jest złączana z tabelą modelu.
+Na innych bazach albo dla pól spoza indeksu działa jak `SearchFilter`.
+"""
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .pagination import KeysetPagination
+
+WORD_RE = re.compile(r"\w+")
+
+
+def fts_table(db_table):
+    return f"{db_table}_fts"
+
+
+def create_fts_index(schema_editor, db_table, columns, pk="id"):
+    """Tworzy indeks FTS5, triggery synchronizujące i wypełnia indeks."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    fts = fts_table(db_table)
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new});"
+    for sql in [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{db_table}', "
+        f"content_rowid='{pk}', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {db_table} BEGIN {insert} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {db_table} BEGIN {delete} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {db_table} "
+        f"BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]:
+        schema_editor.execute(sql)
+
+
+def drop_fts_index(schema_editor, db_table):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    fts = fts_table(db_table)
+    for suffix in ("ai", "ad", "au"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def match_expression(terms, columns):
+    """
+    Zapytanie MATCH: każde słowo jako fraza z prefiksem, wszystkie wymagane,
+    zawężone do podanych kolumn. Składnia FTS5 z danych użytkownika nie
+    jest przepuszczana.
+    """
+    words = [w for term in terms for w in WORD_RE.findall(term)]
+    if not words:
+        return None
+    phrases = " ".join(f'"{w}"*' for w in words)
+    return f"{{{' '.join(columns)}}} : ({phrases})"
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `SearchFilter` na indeksie FTS5. Powinien stać za `OrderingFilter`
+    na liście backendów, żeby domyślne sortowanie widoku nie nadpisało
+    sortowania według trafności.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+        if connections[queryset.db].vendor != "sqlite" or any(
+            not f.isidentifier() or "__" in f for f in search_fields
+        ):
+            return super().filter_queryset(request, queryset, view)
+
+        match = match_expression(terms, search_fields)
+        if match is None:
+            return queryset.none()
+        opts = queryset.model._meta
+        fts = fts_table(opts.db_table)
+        # sortowanie jawne albo tryb kursora (keyset wymaga kolumn, nie bm25)
+        if request.query_params.get(api_settings.ORDERING_PARAM) or (
+            KeysetPagination.cursor_query_param in request.query_params
+        ):
+            return queryset.filter(
+                pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+            )
+        # złączenie z indeksem: MATCH i bm25 liczone raz dla całego zapytania
+        # (skorelowane podzapytanie o ranking powtarzało MATCH dla każdego
+        # wiersza); ukryta kolumna `rank` (= bm25) działa też przy GROUP BY
+        # list z agregatami, w przeciwieństwie do funkcji bm25()
+        ordering = queryset.query.order_by or opts.ordering
+        return queryset.extra(
+            select={"search_rank": f"{fts}.rank"},
+            tables=[fts],
+            where=[
+                f'{fts}.rowid = "{opts.db_table}"."{opts.pk.column}"',
+                f"{fts} MATCH %s",
+            ],
+            params=[match],
+        ).order_by("search_rank", *ordering)
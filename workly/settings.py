@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -146,14 +147,46 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
-        "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
+        "workly.search.FullTextSearchFilter",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # domyślnie JSON DRF; orjson na życzenie ("Accept: application/vnd.workly+json"
+    # albo ?format=orjson), MessagePack po "Accept: application/msgpack"
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "workly.renderers.ORJSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "workly.parsers.ORJSONParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "workly.pagination.DefaultPagination",
     "PAGE_SIZE": 25,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# MessagePack tylko z opcjonalnym pakietem msgpack
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append("workly.renderers.MessagePackRenderer")
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append("workly.parsers.MessagePackParser")
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # wspólny dla procesów cache odpowiedzi API (projects.cache)
+    "responses": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "workly_response_cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Broker zdarzeń SSE; przy wielu procesach: "tasks.events.ChangeFeedBroker"
+WORKLY_EVENT_BROKER = "tasks.events.LocalBroker"
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Workly API",
     "DESCRIPTION": "API do projektów, zadań, zależności i dashboardu.",
@@ -5,6 +5,7 @@ from rest_framework.routers import DefaultRouter
 from projects.api import ProjectViewSet
 from tasks.api import TaskViewSet, DependencyViewSet
 from gantt.api import GanttProjectView
+from projects.views import project_events
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
@@ -20,6 +21,7 @@ urlpatterns = [
     path(
         "api/projects/<int:pk>/gantt/", GanttProjectView.as_view(), name="project-gantt"
     ),
+    path("api/projects/<int:pk>/events/", project_events, name="project-events"),
     path("api/", include(("dashboard.urls", "dashboard"), namespace="dashboard")),
     path("", include(("frontend.urls", "frontend"), namespace="frontend")),
 ]
@@ -0,0 +1,143 @@
+"""
+Szybka ścieżka list tylko do odczytu: wiersze z `values()` zamiast modeli.
+
+`ValuesSerializer` odtwarza wynik `ModelSerializer` (te same klucze w tej
+samej kolejności i te same wartości) bez tworzenia instancji modelu
+i serializera dla każdego wiersza. Konwersje DRF wywoływane są tylko dla
+pól, które coś zmieniają (daty, liczby dziesiętne); identyfikatory, teksty
+i liczby całkowite przechodzą bez zmian. Pola wyliczane w Pythonie
+(właściwości modelu) podaje się jako wyrażenia SQL, a `SerializerMethodField`
+dostaje wiersz z dostępem przez atrybuty.
+
+`ValuesListMixin` podmienia `list()` widoku; filtrowanie, sortowanie
+i paginacja działają na tym samym querysecie co dotąd.
+"""
+from datetime import date
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+# pola, których to_representation nie zmienia wartości z bazy
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+    PrimaryKeyRelatedField,
+)
+
+
+class Row(dict):
+    """Wiersz `values()` czytany jak obiekt (dla `SerializerMethodField`)."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class, **expressions):
+        self.serializer_class = serializer_class
+        self.expressions = expressions
+        self.model = serializer_class.Meta.model
+
+    @cached_property
+    def serializer(self):
+        return self.serializer_class()
+
+    @cached_property
+    def columns(self):
+        # leniwie: pola serializera wymagają załadowanych modeli
+        return [
+            (name, *self.column(name, field))
+            for name, field in self.serializer.fields.items()
+            if not field.write_only
+        ]
+
+    def column(self, name, field):
+        """(klucz wiersza albo None dla metody, pole)."""
+        if isinstance(field, serializers.SerializerMethodField):
+            return None, field
+        if field.source in self.expressions:
+            return field.source, field
+        try:
+            return self.model._meta.get_field(field.source).attname, field
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{type(self.serializer).__name__}.{name}: brak kolumny ani "
+                f"wyrażenia SQL dla źródła {field.source!r}."
+            )
+
+    def converter(self, field):
+        """Funkcja wartość -> reprezentacja albo None, gdy nic nie zmienia."""
+        if isinstance(field, serializers.SerializerMethodField):
+            return getattr(self.serializer, field.method_name)
+        if isinstance(field, IDENTITY_FIELDS):
+            return None
+        if isinstance(field, serializers.DateTimeField) and _iso(
+            field, api_settings.DATETIME_FORMAT
+        ):
+            # strefa raz na listę, a nie przez asgiref.Local dla każdej wartości
+            tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+            return partial(_iso_datetime, field=field, tz=tz)
+        if isinstance(field, serializers.DateField) and _iso(field, api_settings.DATE_FORMAT):
+            return date.isoformat
+        return field.to_representation
+
+    def values(self, queryset):
+        return queryset.annotate(**self.expressions).values()
+
+    def to_representation(self, rows):
+        columns = [(name, key, self.converter(field)) for name, key, field in self.columns]
+        data = []
+        for row in rows:
+            item = {}
+            obj = None
+            for name, key, convert in columns:
+                if key is None:
+                    obj = obj or Row(row)
+                    item[name] = convert(obj)
+                    continue
+                value = row[key]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+def _iso(field, default):
+    output_format = getattr(field, "format", default)
+    return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+
+def _iso_datetime(value, field, tz):
+    """`DateTimeField.to_representation` dla formatu ISO 8601."""
+    if tz is not None and value.utcoffset() is not None:
+        value = value.astimezone(tz)
+    else:
+        value = field.enforce_timezone(value)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class ValuesListMixin:
+    """`list()` przez `values_serializer`; pozostałe akcje bez zmian."""
+
+    values_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        fast = self.values_serializer
+        queryset = fast.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.to_representation(page))
+        return Response(fast.to_representation(queryset))